@@ -0,0 +1,107 @@
+"""Benchmark fixed-effects regressions against pyfixest on a synthetic panel.
+
+Runs the same batch of specifications (different outcomes and regressors on
+one firm + year + industry FE structure and sample) with
+mypackage.core.fixed_effects.feols and with pyfixest.feols, and reports the
+time of each specification and the largest coefficient difference.
+
+Usage:
+    python code/benchmarks/bench_fixed_effects.py              # 10M rows
+    python code/benchmarks/bench_fixed_effects.py --rows 1e6 --no-pyfixest
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from mypackage.core.fixed_effects import clear_cache, feols
+
+SEED = 20240101
+FE = ["firm", "year", "industry"]
+SPECS = [
+    ("y1", ["x1"]),
+    ("y1", ["x1", "x2"]),
+    ("y2", ["x1", "x2"]),
+    ("y2", ["x1", "x2", "x3"]),
+    ("y1", ["x1", "x2", "x3"]),
+]
+
+
+def make_panel(rows: int, seed: int = SEED) -> pd.DataFrame:
+    """Unbalanced firm-year panel: rows/10 firms in 400 industries, 30 years."""
+    rng = np.random.default_rng(seed)
+    firms = max(rows // 10, 1)
+    firm = rng.integers(0, firms, rows)
+    year = rng.integers(0, 30, rows)
+    industry = firm % 400
+    firm_effect = rng.normal(size=firms)[firm]
+    x1 = rng.normal(size=rows) + 0.5 * firm_effect + 0.02 * year
+    x2 = rng.normal(size=rows) + 0.001 * industry
+    x3 = rng.normal(size=rows) + 0.3 * x1
+    noise = rng.normal(size=rows)
+    return pd.DataFrame({
+        "firm": firm, "year": year, "industry": industry,
+        "x1": x1, "x2": x2, "x3": x3,
+        "y1": 1.0 * x1 - 0.5 * x2 + 0.2 * x3 + firm_effect + 0.01 * year + noise,
+        "y2": -0.3 * x1 + 0.8 * x2 + firm_effect + rng.normal(size=rows),
+    })
+
+
+def run_ours(panel: pd.DataFrame) -> tuple[list[float], list[pd.Series]]:
+    clear_cache()
+    seconds, coefs = [], []
+    for y, x in SPECS:
+        start = time.perf_counter()
+        coefs.append(feols(panel, y, x, fe=FE).coef)
+        seconds.append(time.perf_counter() - start)
+    clear_cache()  # leave the memory to pyfixest
+    return seconds, coefs
+
+
+def run_pyfixest(panel: pd.DataFrame) -> tuple[list[float], list[pd.Series]]:
+    import pyfixest as pf
+
+    seconds, coefs = [], []
+    for y, x in SPECS:
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fit = pf.feols(f"{y} ~ {' + '.join(x)} | {' + '.join(FE)}",
+                           data=panel, vcov="iid")
+        coefs.append(fit.coef())
+        seconds.append(time.perf_counter() - start)
+    return seconds, coefs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=float, default=10e6)
+    parser.add_argument("--no-pyfixest", action="store_true")
+    args = parser.parse_args()
+
+    panel = make_panel(int(args.rows))
+    print(f"{len(panel):,} rows, FE {' + '.join(FE)} "
+          f"({', '.join(str(panel[c].nunique()) for c in FE)} levels)")
+    results = {"mypackage": run_ours(panel)}
+    if not args.no_pyfixest:
+        results["pyfixest"] = run_pyfixest(panel)
+
+    print(f"\n{'spec':<28}" + "".join(f"{name:>12}" for name in results))
+    for i, (y, x) in enumerate(SPECS):
+        label = f"{y} ~ {' + '.join(x)}"
+        print(f"{label:<28}" + "".join(f"{r[0][i]:>11.2f}s" for r in results.values()))
+    print(f"{'total':<28}" + "".join(f"{sum(r[0]):>11.2f}s" for r in results.values()))
+
+    if "pyfixest" in results:
+        diff = max(
+            float((ours - theirs.reindex(ours.index)).abs().max())
+            for ours, theirs in zip(results["mypackage"][1], results["pyfixest"][1])
+        )
+        print(f"\nlargest coefficient difference: {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
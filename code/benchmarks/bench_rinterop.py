@@ -0,0 +1,74 @@
+"""Benchmark moving a panel into R: Arrow C streams against pandas2ri.
+
+Sends the synthetic panel of bench_fixed_effects to the embedded R session
+with mypackage.core.rinterop and with rpy2's pandas2ri converter, and times
+each, then a batch of fixest regressions in one round trip. Needs a local R
+with the arrow and fixest packages; no network.
+
+Usage:
+    python code/benchmarks/bench_rinterop.py               # 20M rows
+    python code/benchmarks/bench_rinterop.py --rows 1e6 --no-pandas2ri
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import rpy2.robjects as ro
+from rpy2.robjects import pandas2ri
+from rpy2.robjects.conversion import localconverter
+
+from mypackage.core.rinterop import r_session
+
+sys.path.insert(0, str(Path(__file__).parent))
+from bench_fixed_effects import FE, SPECS, make_panel
+
+SEED = 20240101
+
+
+def run_arrow(panel) -> float:
+    r = r_session()
+    start = time.perf_counter()
+    out = r.eval("data.frame(rows = nrow(panel))", panel=panel)
+    assert out.column("rows")[0].as_py() == len(panel)
+    return time.perf_counter() - start
+
+
+def run_pandas2ri(panel) -> float:
+    start = time.perf_counter()
+    with localconverter(ro.default_converter + pandas2ri.converter):
+        ro.globalenv["panel"] = panel
+    ro.r("rm(panel)")
+    return time.perf_counter() - start
+
+
+def run_batch(panel) -> tuple[float, int]:
+    exprs = {
+        f"spec{i}": f"coeftable(feols({y} ~ {' + '.join(x)} | {' + '.join(FE)}, "
+                    f"panel, vcov = 'iid'))"
+        for i, (y, x) in enumerate(SPECS)
+    }
+    start = time.perf_counter()
+    out = r_session().run(exprs, data={"panel": panel})
+    return time.perf_counter() - start, len(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=float, default=20e6)
+    parser.add_argument("--no-pandas2ri", action="store_true")
+    args = parser.parse_args()
+
+    panel = make_panel(int(args.rows), SEED)
+    print(f"{len(panel):,} rows, {panel.memory_usage().sum() / 2**20:,.0f} MB")
+    r_session()  # start R and load its packages outside the timings
+    print(f"{'arrow transfer':<28}{run_arrow(panel):>11.2f}s")
+    if not args.no_pandas2ri:
+        print(f"{'pandas2ri transfer':<28}{run_pandas2ri(panel):>11.2f}s")
+    seconds, n = run_batch(panel)
+    print(f"{f'transfer + {n} fixest specs':<28}{seconds:>11.2f}s")
+
+
+if __name__ == "__main__":
+    main()
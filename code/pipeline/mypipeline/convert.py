@@ -0,0 +1,237 @@
+"""Mirror raw files into typed, compressed Parquet, reconverting only changes.
+
+Each supported file under RAW (see raw.FORMATS) gets a Parquet copy at the
+same relative path plus ``.parquet`` under RAW_PARQUET, written by streaming
+it through raw.scan, so no file is ever held in memory whole. The manifest
+(RAW_PARQUET/manifest.json) records each source's sha256, size and mtime and
+the mirror's row count and schema. A source is reconverted only when its
+checksum changes (its size and mtime are checked first, so unchanged files
+are not re-read) or its mirror is missing; mirrors of deleted sources are
+removed.
+
+CSV column types are inferred from the first block of the file. A column
+whose later values do not fit its inferred type (ints, then "A12") is read as
+string instead: the conversion is retried with that column widened, and the
+report lists it.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mypackage.config import RAW, RAW_PARQUET
+from mypipeline.raw import file_format, read_schema, scan
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+COMPRESSION = "zstd"
+# Rows per Parquet row group: large enough for fast scans, small enough to
+# bound the memory a conversion buffers
+ROW_GROUP_ROWS = 512 * 1024
+CHUNK_BYTES = 1 << 20
+# Arrow's CSV conversion error, naming the column by position
+CSV_ERROR_RE = re.compile(r"In CSV column #(\d+): .*CSV conversion error")
+
+
+@dataclass
+class ConversionReport:
+    """What a mirror run did, by source path relative to RAW."""
+
+    converted: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    # Columns read as string because later rows did not fit the inferred type
+    widened: dict[str, list[str]] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        lines = [
+            f"{len(self.converted)} converted, {len(self.unchanged)} unchanged, "
+            f"{len(self.removed)} removed, {len(self.failed)} failed "
+            f"({self.seconds:.1f}s)"
+        ]
+        lines += [f"  converted {name}" for name in self.converted]
+        lines += [f"  removed   {name}" for name in self.removed]
+        lines += [f"  widened   {name}: {', '.join(columns)} read as string"
+                  for name, columns in self.widened.items()]
+        lines += [f"  FAILED    {name}: {error}"
+                  for name, error in self.failed.items()]
+        return "\n".join(lines)
+
+
+def _sha256(path: Path) -> str:
+    sha = hashlib.sha256()
+    with path.open("rb") as fh:
+        while chunk := fh.read(CHUNK_BYTES):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _schema_json(schema: pa.Schema) -> list[dict]:
+    return [{"name": f.name, "type": str(f.type)} for f in schema]
+
+
+def mirror_path(source: Path, raw_dir: Path = RAW,
+                out_dir: Path = RAW_PARQUET) -> Path:
+    """Where the Parquet mirror of a raw file lives."""
+    return out_dir / f"{source.relative_to(raw_dir)}.parquet"
+
+
+def convert_file(source: Path, target: Path, schema: pa.Schema | None = None,
+                 raw_dir: Path = RAW) -> tuple[int, pa.Schema, list[str]]:
+    """Stream one raw file under raw_dir into a Parquet file, with the column
+    types of `schema` if given (inferred otherwise); returns the rows, the
+    schema written and the columns widened to string after a CSV conversion
+    error.
+    """
+    widened = []
+    while True:
+        try:
+            rows, written = _convert(source, target, schema, raw_dir)
+            return rows, written, widened
+        except pa.ArrowInvalid as e:
+            match = CSV_ERROR_RE.search(str(e))
+            if match is None:
+                raise
+            schema = schema or read_schema(source, root=raw_dir)
+            column = schema.field(int(match.group(1)))
+            if column.type == pa.string():
+                raise
+            schema = schema.set(int(match.group(1)), column.with_type(pa.string()))
+            widened.append(column.name)
+
+
+def _convert(source: Path, target: Path, schema: pa.Schema | None,
+             raw_dir: Path) -> tuple[int, pa.Schema]:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.tmp")
+    writer, rows, pending, pending_rows = None, 0, [], 0
+
+    def flush():
+        nonlocal pending, pending_rows
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending),
+                               row_group_size=ROW_GROUP_ROWS)
+            pending, pending_rows = [], 0
+
+    try:
+        for batch in scan(source, schema=schema, root=raw_dir):
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, batch.schema,
+                                          compression=COMPRESSION)
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            rows += batch.num_rows
+            if pending_rows >= ROW_GROUP_ROWS:
+                flush()
+        if writer is None:
+            # No rows: keep the columns and their types
+            writer = pq.ParquetWriter(
+                tmp, schema or read_schema(source, root=raw_dir),
+                compression=COMPRESSION)
+        flush()
+        writer.close()
+        os.replace(tmp, target)
+    finally:
+        if writer is not None and writer.is_open:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+    return rows, writer.schema
+
+
+def _sources(raw_dir: Path) -> list[Path]:
+    """Supported raw files, skipping dotfiles and dot-directories."""
+    found = []
+    for path in sorted(raw_dir.rglob("*")):
+        rel = path.relative_to(raw_dir)
+        if not path.is_file() or any(p.startswith(".") for p in rel.parts):
+            continue
+        try:
+            file_format(path)
+        except ValueError:
+            continue
+        found.append(path)
+    return found
+
+
+def _load_manifest(path: Path) -> dict:
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def _save_manifest(path: Path, files: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(
+        json.dumps({"version": MANIFEST_VERSION, "files": files}, indent=1,
+                   sort_keys=True),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+
+
+def write_parquet_mirror(raw_dir: Path = RAW,
+                         out_dir: Path = RAW_PARQUET) -> ConversionReport:
+    """Bring the Parquet mirror of raw_dir up to date; see the module doc."""
+    start = time.perf_counter()
+    report = ConversionReport()
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = _load_manifest(manifest_path)
+
+    current = set()
+    for source in _sources(raw_dir):
+        name = str(source.relative_to(raw_dir))
+        current.add(name)
+        target = mirror_path(source, raw_dir, out_dir)
+        st = source.stat()
+        entry = manifest.get(name)
+        if entry is not None and target.exists():
+            if [entry["size"], entry["mtime_ns"]] == [st.st_size, st.st_mtime_ns]:
+                report.unchanged.append(name)
+                continue
+            digest = _sha256(source)
+            if entry["sha256"] == digest:
+                entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+                report.unchanged.append(name)
+                continue
+        else:
+            digest = _sha256(source)
+
+        try:
+            rows, schema, widened = convert_file(source, target, raw_dir=raw_dir)
+        except Exception as e:
+            report.failed[name] = f"{type(e).__name__}: {e}"
+            continue
+        if widened:
+            report.widened[name] = widened
+        manifest[name] = {
+            "sha256": digest,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "parquet": str(target.relative_to(out_dir)),
+            "rows": rows,
+            "schema": _schema_json(schema),
+            "converted": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        report.converted.append(name)
+        _save_manifest(manifest_path, manifest)
+
+    for name in sorted(set(manifest) - current):
+        (out_dir / manifest.pop(name)["parquet"]).unlink(missing_ok=True)
+        report.removed.append(name)
+    _save_manifest(manifest_path, manifest)
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,193 @@
+"""Render figures in parallel to .pdf and .png, skipping unchanged ones.
+
+    from mypackage.core.spec_curve import plot_spec_curve
+    from mypipeline.figures import FigureJob, write_figures
+
+    figures = [
+        FigureJob("baseline/spec_curve", plot_spec_curve, results),
+        FigureJob("baseline/event_study", plot_event_study, coefs,
+                  kwargs={"window": 8}, style={"font.size": 9}),
+    ]
+    print(write_figures(FIGURES, figures, jobs=8))
+
+A job's plot function takes its data (and kwargs) and returns a matplotlib
+Figure; it must be importable (defined at module level) to run in a worker.
+Workers use the Agg backend, and each figure is drawn once and saved in both
+formats. A figure is skipped when its data, kwargs, the plot function's
+source, its style (rcParams overrides) and the matplotlib version all hash
+as at its last render and both files exist; keys and render times are kept
+in ``.figures.json`` in the output directory. PDFs carry no creation date, so
+a re-render of an unchanged figure writes the same bytes.
+"""
+
+import json
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import matplotlib
+
+from mypipeline.memo import fingerprint, source_hash
+
+MANIFEST_NAME = ".figures.json"
+FORMATS = ("pdf", "png")
+PNG_DPI = 300
+METADATA = {"pdf": {"CreationDate": None}, "png": {}}
+
+
+@dataclass
+class FigureJob:
+    """One figure: name is the file stem relative to the figures directory,
+    e.g. "baseline/event_study" for a variant folder."""
+
+    name: str
+    plot: Callable
+    data: Any = None
+    kwargs: dict = field(default_factory=dict)
+    style: dict = field(default_factory=dict)
+    dpi: int = PNG_DPI
+
+    def key(self) -> str:
+        return fingerprint([
+            self.data, self.kwargs, self.plot.__module__, self.plot.__qualname__,
+            source_hash(self.plot), sorted(self.style.items()), self.dpi,
+            matplotlib.__version__,
+        ])
+
+
+@dataclass
+class FigureReport:
+    """What a write_figures run did; render seconds by figure name."""
+
+    rendered: dict[str, float] = field(default_factory=dict)
+    unchanged: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        lines = [
+            f"{len(self.rendered)} rendered, {len(self.unchanged)} unchanged, "
+            f"{len(self.failed)} failed ({self.seconds:.1f}s)"
+        ]
+        slowest = sorted(self.rendered.items(), key=lambda item: -item[1])
+        lines += [f"  {seconds:6.2f}s {name}" for name, seconds in slowest]
+        lines += [f"  FAILED  {name}: {error}" for name, error in self.failed.items()]
+        return "\n".join(lines)
+
+
+# ==============================================================================
+# RENDERING
+# ==============================================================================
+
+
+def _init_worker() -> None:
+    matplotlib.use("Agg", force=True)
+
+
+def _render(job: FigureJob, out: Path) -> float:
+    """Draw job's figure once, save every format atomically; seconds taken."""
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    with matplotlib.rc_context(job.style):
+        fig = job.plot(job.data, **job.kwargs)
+        try:
+            for fmt in FORMATS:
+                path = out / f"{job.name}.{fmt}"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.tmp")
+                fig.savefig(tmp, format=fmt, dpi=job.dpi, metadata=METADATA[fmt])
+                os.replace(tmp, path)
+        finally:
+            plt.close(fig)
+    return time.perf_counter() - start
+
+
+# ==============================================================================
+# MANIFEST
+# ==============================================================================
+
+
+def _load_manifest(out: Path) -> dict:
+    """Entries by figure name; empty if missing or unreadable, so a corrupt
+    manifest only costs a full render."""
+    try:
+        manifest = json.loads((out / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _save_manifest(out: Path, manifest: dict) -> None:
+    path = out / MANIFEST_NAME
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def _current(out: Path, job: FigureJob, key: str, manifest: dict) -> bool:
+    entry = manifest.get(job.name)
+    return (entry is not None and entry["key"] == key
+            and all((out / f"{job.name}.{fmt}").exists() for fmt in FORMATS))
+
+
+def write_figures(out: Path, figures: list[FigureJob], jobs: int | None = None,
+                  force: bool = False) -> FigureReport:
+    """Render the figures whose inputs changed since their last render.
+
+    jobs: worker processes (default: one per CPU); 1 renders in this process,
+        with its current backend.
+    force: render every figure regardless.
+    """
+    start = time.perf_counter()
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    names = [job.name for job in figures]
+    if len(set(names)) < len(names):
+        raise ValueError("figure names must be unique")
+
+    manifest = _load_manifest(out)
+    report = FigureReport()
+    todo = []
+    for job in figures:
+        key = job.key()
+        if not force and _current(out, job, key, manifest):
+            report.unchanged.append(job.name)
+        else:
+            todo.append((job, key))
+
+    def finish(job: FigureJob, key: str, result: float | BaseException) -> None:
+        if isinstance(result, BaseException):
+            manifest.pop(job.name, None)
+            report.failed[job.name] = f"{type(result).__name__}: {result}"
+        else:
+            manifest[job.name] = {"key": key, "seconds": round(result, 3)}
+            report.rendered[job.name] = result
+
+    jobs = min(jobs or os.cpu_count() or 1, len(todo))
+    try:
+        if jobs <= 1:
+            for job, key in todo:
+                try:
+                    finish(job, key, _render(job, out))
+                except Exception as e:
+                    finish(job, key, e)
+        elif todo:
+            with ProcessPoolExecutor(max_workers=jobs,
+                                     initializer=_init_worker) as pool:
+                # Slowest first (by their last render), so none is left alone
+                # at the end
+                todo.sort(key=lambda item: -manifest.get(
+                    item[0].name, {}).get("seconds", 0.0))
+                futures = [(job, key, pool.submit(_render, job, out))
+                           for job, key in todo]
+                for job, key, future in futures:
+                    finish(job, key, future.exception() or future.result())
+    finally:
+        _save_manifest(out, manifest)
+    report.seconds = time.perf_counter() - start
+    return report
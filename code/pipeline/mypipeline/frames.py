@@ -0,0 +1,53 @@
+"""Pass DataFrames between stages as Parquet, downcast on the way out.
+
+    from mypipeline.frames import read_frame, write_frame
+
+    print(write_frame(merged, INTERMEDIATE / "merged.parquet"))  # per column MB
+    merged = read_frame(INTERMEDIATE / "merged.parquet", columns=["id", "wage"])
+
+write_frame applies core.memory.optimize (lossless downcasting) before
+writing and stores the chosen schema in the file's metadata; read_frame
+restores it, so a later stage gets the small dtypes without profiling the
+data again, and can read only the columns it needs.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mypackage.core.memory import MemoryReport, apply_schema, optimize
+
+SCHEMA_KEY = b"mypackage.schema"
+COMPRESSION = "zstd"
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> MemoryReport:
+    """Downcast df, write it to path atomically; what the downcast saved."""
+    df, report = optimize(df)
+    schema = {c.column: c.after for c in report.columns}
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        SCHEMA_KEY: json.dumps(schema).encode(),
+    })
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    pq.write_table(table, tmp, compression=COMPRESSION)
+    os.replace(tmp, path)
+    return report
+
+
+def read_frame(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """A frame written by write_frame, in its stored dtypes."""
+    table = pq.read_table(path, columns=columns)
+    stored = json.loads((table.schema.metadata or {}).get(SCHEMA_KEY, b"{}"))
+    df = table.to_pandas()
+    # JSON keys are strings whatever the column names were
+    schema = {name: stored[str(name)] for name in df.columns
+              if str(name) in stored}
+    return apply_schema(df, schema)
@@ -0,0 +1,368 @@
+"""Record what each pipeline stage costs, and flag the stages that got worse.
+
+    python -m mypipeline.ledger                  # last run vs history
+    python -m mypipeline.ledger --run 20261018T020000-4242 --threshold 1.5
+
+Every stage the runner executes adds a row to the ledger: wall and CPU
+seconds, the peak RSS of its largest process, the bytes of its inferred
+input files and of the output files it wrote, whether it failed, and the git
+commit of the tree it ran from. Each run is written to PIPELINE_STATE/ledger
+as its own Parquet file when it ends (Parquet files cannot be appended to),
+so the ledger only ever grows; read_ledger() reads all runs as one table.
+
+compare() sets each stage of a run against the median of its last HISTORY
+successful runs on the same host, and flags a metric that grew by more than
+the threshold ratio and by more than that metric's noise floor (MIN_CHANGE),
+so that a 0.2s stage taking 0.4s is not a regression. The command exits 1
+when anything is flagged, for a nightly job to alert on.
+"""
+
+import argparse
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mypackage.config import PIPELINE_STATE, ROOT
+from mypipeline.stages import Stage
+
+LEDGER_DIR = PIPELINE_STATE / "ledger"
+
+# Successful runs of a stage its baseline is the median of
+HISTORY = 10
+# Ratio to the baseline above which a metric is flagged
+THRESHOLD = 1.25
+# Smallest increase that can count as a regression, by metric
+MIN_CHANGE = {
+    "wall": 1.0,
+    "cpu": 1.0,
+    "peak_rss": 64 * 2**20,
+    "bytes_read": 2**20,
+    "bytes_written": 2**20,
+}
+# ru_maxrss is in kilobytes on Linux, bytes on macOS
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+SCHEMA = pa.schema([
+    ("run", pa.string()),
+    ("started", pa.timestamp("s", tz="UTC")),
+    ("commit", pa.string()),
+    ("dirty", pa.bool_()),
+    ("host", pa.string()),
+    ("jobs", pa.int32()),
+    ("stage", pa.string()),
+    ("status", pa.string()),
+    ("exit_code", pa.int32()),
+    ("wall", pa.float64()),
+    ("cpu", pa.float64()),
+    ("peak_rss", pa.int64()),
+    ("bytes_read", pa.int64()),
+    ("bytes_written", pa.int64()),
+])
+
+
+@dataclass
+class Usage:
+    """What one stage's process cost; CPU and RSS are 0 where unmeasured."""
+
+    wall: float
+    cpu: float = 0.0
+    peak_rss: int = 0
+
+
+# ==============================================================================
+# MEASURING
+# ==============================================================================
+
+
+# Linux carries a process's peak RSS over exec(), so a stage started from the
+# runner would report at least the runner's own. A small launcher starts it
+# instead and reports its exit code, CPU seconds and ru_maxrss through a pipe.
+_LAUNCHER = """\
+import os, subprocess, sys
+proc = subprocess.Popen(sys.argv[2:])
+_, status, usage = os.wait4(proc.pid, 0)
+code = os.waitstatus_to_exitcode(status)
+cpu = usage.ru_utime + usage.ru_stime
+os.write(int(sys.argv[1]), f"{code} {cpu} {usage.ru_maxrss}".encode())
+"""
+
+
+def run_measured(args: list[str], cwd: Path) -> tuple[int, str, Usage]:
+    """Run a command to completion; its exit code, combined output and usage.
+
+    CPU time and peak RSS come from wait4(), so they include the command's
+    own child processes (e.g. a multiprocessing pool) once it has waited for
+    them, and cover only this command however many others run at the time.
+    Without wait4 (Windows) only wall time is measured.
+    """
+    start = time.perf_counter()
+    if not hasattr(os, "wait4"):
+        proc = subprocess.run(args, cwd=cwd, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, text=True)
+        return proc.returncode, proc.stdout, Usage(time.perf_counter() - start)
+    read_fd, write_fd = os.pipe()
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-c", _LAUNCHER, str(write_fd), *args],
+            cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, pass_fds=(write_fd,),
+        )
+    finally:
+        os.close(write_fd)
+    with os.fdopen(read_fd) as fh:
+        measured = fh.read().split()
+    wall = time.perf_counter() - start
+    if len(measured) != 3:
+        # The launcher itself failed; its output says why
+        return proc.returncode or 1, proc.stdout, Usage(wall)
+    code, cpu, rss = measured
+    return int(code), proc.stdout, Usage(wall, float(cpu), int(rss) * RSS_UNIT)
+
+
+def io_bytes(stage: Stage, since_ns: int) -> tuple[int, int]:
+    """Bytes of the stage's input files, and of its output files modified at
+    or after since_ns (a time.time_ns() taken when it started)."""
+    # Whole seconds, for filesystems with coarse timestamps
+    since_ns -= since_ns % 10**9
+    read = {p for spec in stage.reads for p in spec.files()}
+    written = {p for spec in stage.writes for p in spec.files()}
+    bytes_read = bytes_written = 0
+    for path in read | written:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue  # removed since it was listed, e.g. by a concurrent stage
+        if path in read:
+            bytes_read += st.st_size
+        if path in written and st.st_mtime_ns >= since_ns:
+            bytes_written += st.st_size
+    return bytes_read, bytes_written
+
+
+def git_commit(root: Path = ROOT) -> tuple[str | None, bool]:
+    """HEAD of the repository at root, and whether tracked files differ from
+    it; (None, False) outside a git checkout."""
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    try:
+        return git("rev-parse", "HEAD"), bool(
+            git("status", "--porcelain", "--untracked-files=no"))
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+# ==============================================================================
+# THE LEDGER
+# ==============================================================================
+
+
+class Ledger:
+    """The rows of one pipeline run, written to the ledger by save()."""
+
+    def __init__(self, jobs: int, directory: Path = LEDGER_DIR):
+        self.directory = directory
+        self.run = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.started = datetime.now(timezone.utc).replace(microsecond=0)
+        self.commit, self.dirty = git_commit()
+        self.jobs = jobs
+        self.rows: list[dict] = []
+
+    def record(self, stage: Stage, code: int, usage: Usage,
+               since_ns: int) -> None:
+        """Add a finished stage; since_ns is time.time_ns() at its start."""
+        bytes_read, bytes_written = io_bytes(stage, since_ns)
+        self.rows.append({
+            "run": self.run,
+            "started": self.started,
+            "commit": self.commit,
+            "dirty": self.dirty,
+            "host": platform.node(),
+            "jobs": self.jobs,
+            "stage": stage.name,
+            "status": "done" if code == 0 else "fail",
+            "exit_code": code,
+            "wall": round(usage.wall, 3),
+            "cpu": round(usage.cpu, 3),
+            "peak_rss": usage.peak_rss,
+            "bytes_read": bytes_read,
+            "bytes_written": bytes_written,
+        })
+
+    def save(self) -> Path | None:
+        """Write this run's rows as a new ledger file; None if no stage ran."""
+        if not self.rows:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"run-{self.run}.parquet"
+        tmp = path.with_name(f".{path.name}.tmp")
+        pq.write_table(pa.Table.from_pylist(self.rows, schema=SCHEMA), tmp)
+        os.replace(tmp, path)
+        return path
+
+
+def read_ledger(directory: Path = LEDGER_DIR) -> pa.Table:
+    """Every recorded stage run, oldest run first."""
+    files = sorted(directory.glob("run-*.parquet")) if directory.is_dir() else []
+    if not files:
+        return SCHEMA.empty_table()
+    table = pa.concat_tables(
+        [pq.read_table(f, schema=SCHEMA) for f in files])
+    return table.sort_by([("started", "ascending"), ("run", "ascending")])
+
+
+# ==============================================================================
+# REGRESSIONS
+# ==============================================================================
+
+
+@dataclass
+class Change:
+    """One metric of one stage against its baseline."""
+
+    stage: str
+    metric: str
+    value: float
+    baseline: float | None
+    history: int
+    flagged: bool = False
+
+    @property
+    def ratio(self) -> float | None:
+        if not self.baseline:
+            return None
+        return self.value / self.baseline
+
+
+@dataclass
+class RunReport:
+    """A run's stages, each metric set against the stage's history."""
+
+    run: str
+    commit: str | None
+    dirty: bool
+    changes: list[Change] = field(default_factory=list)
+
+    @property
+    def regressions(self) -> list[Change]:
+        return [c for c in self.changes if c.flagged]
+
+    def __str__(self) -> str:
+        commit = (self.commit or "no commit")[:12] + (" (dirty)" if self.dirty else "")
+        lines = [f"run {self.run} at {commit}"]
+        by_stage: dict[str, dict[str, Change]] = {}
+        for c in self.changes:
+            by_stage.setdefault(c.stage, {})[c.metric] = c
+        if not by_stage:
+            return lines[0] + ": no stages ran"
+        width = max(len(s) for s in by_stage)
+        lines.append(f"{'stage':<{width}}  " + "  ".join(
+            f"{label:>15}" for label in _LABELS.values()) + "  runs")
+        for stage, metrics in by_stage.items():
+            cells = [_cell(metrics[m]) for m in _LABELS]
+            runs = next(iter(metrics.values())).history
+            lines.append(f"{stage:<{width}}  " + "  ".join(
+                f"{cell:>15}" for cell in cells) + f"  {runs:>4}")
+        for c in self.regressions:
+            lines.append(
+                f"REGRESSION {c.stage}: {_LABELS[c.metric]} {_fmt(c)} vs median "
+                f"{_fmt(c, c.baseline)} of {c.history} runs (x{c.ratio:.2f})")
+        return "\n".join(lines)
+
+
+_LABELS = {
+    "wall": "wall s", "cpu": "cpu s", "peak_rss": "peak MB",
+    "bytes_read": "read MB", "bytes_written": "written MB",
+}
+
+
+def _fmt(change: Change, value: float | None = None) -> str:
+    value = change.value if value is None else value
+    if change.metric in ("wall", "cpu"):
+        return f"{value:.1f}"
+    return f"{value / 2**20:.1f}"
+
+
+def _cell(change: Change) -> str:
+    if change.ratio is None:
+        return _fmt(change)
+    mark = "!" if change.flagged else " "
+    return f"{_fmt(change)} {change.ratio - 1:+4.0%}{mark}"
+
+
+def compare(ledger: pa.Table, run: str | None = None, history: int = HISTORY,
+            threshold: float = THRESHOLD) -> RunReport:
+    """Each stage of `run` (default the latest) against the median of its
+    last `history` successful runs before it on the same host."""
+    rows = ledger.to_pylist()
+    if not rows:
+        raise ValueError("the ledger is empty; run the pipeline first")
+    run = run or rows[-1]["run"]
+    current = [r for r in rows if r["run"] == run]
+    if not current:
+        raise ValueError(f"no run {run!r} in the ledger")
+    first = current[0]
+    report = RunReport(run, first["commit"], first["dirty"])
+
+    for row in current:
+        past = [
+            r for r in rows
+            if r["stage"] == row["stage"] and r["host"] == row["host"]
+            and r["status"] == "done" and r["started"] < first["started"]
+        ][-history:]
+        for metric, floor in MIN_CHANGE.items():
+            value = row[metric]
+            values = sorted(r[metric] for r in past)
+            baseline = _median(values) if values else None
+            flagged = (
+                baseline is not None and row["status"] == "done"
+                and value > baseline * threshold and value - baseline > floor
+            )
+            report.changes.append(
+                Change(row["stage"], metric, value, baseline, len(past), flagged))
+    return report
+
+
+def _median(values: list[float]) -> float:
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m mypipeline.ledger",
+        description="Compare a pipeline run's per-stage time, memory and I/O "
+                    "with the stages' earlier runs and flag regressions; "
+                    "exits 1 if any.",
+    )
+    parser.add_argument("--run", help="Run id (a ledger file's name without "
+                                      "run- and .parquet); default the latest")
+    parser.add_argument("--history", type=int, default=HISTORY,
+                        help=f"Earlier runs per stage to compare with "
+                             f"(default {HISTORY})")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"Ratio to the median that counts as a regression "
+                             f"(default {THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    try:
+        report = compare(read_ledger(), args.run, max(1, args.history),
+                         args.threshold)
+    except ValueError as e:
+        parser.error(str(e))
+    print(report)
+    return 1 if report.regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
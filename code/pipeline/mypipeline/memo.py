@@ -0,0 +1,476 @@
+"""Memoize expensive pure functions on the content of their arguments.
+
+    from mypipeline.memo import memoize
+
+    @memoize
+    def clean_survey(raw: pd.DataFrame, year: int) -> pd.DataFrame: ...
+
+A call is keyed by the function's source code and a fingerprint of its bound
+arguments. DataFrames, Series and arrays are fingerprinted by hashing their
+buffers (no pickling, no copies of contiguous numeric data), so keying a call
+on a large frame costs a pass over its memory. Results are kept in a
+process-wide, size-bounded LRU and, when they are a DataFrame, Series or
+array, in a Parquet store under data/intermediate/.memo/ that later runs and
+other stages share. Editing a function's source invalidates its entries.
+
+Results are shared, not copied: treat them as read-only, as with
+functools.cache. Arrays are returned as read-only views, whichever tier served
+them; the array the function returned (perhaps one it was passed) stays
+writable. Only the decorated function's own source is tracked; a change to a
+helper it calls needs cache_clear().
+
+Hit/miss counts are on each wrapper (``clean_survey.cache_info()``) and for all
+memoized functions in the process (``cache_info()``, ``report()``).
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mypackage.config import INTERMEDIATE
+
+# Dot-directories are never pipeline data (see mypipeline.stages), so the store
+# does not make stages reading data/intermediate/ look stale
+STORE_DIR = INTERMEDIATE / ".memo"
+MEMORY_BYTES = 1 * 2**30
+DISK_BYTES = 8 * 2**30
+
+# Schema metadata key recording how to rebuild a stored result
+META_KEY = b"mypackage.memo"
+
+
+@dataclass
+class CacheInfo:
+    """Counters for one memoized function (or, summed, for all of them)."""
+
+    hits: int = 0  # served from memory
+    disk_hits: int = 0  # served from the Parquet store
+    misses: int = 0  # computed
+    uncacheable: int = 0  # arguments could not be fingerprinted; computed
+    evictions: int = 0  # dropped from memory to stay within MEMORY_BYTES
+    seconds_saved: float = 0.0  # compute time of the calls served from cache
+
+    def __add__(self, other: "CacheInfo") -> "CacheInfo":
+        return CacheInfo(*(a + b for a, b in
+                           zip(asdict(self).values(), asdict(other).values())))
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.hits + self.disk_hits + self.misses + self.uncacheable
+        return (self.hits + self.disk_hits) / calls if calls else 0.0
+
+
+class Unfingerprintable(TypeError):
+    """An argument has no stable content fingerprint."""
+
+
+# ==============================================================================
+# FINGERPRINTS
+# ==============================================================================
+
+
+def _types(h, values) -> None:
+    """The type of each element of object data, which pandas' hashes ignore:
+    they hash [1, 2] as ['1', '2'], and None as NaN."""
+    if pd.api.types.infer_dtype(values, skipna=False) == "string":
+        h.update(b"str|")  # all str, the common case, without a pass in Python
+        return
+    codes, types = pd.factorize(np.fromiter(map(type, values), dtype=object,
+                                            count=len(values)))
+    h.update(" ".join(t.__qualname__ for t in types).encode() + b"|")
+    h.update(np.ascontiguousarray(codes).view(np.uint8))
+
+
+def _array(h, a: np.ndarray) -> None:
+    h.update(f"ndarray {a.dtype.str} {a.shape}|".encode())
+    if a.dtype.hasobject:
+        _types(h, a.ravel())
+        a = pd.util.hash_array(a.ravel())
+    h.update(np.ascontiguousarray(a).reshape(-1).view(np.uint8))
+
+
+def _values(h, values: pd.Series | pd.Index) -> None:
+    h.update(f"{values.dtype}|".encode())
+    if isinstance(values, pd.Index):
+        _update(h, list(values.names))
+    if isinstance(values, pd.RangeIndex):
+        h.update(f"{values.start} {values.stop} {values.step}|".encode())
+    elif isinstance(values, pd.MultiIndex):
+        for level, codes in zip(values.levels, values.codes):
+            _values(h, level)
+            _array(h, codes)
+    elif isinstance(values.dtype, np.dtype) and not values.dtype.hasobject:
+        _array(h, values.to_numpy())
+    elif isinstance(values.dtype, pd.CategoricalDtype):
+        _values(h, values.array.categories)
+        _array(h, values.array.codes)
+    else:
+        # Extension, string and object data: pandas' vectorized row hash,
+        # itself hashed as a buffer
+        if values.dtype == object:
+            _types(h, values.to_numpy())
+        hashed = pd.util.hash_pandas_object(values, index=False)
+        _array(h, hashed.to_numpy())
+
+
+def _update(h, obj) -> None:
+    """Feed a type-tagged encoding of obj's content to the hash h."""
+    if obj is None or isinstance(obj, (bool, int, float, complex, str)):
+        h.update(f"{type(obj).__name__} {obj!r}|".encode())
+    elif isinstance(obj, bytes):
+        h.update(f"bytes {len(obj)}|".encode())
+        h.update(obj)
+    elif isinstance(obj, pd.DataFrame):
+        h.update(f"DataFrame {obj.shape}|".encode())
+        _values(h, obj.columns)
+        _values(h, obj.index)
+        for i in range(obj.shape[1]):
+            _values(h, obj.iloc[:, i])
+    elif isinstance(obj, pd.Series):
+        h.update(b"Series|")
+        _update(h, obj.name)
+        _values(h, obj.index)
+        _values(h, obj)
+    elif isinstance(obj, pd.Index):
+        h.update(b"Index|")
+        _values(h, obj)
+    elif isinstance(obj, (np.ndarray, np.generic)):
+        _array(h, np.asarray(obj))
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__} {len(obj)}|".encode())
+        for item in obj:
+            _update(h, item)
+    elif isinstance(obj, dict):
+        h.update(f"dict {len(obj)}|".encode())
+        for key, value in obj.items():
+            _update(h, key)
+            _update(h, value)
+    elif isinstance(obj, (set, frozenset)):
+        h.update(f"set {len(obj)}|".encode())
+        for digest in sorted(fingerprint(item) for item in obj):
+            h.update(digest.encode())
+    elif isinstance(obj, Path):
+        h.update(f"Path {obj}|".encode())
+    else:
+        try:
+            payload = pickle.dumps(obj, protocol=5)
+        except Exception as e:
+            raise Unfingerprintable(
+                f"cannot fingerprint {type(obj).__name__}: {e}") from e
+        h.update(f"pickle {type(obj).__qualname__}|".encode())
+        h.update(payload)
+
+
+def fingerprint(obj) -> str:
+    """Content hash of obj: equal for equal data, regardless of identity."""
+    h = hashlib.sha256()  # hardware-accelerated on current CPUs
+    _update(h, obj)
+    return h.hexdigest()[:32]
+
+
+def source_hash(func) -> str:
+    """Hash of func's source code (its bytecode if the source is unavailable)."""
+    try:
+        source = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        code = func.__code__
+        source = code.co_code + repr(code.co_consts).encode()
+    return hashlib.sha256(source).hexdigest()[:16]
+
+
+def _read_only(value):
+    """A read-only view of value if it is an array, so every tier serves it
+    alike without freezing the array itself, which may be the caller's."""
+    if isinstance(value, np.ndarray) and value.flags.writeable:
+        value = value.view()
+        value.flags.writeable = False
+    return value
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# ==============================================================================
+# MEMORY AND DISK TIERS
+# ==============================================================================
+
+
+class MemoryLRU:
+    """Results by key, least recently used evicted beyond max_bytes."""
+
+    def __init__(self, max_bytes: int = MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """(value, seconds it took to compute, CacheInfo) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[2], entry[3]
+
+    def put(self, key: str, value, seconds: float, info: CacheInfo) -> None:
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, size, seconds, info)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, dropped, _, owner) = self._entries.popitem(last=False)
+                self.bytes -= dropped
+                owner.evictions += 1
+
+    def discard(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self.bytes -= self._entries.pop(key)[1]
+
+
+def _encode(value) -> pa.Table | None:
+    """value as an Arrow table with rebuild instructions, or None."""
+    if isinstance(value, pd.DataFrame):
+        if not all(isinstance(c, str) for c in value.columns):
+            return None  # Arrow would turn the labels into strings
+        table, meta = pa.Table.from_pandas(value), {"kind": "DataFrame"}
+    elif isinstance(value, pd.Series):
+        json.dumps(value.name)  # names must survive the metadata round trip
+        table = pa.Table.from_pandas(value.to_frame(name="values"))
+        meta = {"kind": "Series", "name": value.name}
+    elif isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        table = pa.table({"values": value.reshape(-1)})
+        meta = {"kind": "ndarray", "dtype": value.dtype.str,
+                "shape": list(value.shape)}
+    else:
+        return None
+    return table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        META_KEY: json.dumps(meta).encode(),
+    })
+
+
+def _hashable(value):
+    """A name as it was before JSON turned its tuples into lists."""
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _decode(table: pa.Table):
+    meta = json.loads(table.schema.metadata[META_KEY])
+    if meta["kind"] == "DataFrame":
+        return table.to_pandas()
+    if meta["kind"] == "Series":
+        return table.to_pandas()["values"].rename(_hashable(meta["name"]))
+    values = table.column("values").to_numpy()
+    return values.astype(meta["dtype"], copy=False).reshape(meta["shape"])
+
+
+class ParquetStore:
+    """Results as one Parquet file per call:
+    <root>/<function>/<source hash>/<call key>.parquet.
+
+    Least recently used files (by mtime, refreshed on every hit) are removed
+    once the store exceeds max_bytes. Writes are atomic, so concurrent
+    pipeline stages can share a store.
+    """
+
+    def __init__(self, root: Path = STORE_DIR, max_bytes: int = DISK_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def load(self, path: Path):
+        """(value, seconds it took to compute) or None."""
+        try:
+            table = pq.read_table(path)
+            os.utime(path)
+        except (OSError, pa.ArrowException):
+            return None
+        seconds = float(table.schema.metadata.get(b"seconds", b"0"))
+        return _decode(table), seconds
+
+    def save(self, path: Path, value, seconds: float) -> None:
+        try:
+            table = _encode(value)
+        except (TypeError, ValueError, pa.ArrowException):
+            return
+        if table is None:
+            return
+        table = table.replace_schema_metadata({
+            **table.schema.metadata, b"seconds": str(seconds).encode(),
+        })
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+        self.evict()
+
+    def invalidate(self, function_dir: Path, keep: str) -> None:
+        """Remove entries written by other versions of a function's source."""
+        if not function_dir.is_dir():
+            return
+        for version in function_dir.iterdir():
+            if version.name != keep:
+                shutil.rmtree(version, ignore_errors=True)
+
+    def evict(self) -> None:
+        files = []
+        for path in self.root.rglob("*.parquet"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime_ns, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+MEMORY = MemoryLRU()
+STORE = ParquetStore()
+
+# Every memoized function in this process, by qualified name
+_REGISTRY: dict[str, Callable] = {}
+
+
+# ==============================================================================
+# DECORATOR AND STATISTICS
+# ==============================================================================
+
+
+def memoize(func=None, *, disk: bool = True, store: ParquetStore | None = None):
+    """Cache func's results on the content of its arguments.
+
+    Use as ``@memoize`` or ``@memoize(disk=False)`` (memory only, e.g. for
+    results that are cheap to recompute but costly to store). The wrapper has
+    cache_info(), cache_clear() and __wrapped__ for an uncached call.
+    """
+    if func is None:
+        return functools.partial(memoize, disk=disk, store=store)
+
+    name = f"{func.__module__}.{func.__qualname__}"
+    signature = inspect.signature(func)
+    source = source_hash(func)
+    prefix = f"{name}:{source}:"
+    info = CacheInfo()
+    invalidated = False
+
+    def _store() -> ParquetStore | None:
+        return (store or STORE) if disk else None
+
+    def _path(key: str) -> Path:
+        folder = re.sub(r"[^\w.]+", "_", name)
+        return _store().root / folder / source / f"{key}.parquet"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal invalidated
+        try:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = fingerprint(tuple(bound.arguments.items()))
+        except Unfingerprintable:
+            info.uncacheable += 1
+            return func(*args, **kwargs)
+
+        cached = MEMORY.get(prefix + key)
+        if cached is not None:
+            info.hits += 1
+            info.seconds_saved += cached[1]
+            return cached[0]
+
+        disk_store = _store()
+        if disk_store is not None:
+            if not invalidated:
+                disk_store.invalidate(_path(key).parent.parent, keep=source)
+                invalidated = True
+            loaded = disk_store.load(_path(key))
+            if loaded is not None:
+                value, seconds = loaded
+                value = _read_only(value)
+                info.disk_hits += 1
+                info.seconds_saved += seconds
+                MEMORY.put(prefix + key, value, seconds, info)
+                return value
+
+        start = time.perf_counter()
+        value = _read_only(func(*args, **kwargs))
+        seconds = time.perf_counter() - start
+        info.misses += 1
+        MEMORY.put(prefix + key, value, seconds, info)
+        if disk_store is not None:
+            disk_store.save(_path(key), value, seconds)
+        return value
+
+    def cache_info() -> CacheInfo:
+        return CacheInfo(**asdict(info))
+
+    def cache_clear() -> None:
+        """Drop this function's results from memory and disk."""
+        MEMORY.discard(prefix)
+        if disk:
+            shutil.rmtree(_path("-").parent.parent, ignore_errors=True)
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    _REGISTRY[name] = wrapper
+    return wrapper
+
+
+def cache_info() -> dict[str, CacheInfo]:
+    """Counters of every memoized function called (or defined) so far."""
+    return {name: wrapper.cache_info() for name, wrapper in _REGISTRY.items()}
+
+
+def report() -> str:
+    """Hit/miss table of the memoized functions, for a script to print."""
+    rows = [(name, info) for name, info in cache_info().items()
+            if info.hits + info.disk_hits + info.misses + info.uncacheable]
+    if not rows:
+        return "memo: no memoized calls"
+    total = sum((info for _, info in rows), CacheInfo())
+    width = max(len(name) for name, _ in rows + [("total", total)])
+    lines = [f"{'function':<{width}}  {'mem':>5} {'disk':>5} {'miss':>5} "
+             f"{'uncache':>7} {'evict':>5} {'saved':>8}"]
+    for name, info in rows + [("total", total)]:
+        lines.append(
+            f"{name:<{width}}  {info.hits:>5} {info.disk_hits:>5} "
+            f"{info.misses:>5} {info.uncacheable:>7} {info.evictions:>5} "
+            f"{info.seconds_saved:>7.1f}s"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+"""Build the paper incrementally, and its subfiles as standalone previews.
+
+Usage:
+    python -m mypipeline.paper                # main.tex and every subfile
+    python -m mypipeline.paper --main-only    # just paper/main.pdf
+    python -m mypipeline.paper 01-introduction --jobs 2
+    python -m mypipeline.paper --clean        # drop the build cache
+
+A plain ``latexmk main.tex`` in paper/ stays a clean build: .latexmkrc deletes
+its aux files on success. Here latexmk runs with PAPER_BUILD_CACHE set, which
+makes .latexmkrc keep each target's aux/bbl/fdb files in its own directory of
+a cache outside the tree (CACHE), so latexmk's dependency database survives
+between builds and only targets whose sources, bib entries, figures or tables
+changed are recompiled. Each paper/sections/*.tex and paper/appendices/*.tex
+is also compiled on its own, in parallel with main.tex; those previews go to
+CACHE/previews/.
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from mypackage.config import ROOT
+
+PAPER = ROOT / "paper"
+MAIN = PAPER / "main.tex"
+SUBFILE_DIRS = ("sections", "appendices")
+# One cache per checkout, so clones of the project do not share aux files
+CACHE = (Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+         / "mypackage-latex"
+         / hashlib.sha256(str(ROOT).encode()).hexdigest()[:12])
+LATEXMK = ["latexmk", "-cd", "-interaction=nonstopmode", "-halt-on-error",
+           "-file-line-error"]
+# What latexmk prints when it had nothing to rebuild
+UP_TO_DATE = ("are up-to-date", "Nothing to do for")
+
+
+def subfiles() -> list[Path]:
+    return sorted(p for d in SUBFILE_DIRS for p in (PAPER / d).glob("*.tex"))
+
+
+def _stem(target: Path) -> str:
+    return target.relative_to(PAPER).with_suffix("").as_posix()
+
+
+def build(target: Path) -> tuple[int, str, float]:
+    """Run latexmk on one target with its cached aux directory."""
+    stem = _stem(target)
+    command = [*LATEXMK]
+    if target != MAIN:
+        command.append(f"-outdir={CACHE / 'previews' / Path(stem).parent}")
+    env = dict(os.environ, PAPER_BUILD_CACHE=str(CACHE / "aux" / stem))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [*command, str(target.relative_to(PAPER))],
+        cwd=PAPER,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    return proc.returncode, proc.stdout, time.perf_counter() - start
+
+
+def _rebuilt(output: str) -> bool:
+    return not any(line in output for line in UP_TO_DATE)
+
+
+def build_paper(targets: list[Path], jobs: int) -> int:
+    """Build targets, up to `jobs` at a time; returns the number that failed."""
+    failed = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(build, target): target for target in targets}
+        for future in as_completed(futures):
+            target = futures[future]
+            code, output, seconds = future.result()
+            if code != 0:
+                failed += 1
+                print(f"[FAIL] {_stem(target)} (exit {code} after {seconds:.1f}s)")
+                tail = output.rstrip().splitlines()[-20:]
+                print("\n".join(f"    {line}" for line in tail), flush=True)
+                continue
+            status = "done" if _rebuilt(output) else "skip"
+            where = (PAPER / "main.pdf" if target == MAIN
+                     else CACHE / "previews" / f"{_stem(target)}.pdf")
+            print(f"[{status}] {_stem(target)} ({seconds:.1f}s) -> {where}",
+                  flush=True)
+    return failed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m mypipeline.paper",
+        description="Build paper/main.tex and each section and appendix on its "
+                    "own, in parallel, keeping latexmk's state in a cache "
+                    "outside the tree so unchanged targets are not rebuilt.",
+    )
+    parser.add_argument("targets", nargs="*", metavar="SUBFILE",
+                        help="Subfiles to build by name (e.g. 01-introduction); "
+                             "default main.tex and all subfiles")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Builds to run at once (default: one per core)")
+    parser.add_argument("--main-only", action="store_true",
+                        help="Build only main.tex")
+    parser.add_argument("--clean", action="store_true",
+                        help=f"Delete the build cache ({CACHE}) and exit")
+    args = parser.parse_args(argv)
+
+    if args.clean:
+        shutil.rmtree(CACHE, ignore_errors=True)
+        return 0
+    if shutil.which("latexmk") is None:
+        parser.error("latexmk not found on PATH")
+
+    if args.main_only:
+        targets = [MAIN]
+    elif args.targets:
+        by_name = {p.stem: p for p in subfiles()} | {_stem(p): p for p in subfiles()}
+        unknown = [t for t in args.targets if t not in by_name]
+        if unknown:
+            parser.error(f"unknown subfiles: {', '.join(unknown)}")
+        targets = [by_name[t] for t in args.targets]
+    else:
+        targets = [MAIN, *subfiles()]
+    return 1 if build_paper(targets, max(1, args.jobs)) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Stream raw data as Arrow record batches without loading whole files.
+
+    from mypipeline.raw import scan
+
+    for batch in scan("census/persons.csv", columns=["id", "age", "state"],
+                      filters=[("age", ">=", 18)]):
+        ...
+
+Sources are paths relative to RAW (or to the ``root`` given instead), or
+absolute paths inside it; a directory is scanned as one dataset, with
+hive-style ``key=value`` partitions. Parquet and Feather/Arrow IPC are read
+through pyarrow.dataset: only the requested columns are decoded, the filter is
+applied inside the scan, and Parquet row groups whose statistics rule the
+filter out are skipped. CSV (also compressed, and .tsv) goes through Arrow's
+streaming CSV reader, which converts only the needed columns and, unlike a
+dataset scan, reads a fixed number of blocks ahead. Stata and Excel have no
+Arrow reader and are read in chunks of batch_size rows (pandas' chunked Stata
+reader, openpyxl's read-only mode). Streamed chunks are filtered and projected
+with the same Arrow expression, so every format behaves alike and peak memory
+stays bounded by the chunk or block size.
+
+Filters are a pyarrow compute expression or, like pandas.read_parquet, a list
+of (column, op, value) tuples (a list of such lists means OR). The tuple form
+also lets the chunked readers skip columns that are neither projected nor
+filtered on.
+
+Nothing here opens a file for writing: raw data is read, never modified.
+"""
+
+import os
+from collections.abc import Iterator
+from contextlib import closing
+from itertools import chain
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from mypackage.config import RAW
+
+BATCH_ROWS = 128 * 1024
+# Bytes of CSV text parsed at a time. The streaming reader keeps a few dozen
+# blocks in flight, so this sets peak memory for CSV (about 40 MB).
+CSV_BLOCK_BYTES = 2**20
+# Batches and files decoded ahead of the consumer
+BATCH_READAHEAD = 2
+FRAGMENT_READAHEAD = 1
+
+# File suffix -> format. Compressed CSVs are matched on their inner suffix.
+FORMATS = {
+    ".csv": "csv", ".tsv": "tsv",
+    ".parquet": "parquet", ".pq": "parquet",
+    ".feather": "ipc", ".arrow": "ipc", ".ipc": "ipc",
+    ".dta": "stata",
+    ".xlsx": "excel", ".xlsm": "excel",
+}
+COMPRESSED_SUFFIXES = {".gz", ".bz2", ".zst", ".lz4"}
+# Formats read by streaming chunks rather than through a dataset scan
+CHUNKED_FORMATS = {"csv", "tsv", "stata", "excel"}
+
+
+def resolve(source: str | Path, root: Path = RAW) -> Path:
+    """Absolute path of a raw source; it must exist and lie inside root."""
+    path = Path(source)
+    if not path.is_absolute():
+        path = root / path
+    # Normalized, not resolved: raw files may be symlinks to a data drive
+    path = Path(os.path.normpath(path))
+    if not path.is_relative_to(os.path.normpath(root)):
+        raise ValueError(f"{source} is not inside {root}")
+    if not path.exists():
+        raise FileNotFoundError(path)
+    return path
+
+
+def file_format(path: Path) -> str:
+    """Format of a file, or of the files in a directory, from the suffix."""
+    if path.is_dir():
+        for child in sorted(path.rglob("*")):
+            if child.is_file() and not child.name.startswith((".", "_")):
+                return file_format(child)
+        raise ValueError(f"{path} contains no data files")
+    suffixes = [s.lower() for s in path.suffixes]
+    if suffixes and suffixes[-1] in COMPRESSED_SUFFIXES:
+        suffixes.pop()
+    fmt = FORMATS.get(suffixes[-1]) if suffixes else None
+    if fmt is None:
+        raise ValueError(f"unsupported raw format: {path.name}")
+    return fmt
+
+
+def _expression(filters) -> pc.Expression | None:
+    if filters is None or isinstance(filters, pc.Expression):
+        return filters
+    return pq.filters_to_expression(filters)
+
+
+def _filter_columns(filters) -> list[str] | None:
+    """Columns a tuple-form filter refers to; None if not knowable."""
+    if filters is None:
+        return []
+    if isinstance(filters, pc.Expression):
+        return None
+    terms = [t for group in filters
+             for t in (group if isinstance(group, list) else [group])]
+    return [term[0] for term in terms]
+
+
+def _scan_options(fmt: str) -> dict:
+    if fmt == "parquet":
+        # Pre-buffering fetches every selected column chunk of a file up front
+        return {"fragment_scan_options":
+                ds.ParquetFragmentScanOptions(pre_buffer=False)}
+    return {}
+
+
+# ==============================================================================
+# CHUNKED READERS
+# ==============================================================================
+
+
+def _csv_batches(path: Path, fmt: str, columns: list[str] | None,
+                 schema: pa.Schema | None) -> Iterator[pa.RecordBatch]:
+    if path.is_file():
+        files = [(path, {})]
+    else:
+        # Only used to list the files and parse their partition keys
+        dataset = ds.dataset(path, format="csv", partitioning="hive")
+        files = [(Path(f.path), ds.get_partition_keys(f.partition_expression))
+                 for f in dataset.get_fragments()]
+    for file, keys in files:
+        convert = pacsv.ConvertOptions(
+            include_columns=(None if columns is None
+                             else [c for c in columns if c not in keys]),
+            column_types=({f.name: f.type for f in schema} if schema else None),
+        )
+        with pacsv.open_csv(
+            file,
+            read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+            parse_options=pacsv.ParseOptions(delimiter="\t" if fmt == "tsv"
+                                              else ","),
+            convert_options=convert,
+        ) as reader:
+            for batch in reader:
+                extra = [k for k in keys if columns is None or k in columns]
+                if extra:
+                    batch = pa.RecordBatch.from_arrays(
+                        batch.columns + [pa.array([keys[k]] * batch.num_rows)
+                                         for k in extra],
+                        names=batch.schema.names + extra,
+                    )
+                yield batch
+
+
+def _stata_batches(path: Path, columns: list[str] | None,
+                   batch_size: int) -> Iterator[pa.RecordBatch]:
+    with pd.read_stata(path, columns=columns, chunksize=batch_size) as reader:
+        for chunk in reader:
+            yield pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+
+
+def _excel_column(values: list) -> pa.Array:
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed cell types in one column: keep them all, as text
+        return pa.array([None if v is None else str(v) for v in values])
+
+
+def _excel_batches(path: Path, columns: list[str] | None, batch_size: int,
+                   sheet: str | None) -> Iterator[pa.RecordBatch]:
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = [f"column_{i}" if name is None else str(name)
+                  for i, name in enumerate(next(rows, ()))]
+        missing = set(columns or ()) - set(header)
+        if missing:
+            raise KeyError(f"{path.name} has no columns {sorted(missing)}")
+        keep = [(i, name) for i, name in enumerate(header)
+                if columns is None or name in columns]
+
+        chunk = []
+        for row in chain(rows, [None]):
+            if row is not None:
+                chunk.append(row)
+            if chunk and (row is None or len(chunk) == batch_size):
+                yield pa.RecordBatch.from_arrays(
+                    [_excel_column([r[i] if i < len(r) else None for r in chunk])
+                     for i, _ in keep],
+                    names=[name for _, name in keep],
+                )
+                chunk = []
+    finally:
+        workbook.close()
+
+
+def _chunks(path: Path, fmt: str, columns: list[str] | None, batch_size: int,
+            sheet: str | None,
+            schema: pa.Schema | None = None) -> Iterator[pa.RecordBatch]:
+    if fmt in ("csv", "tsv"):
+        return _csv_batches(path, fmt, columns, schema)
+    if fmt == "stata":
+        return _stata_batches(path, columns, batch_size)
+    return _excel_batches(path, columns, batch_size, sheet)
+
+
+def _conform(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    """Cast a chunk to the stream's schema (that of the first chunk)."""
+    if batch.schema.equals(schema):
+        return batch
+    try:
+        arrays = [
+            batch.column(field.name).cast(field.type)
+            if field.name in batch.schema.names
+            else pa.nulls(batch.num_rows, field.type)
+            for field in schema
+        ]
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(
+            f"chunk types differ from the first chunk's ({e}); pass schema= "
+            "to fix the column types") from e
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+# ==============================================================================
+# PUBLIC API
+# ==============================================================================
+
+
+def scan(source: str | Path, columns: list[str] | None = None, filters=None,
+         batch_size: int = BATCH_ROWS, schema: pa.Schema | None = None,
+         sheet: str | None = None,
+         root: Path = RAW) -> Iterator[pa.RecordBatch]:
+    """Record batches of a raw file or directory, read a bounded chunk at a time.
+
+    Args:
+        source: Path relative to RAW, or an absolute path inside it.
+        columns: Columns to return, in this order; all if None.
+        filters: Row filter, as an expression or (column, op, value) tuples.
+        batch_size: Maximum rows per batch (and per chunk read from Stata/Excel).
+        schema: Column types to read with, instead of inferring them from the
+            first block or chunk; needed when later rows do not fit the
+            inferred types.
+        sheet: Excel sheet name; the first sheet if None.
+        root: The raw data directory sources must lie in.
+    """
+    path = resolve(source, root)
+    fmt = file_format(path)
+    expression = _expression(filters)
+
+    if fmt not in CHUNKED_FORMATS:
+        dataset = ds.dataset(
+            path, format=fmt, schema=schema,
+            partitioning="hive" if path.is_dir() else None,
+        )
+        yield from dataset.to_batches(
+            columns=columns, filter=expression, batch_size=batch_size,
+            batch_readahead=BATCH_READAHEAD,
+            fragment_readahead=FRAGMENT_READAHEAD, **_scan_options(fmt),
+        )
+        return
+
+    needed = _filter_columns(filters)
+    read_columns = (None if columns is None or needed is None
+                    else list(dict.fromkeys(columns + needed)))
+    chunks = _chunks(path, fmt, read_columns, batch_size, sheet, schema)
+    stream_schema = schema
+    with closing(chunks):
+        for chunk in chunks:
+            stream_schema = stream_schema or chunk.schema
+            table = pa.Table.from_batches([_conform(chunk, stream_schema)])
+            if expression is not None:
+                table = table.filter(expression)
+            if columns is not None:
+                table = table.select(columns)
+            yield from table.to_batches(max_chunksize=batch_size)
+
+
+def scan_frames(source: str | Path, **kwargs) -> Iterator[pd.DataFrame]:
+    """scan(), one pandas DataFrame per batch."""
+    for batch in scan(source, **kwargs):
+        yield batch.to_pandas()
+
+
+def read_schema(source: str | Path, sheet: str | None = None,
+                root: Path = RAW) -> pa.Schema:
+    """Column names and types of a raw source, reading at most one chunk."""
+    path = resolve(source, root)
+    fmt = file_format(path)
+    if fmt not in CHUNKED_FORMATS:
+        return ds.dataset(path, format=fmt,
+                          partitioning="hive" if path.is_dir() else None).schema
+    with closing(_chunks(path, fmt, None, 1024, sheet)) as chunks:
+        first = next(chunks, None)
+    return first.schema if first is not None else pa.schema([])
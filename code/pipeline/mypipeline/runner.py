@@ -0,0 +1,319 @@
+"""Run the numbered pipeline as a dependency graph.
+
+Stages run as soon as the stages they depend on (see stages.build_graph) have
+finished, up to --jobs at a time, each in its own interpreter. A stage is
+skipped when the hashes of its source files and input files match those of its
+last successful run and its outputs still exist; a stage whose upstream reran
+but produced byte-identical files is therefore skipped too.
+
+Usage:
+    python -m mypipeline                 # everything that is stale
+    python -m mypipeline 04 05_figures   # these, plus what they need
+    python -m mypipeline --dry-run       # inferred I/O and the plan
+    python -m mypipeline --force --jobs 4
+
+Each run's per-stage time, peak memory and I/O go to the ledger (see
+mypipeline.ledger), and stages that got markedly slower or larger than in
+earlier runs are listed at the end.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from mypackage.config import PIPELINE_STATE, ROOT
+from mypipeline.ledger import Ledger, Usage, compare, read_ledger, run_measured
+from mypipeline.stages import Stage, build_graph, discover
+
+STATE_FILE = PIPELINE_STATE / "state.json"
+STATE_VERSION = 1
+
+# Files modified this recently are re-hashed even if their stat matches, since
+# a second write within the same mtime tick would otherwise go unnoticed.
+RACY_WINDOW_NS = 2 * 10**9
+CHUNK_BYTES = 1 << 20
+
+
+class State:
+    """What the last successful run of each stage saw.
+
+    Kept in PIPELINE_STATE/state.json: per stage, the key (hash of its sources
+    and inputs) it ran with; per file, (mtime_ns, size) → sha256 so unchanged
+    inputs are not re-read on every run.
+    """
+
+    def __init__(self, path: Path = STATE_FILE):
+        self.path = path
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") != STATE_VERSION:
+            data = {}
+        self.stages: dict[str, dict] = data.get("stages", {})
+        self.files: dict[str, list] = data.get("files", {})
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        live = {str(p) for p in _tracked_files(self.stages)}
+        payload = {
+            "version": STATE_VERSION,
+            "stages": self.stages,
+            "files": {k: v for k, v in self.files.items() if k in live},
+        }
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, indent=1, sort_keys=True),
+                       encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def digest(self, path: Path) -> str:
+        st = path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = self.files.get(str(path))
+        if entry is not None and entry[:2] == stamp:
+            return entry[2]
+        sha = hashlib.sha256()
+        with path.open("rb") as fh:
+            while chunk := fh.read(CHUNK_BYTES):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        if time.time_ns() - st.st_mtime_ns > RACY_WINDOW_NS:
+            self.files[str(path)] = stamp + [digest]
+        else:
+            self.files.pop(str(path), None)
+        return digest
+
+    def key(self, stage: Stage) -> tuple[str, list[str]]:
+        """Hash of everything a stage's result depends on, and the files read."""
+        lines, files = [], []
+        for source in stage.sources:
+            lines.append(f"source {_rel(source)} {self.digest(source)}")
+        for spec in sorted(stage.reads):
+            matched = spec.files()
+            if not matched:
+                lines.append(f"input {spec} -")
+            for path in matched:
+                lines.append(f"input {_rel(path)} {self.digest(path)}")
+                files.append(str(path))
+        files += [str(s) for s in stage.sources]
+        key = hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+        return key, files
+
+    def up_to_date(self, stage: Stage, key: str) -> bool:
+        last = self.stages.get(stage.name)
+        if last is None or last["key"] != key:
+            return False
+        return all(spec.files() for spec in stage.outputs)
+
+    def record(self, stage: Stage, key: str, files: list[str],
+               seconds: float) -> None:
+        self.stages[stage.name] = {
+            "key": key,
+            "files": files,
+            "seconds": round(seconds, 3),
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+
+def _tracked_files(stages: dict[str, dict]) -> set[str]:
+    return {f for entry in stages.values() for f in entry.get("files", ())}
+
+
+def _rel(path: Path) -> str:
+    try:
+        return str(path.relative_to(ROOT))
+    except ValueError:
+        return str(path)
+
+
+# ==============================================================================
+# SELECTION AND PLANNING
+# ==============================================================================
+
+
+def select(stages: list[Stage], graph: dict[str, set[str]],
+           targets: list[str]) -> list[Stage]:
+    """The stages named by `targets` (number, stem or file name) and every
+    stage they transitively depend on; all stages if no targets."""
+    if not targets:
+        return stages
+    wanted = set()
+    for target in targets:
+        matched = [
+            s.name for s in stages
+            if target in (s.name, s.path.stem) or s.name.startswith(f"{target}_")
+        ]
+        if not matched:
+            raise ValueError(f"no stage matches {target!r}")
+        wanted.update(matched)
+    queue = list(wanted)
+    while queue:
+        for dep in graph[queue.pop()]:
+            if dep not in wanted:
+                wanted.add(dep)
+                queue.append(dep)
+    return [s for s in stages if s.name in wanted]
+
+
+def print_plan(stages: list[Stage], graph: dict[str, set[str]], state: State,
+               force: bool) -> None:
+    """Inferred I/O of each stage and whether a run would execute it."""
+    stale = set()
+    for stage in stages:
+        key, _ = state.key(stage)
+        upstream = graph[stage.name] & stale
+        if force or upstream or not state.up_to_date(stage, key):
+            stale.add(stage.name)
+            verdict = "run"
+        else:
+            verdict = "skip"
+        print(f"[{verdict:4}] {stage.name}")
+        if graph[stage.name]:
+            print(f"         after:   {', '.join(sorted(graph[stage.name]))}")
+        for label, specs in (("reads", stage.inputs), ("writes", stage.outputs),
+                             ("touches", stage.unknown)):
+            if specs:
+                listed = ", ".join(map(str, sorted(specs)))
+                print(f"         {label + ':':8} {listed}")
+
+
+# ==============================================================================
+# EXECUTION
+# ==============================================================================
+
+
+def run_stage(stage: Stage) -> tuple[int, str, Usage, int]:
+    """Run one stage as `python NN_name.py` from the project root; its exit
+    code, output, resource usage and start time (time.time_ns())."""
+    started_ns = time.time_ns()
+    code, output, usage = run_measured([sys.executable, str(stage.path)], ROOT)
+    return code, output, usage, started_ns
+
+
+def _report(status: str, stage: Stage, detail: str, output: str = "") -> None:
+    print(f"[{status:4}] {stage.name} ({detail})", flush=True)
+    if output:
+        print("\n".join(f"    {line}" for line in output.rstrip().splitlines()),
+              flush=True)
+
+
+def _finish(stage: Stage, result: tuple[int, str, Usage, int], state: State,
+            ledger: Ledger | None = None) -> bool:
+    code, output, usage, started_ns = result
+    seconds = usage.wall
+    if ledger is not None:
+        ledger.record(stage, code, usage, started_ns)
+    if code != 0:
+        _report("FAIL", stage, f"exit {code} after {seconds:.1f}s", output)
+        return False
+    # Hashed after the run: inputs are unchanged by then (nothing running
+    # concurrently writes them), and a path the stage both reads and writes
+    # is recorded as it left it
+    key, files = state.key(stage)
+    state.record(stage, key, files, seconds)
+    state.save()
+    _report("done", stage, f"{seconds:.1f}s", output)
+    return True
+
+
+def run_pipeline(stages: list[Stage], graph: dict[str, set[str]], state: State,
+                 jobs: int, force: bool = False, keep_going: bool = False,
+                 ledger: Ledger | None = None) -> int:
+    """Run `stages` respecting `graph`; returns the number of failed stages.
+
+    A stage's up-to-date check happens once its dependencies are done, so it
+    sees what they wrote. After a failure no further stage starts, unless
+    `keep_going`, in which case only the stages downstream of it are dropped.
+    Every stage that ran, failed or not, is recorded in `ledger`.
+    """
+    names = {s.name for s in stages}
+    pending = {s.name: s for s in stages}
+    waiting_on = {s.name: graph[s.name] & names for s in stages}
+    done, failed = set(), set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            ready = [n for n in pending if waiting_on[n] <= done]
+            while ready and (keep_going or not failed):
+                stage = pending.pop(ready.pop(0))
+                key, _ = state.key(stage)
+                if not force and state.up_to_date(stage, key):
+                    _report("skip", stage, "up to date")
+                    done.add(stage.name)
+                    ready = [n for n in pending if waiting_on[n] <= done]
+                else:
+                    running[pool.submit(run_stage, stage)] = stage
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                if _finish(stage, future.result(), state, ledger):
+                    done.add(stage.name)
+                else:
+                    failed.add(stage.name)
+            if failed and not keep_going:
+                for future, stage in list(running.items()):
+                    if future.cancel():
+                        del running[future]
+                        pending[stage.name] = stage
+
+    for stage in stages:
+        if stage.name in pending:
+            print(f"[----] {stage.name} (not run)")
+    return len(failed)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m mypipeline",
+        description="Run the numbered pipeline in code/scripts/core, in "
+                    "parallel where stages are independent, skipping stages "
+                    "whose sources and inputs are unchanged.",
+    )
+    parser.add_argument("targets", nargs="*", metavar="STAGE",
+                        help="Stages to bring up to date (number, e.g. 04, or "
+                             "name), with everything they depend on; default all")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Stages to run at once (default: one per core)")
+    parser.add_argument("--force", action="store_true",
+                        help="Run the selected stages even if up to date")
+    parser.add_argument("--keep-going", "-k", action="store_true",
+                        help="After a failure, keep running stages that do not "
+                             "depend on it")
+    parser.add_argument("--dry-run", "-n", action="store_true",
+                        help="Print each stage's inferred inputs, outputs and "
+                             "dependencies and whether it would run")
+    args = parser.parse_args(argv)
+
+    stages = discover()
+    graph = build_graph(stages)
+    try:
+        stages = select(stages, graph, args.targets)
+    except ValueError as e:
+        parser.error(str(e))
+    state = State()
+
+    if args.dry_run:
+        print_plan(stages, graph, state, args.force)
+        return 0
+    jobs = max(1, args.jobs)
+    ledger = Ledger(jobs)
+    try:
+        failed = run_pipeline(stages, graph, state, jobs, force=args.force,
+                              keep_going=args.keep_going, ledger=ledger)
+    finally:
+        ledger.save()
+    if ledger.rows:
+        regressions = compare(read_ledger(ledger.directory), ledger.run).regressions
+        if regressions:
+            print(f"{len(regressions)} regression(s) against earlier runs; see "
+                  f"python -m mypipeline.ledger --run {ledger.run}")
+    return 1 if failed else 0
@@ -0,0 +1,213 @@
+"""Run a specification curve in parallel, streaming results into Parquet.
+
+    from mypackage.config import TABLES
+    from mypackage.core.spec_curve import plot_spec_curve
+    from mypipeline.spec_curve import read_spec_curve, write_spec_curve
+
+    write_spec_curve(panel, grid, TABLES / "spec_curve", jobs=8)
+    fig = plot_spec_curve(read_spec_curve(TABLES / "spec_curve", grid))
+
+The columns the grid uses are copied once into a shared-memory block (numeric
+variables as float64, FE and cluster columns as their integer codes, sample
+queries as evaluated masks); worker processes attach to it by name and wrap
+it in a DataFrame without copying, so the data is never pickled per worker or
+per task. Each task is one (sample, FE set) group of core.spec_curve, and its
+results are written as a Parquet part file under `out` as soon as it
+finishes. A rerun skips every spec whose spec_id is already in a part, so an
+interrupted run resumes where it stopped and an extended grid only estimates
+the new specs (all of them if it adds an outcome or control variable, which
+changes the shared estimation sample); parts are discarded when the data
+changes (_grid.json holds its fingerprint).
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mypackage.core.spec_curve import (
+    RESULT_COLUMNS,
+    Spec,
+    SpecGrid,
+    estimate_group,
+    group_specs,
+)
+from mypipeline.memo import fingerprint
+
+META_NAME = "_grid.json"
+MASK_PREFIX = "__sample__"
+SCHEMA = pa.schema([
+    ("spec_id", pa.string()), ("outcome", pa.string()), ("controls", pa.string()),
+    ("sample", pa.string()), ("fe", pa.string()), ("n_controls", pa.int64()),
+    ("coef", pa.float64()), ("se", pa.float64()), ("t", pa.float64()),
+    ("p", pa.float64()), ("ci_low", pa.float64()), ("ci_high", pa.float64()),
+    ("n_obs", pa.int64()), ("n_clusters", pa.int64()), ("vcov", pa.string()),
+])
+
+
+class _MaskedGrid(SpecGrid):
+    """A grid whose samples are read from the precomputed mask columns."""
+
+    def sample_mask(self, data: pd.DataFrame, sample: str) -> np.ndarray:
+        return data[MASK_PREFIX + sample].to_numpy() == 1
+
+
+# ==============================================================================
+# SHARED DATA
+# ==============================================================================
+
+
+def _columns(data: pd.DataFrame, grid: SpecGrid) -> dict[str, np.ndarray]:
+    """The grid's columns as float64: regressors as their values (bools as
+    0/1), codes for non-numeric FE and cluster columns and 0/1 for sample
+    masks, NaN where missing."""
+    groups = {f for fe in grid.fe.values() for f in fe} | {grid.cluster}
+    columns = {}
+    for name in grid.variables():
+        series = data[name]
+        # Codes number values by first appearance, so a regressor coded that
+        # way could flip sign with the order of the rows
+        if name not in groups or (pd.api.types.is_numeric_dtype(series)
+                                  and not pd.api.types.is_bool_dtype(series)):
+            columns[name] = series.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            codes = pd.factorize(series)[0].astype(float)
+            codes[codes < 0] = np.nan
+            columns[name] = codes
+    for sample in grid.samples:
+        columns[MASK_PREFIX + sample] = grid.sample_mask(data, sample).astype(float)
+    return columns
+
+
+def _share(columns: dict[str, np.ndarray]) -> shared_memory.SharedMemory:
+    n = len(next(iter(columns.values())))
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=max(1, 8 * n * len(columns)))
+    block = np.ndarray((len(columns), n), dtype=np.float64, buffer=shm.buf)
+    for i, values in enumerate(columns.values()):
+        block[i] = values
+    return shm
+
+
+def _frame(buffer, names: list[str], n: int) -> pd.DataFrame:
+    """A DataFrame over the shared block, one contiguous row per column."""
+    block = np.ndarray((len(names), n), dtype=np.float64, buffer=buffer)
+    block.flags.writeable = False
+    return pd.DataFrame(dict(zip(names, block)), copy=False)
+
+
+_worker: dict = {}
+
+
+def _init_worker(name: str, names: list[str], n: int, grid: SpecGrid) -> None:
+    # Workers share the parent's resource tracker, which unlinks the block
+    # only if the parent dies without doing so
+    shm = shared_memory.SharedMemory(name=name)
+    _worker.update(shm=shm, data=_frame(shm.buf, names, n), grid=grid)
+
+
+def _run_group(specs: list[Spec]) -> list[dict]:
+    return estimate_group(_worker["data"], _worker["grid"], specs)
+
+
+# ==============================================================================
+# RESULTS TABLE
+# ==============================================================================
+
+
+def _parts(out: Path) -> list[Path]:
+    return sorted(out.glob("part-*.parquet"))
+
+
+def _done(out: Path) -> set[str]:
+    if not _parts(out):
+        return set()
+    table = pq.read_table(out, columns=["spec_id"], schema=SCHEMA)
+    return set(table.column("spec_id").to_pylist())
+
+
+def _write_part(out: Path, rows: list[dict]) -> None:
+    table = pa.Table.from_pylist(rows, schema=SCHEMA)
+    path = out / f"part-{fingerprint(sorted(r['spec_id'] for r in rows))}.parquet"
+    tmp = path.with_name(f".{path.name}.tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def _check_data(out: Path, key: str) -> None:
+    """Discard parts estimated on other data, then record this data's key."""
+    meta = out / META_NAME
+    if meta.exists() and json.loads(meta.read_text()).get("data") == key:
+        return
+    for part in _parts(out):
+        part.unlink()
+    tmp = meta.with_name(f".{meta.name}.tmp")
+    tmp.write_text(json.dumps({"data": key}, indent=1))
+    os.replace(tmp, meta)
+
+
+def read_spec_curve(out: Path, grid: SpecGrid | None = None) -> pd.DataFrame:
+    """The results table under `out` (RESULT_COLUMNS), restricted to the specs
+    of `grid` if given."""
+    out = Path(out)
+    if not _parts(out):
+        return SCHEMA.empty_table().to_pandas()
+    results = pq.read_table(out, schema=SCHEMA).to_pandas()
+    if grid is not None:
+        ids = {grid.spec_id(spec) for spec in grid.specs()}
+        results = results[results["spec_id"].isin(ids)]
+    return results.sort_values(["outcome", "sample", "fe", "controls"],
+                               ignore_index=True)[RESULT_COLUMNS]
+
+
+def write_spec_curve(data: pd.DataFrame, grid: SpecGrid, out: Path,
+                     jobs: int | None = None) -> pd.DataFrame:
+    """Estimate the specs of `grid` not yet under `out`, one part file per
+    (sample, FE set) group, and return the grid's full results table.
+
+    jobs: worker processes (default: one per CPU); 1 runs in this process.
+    """
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    columns = _columns(data, grid)
+    _check_data(out, fingerprint(pd.DataFrame(columns, copy=False)))
+
+    done = _done(out)
+    tasks = []
+    for group in group_specs(grid.specs()).values():
+        todo = [spec for spec in group if grid.spec_id(spec) not in done]
+        if todo:
+            tasks.append(todo)
+    if not tasks:
+        return read_spec_curve(out, grid)
+
+    masked = _MaskedGrid(**{f.name: getattr(grid, f.name) for f in fields(grid)})
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    if jobs <= 1:
+        frame = pd.DataFrame(columns, copy=False)
+        for task in tasks:
+            _write_part(out, estimate_group(frame, masked, task))
+        return read_spec_curve(out, grid)
+
+    names, n = list(columns), len(data)
+    shm = _share(columns)
+    del columns
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(shm.name, names, n, masked)) as pool:
+            # Largest groups first, so the last ones to finish are short
+            tasks.sort(key=len, reverse=True)
+            futures = [pool.submit(_run_group, task) for task in tasks]
+            for future in as_completed(futures):
+                _write_part(out, future.result())
+    finally:
+        shm.close()
+        shm.unlink()
+    return read_spec_curve(out, grid)
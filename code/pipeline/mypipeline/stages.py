@@ -0,0 +1,584 @@
+"""Discover the numbered pipeline stages and infer what each reads and writes.
+
+A stage is a script in code/scripts/core named NN_*.py. Its inputs and outputs
+are not declared; they are read off the source. Every path built from a
+mypackage.config path under a data directory (``RAW / "survey.csv"``,
+``PROCESSED.glob("*.parquet")``, ``dataset_path("survey")``, a variable holding
+any of these) is classified by how it is used: passed to ``read_*``/``open(p)``
+it is an input, passed to ``to_*``/``savefig``/``open(p, "w")`` it is an
+output. A path whose use cannot be classified falls back on its directory: RAW
+is only ever read, output/ is only ever written, and anything else is treated
+as both, which is always safe for ordering and hashing but costs parallelism.
+"""
+
+import ast
+import posixpath
+import re
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+import mypackage
+import mypipeline
+from mypackage import config
+
+STAGE_RE = re.compile(r"^\d{2}_\w*\.py$")
+
+# The config constants naming directories (and files) that stages read and write
+DATA_DIRS = ("RAW", "INTERMEDIATE", "PROCESSED", "TABLES", "FIGURES", "CODEBOOK")
+
+# Config functions returning a path, by the constant bounding their results
+CONFIG_FUNCTIONS = {"dataset_path": "RAW_PARQUET"}
+
+# Role of a path whose use could not be classified; missing means unknown
+DEFAULT_ROLE = {
+    "RAW": "input", "CODEBOOK": "input", "TABLES": "output", "FIGURES": "output",
+}
+
+# Functions and methods taking a path argument, by what they do with it
+READ_CALLS = {
+    "load", "loadtxt", "genfromtxt", "fromfile", "imread",
+    "read_table", "ParquetFile", "dataset",
+}
+WRITE_CALLS = {
+    "save", "savez", "savez_compressed", "savetxt", "tofile", "savefig",
+    "imsave", "write_table", "write_dataset", "dump",
+}
+READ_PREFIXES = ("read_", "load_", "validate_")
+WRITE_PREFIXES = ("to_", "write_", "save_", "export_", "dump_")
+COPY_CALLS = {"copy", "copy2", "copyfile", "copytree", "move"}
+NEUTRAL_CALLS = {
+    "print", "str", "repr", "len", "exists", "isfile", "isdir", "makedirs",
+    "debug", "info", "warning", "error", "relpath", "basename", "dirname",
+}
+
+# Methods called on a path, by what they do to it
+READ_METHODS = {"read_text", "read_bytes"}
+WRITE_METHODS = {"write_text", "write_bytes", "touch", "unlink", "rmdir"}
+NEUTRAL_METHODS = {
+    "mkdir", "exists", "is_file", "is_dir", "stat", "relative_to", "resolve",
+    "as_posix", "samefile",
+}
+
+# Calls that return their argument's path(s) unchanged for our purposes
+PASSTHROUGH_CALLS = {"Path", "PurePath", "sorted", "list", "tuple", "set"}
+
+# Parents under which a path expression is only bound or formatted, not used
+NEUTRAL_PARENTS = (
+    ast.Assign, ast.AnnAssign, ast.For, ast.comprehension, ast.FormattedValue,
+    ast.JoinedStr, ast.Compare,
+)
+
+
+@dataclass(frozen=True, order=True)
+class PathSpec:
+    """A path under a data directory: the config constant plus path parts.
+
+    Parts are glob patterns matched one component at a time; a final ``**``
+    stands for everything below, used once a part is not a literal.
+    """
+
+    root: str
+    parts: tuple[str, ...] = ()
+
+    def __str__(self) -> str:
+        return posixpath.join(self.root, *self.parts)
+
+    def joined(self, parts: tuple[str, ...]) -> "PathSpec":
+        if self.parts[-1:] == ("**",):
+            return self
+        out = list(self.parts)
+        for part in parts:
+            out.append(part)
+            if part == "**":
+                break
+        return PathSpec(self.root, tuple(out))
+
+    def overlaps(self, other: "PathSpec") -> bool:
+        """Whether some file could be named by both (or sit below either)."""
+        if self.root != other.root:
+            return False
+        for a, b in zip(self.parts, other.parts):
+            if a == "**" or b == "**":
+                return True
+            if not (fnmatchcase(a, b) or fnmatchcase(b, a)):
+                return False
+        return True
+
+    def files(self) -> list[Path]:
+        """Existing files this spec names, directories expanded; dotfiles and
+        anything under a dot-directory are never part of the pipeline."""
+        base = getattr(config, self.root)
+        literal = []
+        for part in self.parts:
+            if any(c in part for c in "*?["):
+                break
+            literal.append(part)
+        prefix = base.joinpath(*literal)
+        rest = self.parts[len(literal):]
+        if not rest:
+            matches = [prefix]
+        elif rest[0] == "**":
+            matches = [prefix] if prefix.is_dir() else []
+        else:
+            matches = prefix.glob(posixpath.join(*rest)) if prefix.is_dir() else []
+
+        found = set()
+        for match in matches:
+            if match.is_file():
+                found.add(match)
+            elif match.is_dir():
+                found.update(p for p in match.rglob("*") if p.is_file())
+        return sorted(
+            p for p in found
+            if not any(part.startswith(".") for part in p.relative_to(base).parts)
+        )
+
+
+def path_spec(path: Path) -> PathSpec | None:
+    """The PathSpec of a concrete path, if it lies in a data directory."""
+    for root in DATA_DIRS:
+        base = getattr(config, root)
+        if path.is_relative_to(base):
+            return PathSpec(root, path.relative_to(base).parts)
+    return None
+
+
+# Every path constant in config under a data directory (RAW, RAW_PARQUET, ...)
+CONFIG_SPECS = {
+    name: spec
+    for name, value in vars(config).items()
+    if isinstance(value, Path) and (spec := path_spec(value)) is not None
+}
+
+
+@dataclass
+class Stage:
+    """One numbered script and what it was inferred to touch."""
+
+    path: Path
+    inputs: set[PathSpec] = field(default_factory=set)
+    outputs: set[PathSpec] = field(default_factory=set)
+    # Paths whose role could not be inferred: hashed as inputs, ordered as
+    # outputs too
+    unknown: set[PathSpec] = field(default_factory=set)
+    # Source files whose content determines the stage's result
+    sources: list[Path] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def reads(self) -> set[PathSpec]:
+        return self.inputs | self.unknown
+
+    @property
+    def writes(self) -> set[PathSpec]:
+        return self.outputs | self.unknown
+
+
+# ==============================================================================
+# PATH INFERENCE
+# ==============================================================================
+
+
+def _call_name(call: ast.Call) -> str | None:
+    func = call.func
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    if isinstance(func, ast.Name):
+        return func.id
+    return None
+
+
+def _literal_parts(node: ast.expr) -> tuple[str, ...]:
+    """Path parts of the right operand of ``/``; ``**`` if not a literal."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return tuple(p for p in node.value.split(posixpath.sep) if p and p != ".")
+    if isinstance(node, ast.JoinedStr):
+        pattern = "".join(
+            v.value if isinstance(v, ast.Constant) else "*" for v in node.values
+        )
+        if posixpath.sep not in pattern:
+            return (pattern,)
+    return ("**",)
+
+
+def _with_suffix(spec: PathSpec, call: ast.Call) -> PathSpec:
+    if not spec.parts or spec.parts[-1] == "**":
+        return spec
+    arg = call.args[0] if call.args else None
+    last = spec.parts[-1]
+    if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+        stem = last.rsplit(".", 1)[0] if "." in last else last
+        last = stem + arg.value
+    else:
+        last = "*"
+    return PathSpec(spec.root, spec.parts[:-1] + (last,))
+
+
+class _PathEvaluator:
+    """Evaluates expressions to the PathSpecs they may denote."""
+
+    def __init__(self, tree: ast.Module):
+        # Local names bound to config paths, config functions, and the module
+        self.dirs: dict[str, str] = {}
+        self.functions: dict[str, str] = {}
+        self.modules: set[str] = set()
+        config_name = f"{mypackage.__name__}.config"
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.level == 0:
+                if node.module == config_name:
+                    for alias in node.names:
+                        if alias.name in CONFIG_SPECS:
+                            self.dirs[alias.asname or alias.name] = alias.name
+                        elif alias.name in CONFIG_FUNCTIONS:
+                            self.functions[alias.asname or alias.name] = alias.name
+                elif node.module == mypackage.__name__:
+                    for alias in node.names:
+                        if alias.name == "config":
+                            self.modules.add(alias.asname or alias.name)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name == config_name and alias.asname:
+                        self.modules.add(alias.asname)
+        self.env: dict[str, set[PathSpec]] = {}
+
+    def specs(self, node: ast.expr) -> set[PathSpec]:
+        if isinstance(node, ast.Name):
+            if node.id in self.dirs:
+                return {CONFIG_SPECS[self.dirs[node.id]]}
+            return self.env.get(node.id, set())
+        if isinstance(node, ast.Attribute):
+            if node.attr in CONFIG_SPECS and self._is_config(node.value):
+                return {CONFIG_SPECS[node.attr]}
+            if node.attr == "parent":
+                return {
+                    PathSpec(s.root, s.parts[:-1]) if s.parts[-1:] != ("**",) else s
+                    for s in self.specs(node.value)
+                }
+            return set()
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
+            parts = _literal_parts(node.right)
+            return {s.joined(parts) for s in self.specs(node.left)}
+        if isinstance(node, ast.Call):
+            return self._call_specs(node)
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return set().union(*(self.specs(e) for e in node.elts))
+        if isinstance(node, ast.Dict):
+            return set().union(*(self.specs(v) for v in node.values))
+        if isinstance(node, ast.Subscript):
+            return self.specs(node.value)
+        if isinstance(node, ast.IfExp):
+            return self.specs(node.body) | self.specs(node.orelse)
+        return set()
+
+    def _is_config(self, node: ast.expr) -> bool:
+        if isinstance(node, ast.Name):
+            return node.id in self.modules
+        # mypackage.config.RAW with a plain `import mypackage.config`
+        return (isinstance(node, ast.Attribute) and node.attr == "config"
+                and isinstance(node.value, ast.Name)
+                and node.value.id == mypackage.__name__)
+
+    def _call_specs(self, call: ast.Call) -> set[PathSpec]:
+        name = _call_name(call)
+        if name in PASSTHROUGH_CALLS and call.args:
+            return self.specs(call.args[0])
+        function = self._config_function(call.func)
+        if function is not None:
+            return {self._config_call_spec(function, call)}
+        if not isinstance(call.func, ast.Attribute):
+            return set()
+        receiver = self.specs(call.func.value)
+        if not receiver:
+            return set()
+        if name == "joinpath":
+            parts = ()
+            for arg in call.args:
+                parts += _literal_parts(arg)
+            return {s.joined(parts) for s in receiver}
+        if name in ("glob", "rglob") and call.args:
+            parts = _literal_parts(call.args[0])
+            if name == "rglob":
+                parts = ("**",)
+            return {s.joined(parts) for s in receiver}
+        if name == "iterdir":
+            return {s.joined(("*",)) for s in receiver}
+        if name in ("with_suffix", "with_name", "with_stem"):
+            if name == "with_suffix":
+                return {_with_suffix(s, call) for s in receiver}
+            return {PathSpec(s.root, s.parts[:-1] + ("*",)) for s in receiver}
+        return set()
+
+    def _config_function(self, func: ast.expr) -> str | None:
+        if isinstance(func, ast.Name):
+            return self.functions.get(func.id)
+        if (isinstance(func, ast.Attribute) and func.attr in CONFIG_FUNCTIONS
+                and self._is_config(func.value)):
+            return func.attr
+        return None
+
+    def _config_call_spec(self, function: str, call: ast.Call) -> PathSpec:
+        """Evaluate e.g. dataset_path("survey") with the real config."""
+        args = call.args
+        if all(isinstance(a, ast.Constant) for a in args) and not call.keywords:
+            try:
+                path = getattr(config, function)(*(a.value for a in args))
+            except Exception:
+                path = None
+            spec = path_spec(path) if isinstance(path, Path) else None
+            if spec is not None:
+                return spec
+        return CONFIG_SPECS[CONFIG_FUNCTIONS[function]].joined(("**",))
+
+    def bind(self, tree: ast.Module) -> None:
+        """Record which names hold paths, flow-insensitively, to a fixpoint."""
+        changed = True
+        while changed:
+            changed = False
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.Assign, ast.AnnAssign)):
+                    targets = (node.targets if isinstance(node, ast.Assign)
+                               else [node.target])
+                    value = node.value
+                elif isinstance(node, (ast.For, ast.comprehension)):
+                    targets, value = [node.target], node.iter
+                else:
+                    continue
+                if value is None:
+                    continue
+                specs = self.specs(value)
+                if not specs:
+                    continue
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        known = self.env.setdefault(target.id, set())
+                        if not specs <= known:
+                            known |= specs
+                            changed = True
+
+
+def _open_role(call: ast.Call, mode_index: int) -> str | None:
+    mode = call.args[mode_index] if len(call.args) > mode_index else None
+    for kw in call.keywords:
+        if kw.arg == "mode":
+            mode = kw.value
+    if mode is None:
+        return "input"
+    if isinstance(mode, ast.Constant) and isinstance(mode.value, str):
+        return "output" if set(mode.value) & set("wax+") else "input"
+    return None
+
+
+def _arg_role(call: ast.Call, node: ast.expr) -> str | None:
+    """Role of a path passed as an argument to `call`; None if unknown."""
+    name = _call_name(call)
+    if name is None:
+        return None
+    if name == "open":
+        return _open_role(call, 1)
+    if name in COPY_CALLS:
+        index = call.args.index(node) if node in call.args else None
+        keyword = next((kw.arg for kw in call.keywords if kw.value is node), None)
+        if index == 0 or keyword == "src":
+            return "input"
+        if index == 1 or keyword == "dst":
+            return "output"
+        return None
+    if name in READ_CALLS or name.startswith(READ_PREFIXES):
+        return "input"
+    if name in WRITE_CALLS or name.startswith(WRITE_PREFIXES):
+        return "output"
+    if name in NEUTRAL_CALLS:
+        return "neutral"
+    return None
+
+
+def _method_role(method: str, call: ast.Call | None) -> str | None:
+    """Role of a path whose attribute `method` is accessed (and maybe called)."""
+    if call is None:
+        return "neutral"  # p.name, p.suffix, ...
+    if method == "open":
+        return _open_role(call, 0)
+    if method in READ_METHODS:
+        return "input"
+    if method in WRITE_METHODS:
+        return "output"
+    if method in NEUTRAL_METHODS:
+        return "neutral"
+    return None
+
+
+def _mentions(node: ast.AST, evaluator: _PathEvaluator, out: list) -> None:
+    """Collect the outermost expressions that evaluate to paths."""
+    if isinstance(node, ast.expr):
+        specs = evaluator.specs(node)
+        if specs:
+            out.append((node, specs))
+            return
+    for child in ast.iter_child_nodes(node):
+        _mentions(child, evaluator, out)
+
+
+def infer_io(tree: ast.Module) -> tuple[set, set, set]:
+    """(inputs, outputs, unknown) PathSpecs of a parsed stage."""
+    evaluator = _PathEvaluator(tree)
+    evaluator.bind(tree)
+    parents = {
+        child: parent
+        for parent in ast.walk(tree)
+        for child in ast.iter_child_nodes(parent)
+    }
+
+    mentions = []
+    _mentions(tree, evaluator, mentions)
+    roles: dict[PathSpec, set] = {}
+    for node, specs in mentions:
+        parent = parents.get(node)
+        if isinstance(parent, ast.keyword):
+            parent = parents.get(parent)
+        if isinstance(parent, ast.Call) and node is not parent.func:
+            role = _arg_role(parent, node)
+        elif isinstance(parent, ast.Attribute):
+            grand = parents.get(parent)
+            call = (grand if isinstance(grand, ast.Call) and grand.func is parent
+                    else None)
+            role = _method_role(parent.attr, call)
+        elif isinstance(parent, NEUTRAL_PARENTS):
+            role = "neutral"
+        else:
+            role = None
+        for spec in specs:
+            roles.setdefault(spec, set()).add(role)
+
+    inputs, outputs, unknown = set(), set(), set()
+    for spec, found in roles.items():
+        if spec.root == "RAW":
+            # Raw data is never written; the quality gate enforces that
+            inputs.add(spec)
+            continue
+        if "input" in found:
+            inputs.add(spec)
+        if "output" in found:
+            outputs.add(spec)
+        if None in found and not found & {"input", "output"}:
+            role = DEFAULT_ROLE.get(spec.root)
+            {"input": inputs, "output": outputs}.get(role, unknown).add(spec)
+    return inputs, outputs, unknown
+
+
+# ==============================================================================
+# SOURCE DEPENDENCIES
+# ==============================================================================
+
+
+# Project packages whose modules count as a stage's source
+PROJECT_PACKAGES = {package.__name__: Path(package.__file__).parent
+                    for package in (mypackage, mypipeline)}
+
+
+def _module_file(name: str) -> Path | None:
+    """Source file of a module inside a project package, without importing it."""
+    parts = name.split(".")
+    if parts[0] not in PROJECT_PACKAGES:
+        return None
+    base = PROJECT_PACKAGES[parts[0]].joinpath(*parts[1:])
+    for candidate in (base.with_suffix(".py"), base / "__init__.py"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _imported_modules(tree: ast.Module, package: str | None) -> set[str]:
+    """Names of modules a file may import, absolute or relative to `package`."""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                if package is None:
+                    continue
+                base = package.rsplit(".", node.level - 1)[0]
+                module = f"{base}.{node.module}" if node.module else base
+            else:
+                module = node.module or ""
+            names.add(module)
+            # `from pkg import name` may name a submodule
+            names.update(f"{module}.{alias.name}" for alias in node.names)
+    expanded = set()
+    for name in names:
+        parts = name.split(".")
+        expanded.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+    return expanded
+
+
+def source_files(path: Path, tree: ast.Module) -> list[Path]:
+    """The stage itself, sibling modules it imports, and every package module
+    it reaches through imports."""
+    found = {path}
+    for name in _imported_modules(tree, None):
+        sibling = path.parent / f"{name.split('.')[0]}.py"
+        if sibling.is_file() and sibling != path:
+            found.add(sibling)
+
+    queue = list(_imported_modules(tree, None))
+    seen = set()
+    while queue:
+        name = queue.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        module_file = _module_file(name)
+        if module_file is None:
+            continue
+        found.add(module_file)
+        if module_file.name == "__init__.py":
+            package = name
+        else:
+            package = name.rpartition(".")[0]
+        module_tree = ast.parse(module_file.read_bytes(), str(module_file))
+        queue.extend(_imported_modules(module_tree, package))
+    return sorted(found)
+
+
+# ==============================================================================
+# DISCOVERY AND GRAPH
+# ==============================================================================
+
+
+def discover(scripts_dir: Path = config.SCRIPTS) -> list[Stage]:
+    """Parse every NN_*.py stage, in number order."""
+    stages = []
+    for path in sorted(scripts_dir.iterdir()):
+        if not STAGE_RE.match(path.name):
+            continue
+        tree = ast.parse(path.read_bytes(), str(path))
+        inputs, outputs, unknown = infer_io(tree)
+        stages.append(Stage(path, inputs, outputs, unknown,
+                            source_files(path, tree)))
+    return stages
+
+
+def _overlap(a: set[PathSpec], b: set[PathSpec]) -> bool:
+    return any(x.overlaps(y) for x in a for y in b)
+
+
+def build_graph(stages: list[Stage]) -> dict[str, set[str]]:
+    """Map each stage to the earlier stages it must wait for.
+
+    A stage waits for an earlier one when it reads what that one writes, or
+    writes what that one reads or writes, so any schedule respecting the graph
+    gives the same result as running in number order.
+    """
+    graph = {}
+    for j, later in enumerate(stages):
+        graph[later.name] = {
+            earlier.name
+            for earlier in stages[:j]
+            if _overlap(earlier.writes, later.reads)
+            or _overlap(earlier.reads | earlier.writes, later.writes)
+        }
+    return graph
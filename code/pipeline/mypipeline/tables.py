@@ -0,0 +1,109 @@
+"""Store estimation results and render tables from them, writing only changes.
+
+    # in an estimation stage
+    write_results(RESULTS / "wages.parquet", results)
+
+    # in a table stage
+    results = read_results(RESULTS)
+    print(write_tables(TABLES, TABLES_SPEC, results))
+
+Results are kept as small Parquet files (one per result set, see
+core.tables.RESULT_COLUMNS), so formatting a table never requires
+re-estimating. write_tables renders every Table to ``<name>.tex`` and
+``<name>.csv`` in one pass and compares each with the file on disk: a file is
+rewritten (atomically) only if its content changed, so unchanged tables keep
+their mtimes and latexmk does not rebuild the paper for them.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mypackage.core.tables import RESULT_COLUMNS, Table, render
+
+RESULTS_SCHEMA = pa.schema([
+    ("model", pa.string()), ("term", pa.string()), ("coef", pa.float64()),
+    ("se", pa.float64()), ("p", pa.float64()), ("stat", pa.bool_()),
+])
+
+
+@dataclass
+class TableReport:
+    """Files of one write_tables run, relative to its directory."""
+
+    written: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        lines = [f"{len(self.written)} written, {len(self.unchanged)} unchanged "
+                 f"({self.seconds:.2f}s)"]
+        lines += [f"  wrote {name}" for name in self.written]
+        return "\n".join(lines)
+
+
+def write_results(path: Path, results: pd.DataFrame) -> None:
+    """Store one result set; its name is the file stem."""
+    missing = set(RESULT_COLUMNS) - set(results.columns)
+    if missing:
+        raise ValueError(f"results lack columns {sorted(missing)}")
+    table = pa.Table.from_pandas(results[RESULT_COLUMNS].astype({"model": str}),
+                                 schema=RESULTS_SCHEMA, preserve_index=False)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def read_results(path: Path) -> dict[str, pd.DataFrame]:
+    """Result sets by name: the file at `path`, or every one below it."""
+    path = Path(path)
+    files = [path] if path.is_file() else sorted(path.rglob("*.parquet"))
+    base = path.parent if path.is_file() else path
+    return {
+        file.relative_to(base).with_suffix("").as_posix():
+            pq.ParquetFile(file).read().to_pandas()
+        for file in files if not file.name.startswith(".")
+    }
+
+
+def _replace_if_changed(path: Path, content: str) -> bool:
+    data = content.encode()
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def write_tables(out: Path, tables: list[Table],
+                 results: dict[str, pd.DataFrame]) -> TableReport:
+    """Render every table as .tex and .csv under `out`, rewriting only the
+    files whose content changed."""
+    start = time.perf_counter()
+    out = Path(out)
+    names = [table.name for table in tables]
+    if len(set(names)) < len(names):
+        raise ValueError("table names must be unique")
+    unknown = sorted({t.results for t in tables} - set(results))
+    if unknown:
+        raise KeyError(f"no stored results named {unknown}")
+
+    report = TableReport()
+    for table in tables:
+        for suffix, content in render(table, results[table.results]).items():
+            name = table.name + suffix
+            changed = _replace_if_changed(out / name, content)
+            (report.written if changed else report.unchanged).append(name)
+    report.seconds = time.perf_counter() - start
+    return report
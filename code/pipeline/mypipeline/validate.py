@@ -0,0 +1,338 @@
+"""Check processed datasets against data/codebook.md in one streaming scan.
+
+    report = validate_datasets(PROCESSED, CODEBOOK)
+    write_validation(VALIDATION, report)
+
+    # at the top of an estimation stage: fails fast, and orders the stage
+    # after the validation stage
+    read_validation(VALIDATION).check()
+
+The codebook has one ``## <file>`` heading per dataset (a path or glob
+relative to the validated directory) followed by a table:
+
+    | Variable | Type  | Range     | Categories  | Nullable | Key | Description |
+    |----------|-------|-----------|-------------|----------|-----|-------------|
+    | firm_id  | int   | 1..       |             | no       | yes | Firm        |
+    | year     | int   | 2000..2020|             | no       | yes |             |
+    | sex      | str   |           | male,female | yes      |     |             |
+
+Types are int, float, str, bool, date and category; a range is ``low..high``
+with either side optional (inclusive); Nullable defaults to yes. Columns
+marked Key must be unique together.
+
+Each Parquet file is read one row group at a time, only the documented
+columns, and every check is a pyarrow compute kernel over the row group, so
+memory is bounded by the largest row group, plus 8 bytes per row for the
+hashes of the key columns. Every violation is counted, with the first
+SAMPLE_ROWS offending rows kept as examples.
+"""
+
+import json
+import os
+import re
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+SAMPLE_ROWS = 5
+
+
+class ValidationError(ValueError):
+    """Raised by ValidationReport.check() when a dataset broke the codebook."""
+
+
+def _is_string(t: pa.DataType) -> bool:
+    return pa.types.is_string(t) or pa.types.is_large_string(t)
+
+
+def _is_categorical(t: pa.DataType) -> bool:
+    return pa.types.is_dictionary(t) or _is_string(t) or pa.types.is_integer(t)
+
+
+def _is_text(t: pa.DataType) -> bool:
+    # mypipeline.frames stores low-cardinality strings as dictionaries
+    return _is_string(t) or (pa.types.is_dictionary(t) and _is_string(t.value_type))
+
+
+TYPES: dict[str, Callable[[pa.DataType], bool]] = {
+    "int": pa.types.is_integer,
+    "float": lambda t: pa.types.is_floating(t) or pa.types.is_integer(t),
+    "str": _is_text,
+    "bool": pa.types.is_boolean,
+    "date": lambda t: pa.types.is_date(t) or pa.types.is_timestamp(t),
+    "category": _is_categorical,
+}
+
+
+@dataclass(frozen=True)
+class Variable:
+    """One codebook row. Bounds and categories are kept as written and cast to
+    the column's type when checked."""
+
+    name: str
+    type: str
+    low: str | None = None
+    high: str | None = None
+    categories: tuple[str, ...] | None = None
+    nullable: bool = True
+    key: bool = False
+
+
+@dataclass
+class Violation:
+    dataset: str
+    column: str
+    check: str
+    count: int
+    samples: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class ValidationReport:
+    """Violations and row counts by dataset file, relative to the validated
+    directory; warnings for what could not be checked."""
+
+    violations: list[Violation] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    rows: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def check(self) -> None:
+        if not self.ok:
+            raise ValidationError(str(self))
+
+    def __str__(self) -> str:
+        lines = [
+            f"{len(self.rows)} datasets, {sum(self.rows.values()):,} rows, "
+            f"{len(self.violations)} violations ({self.seconds:.1f}s)"
+        ]
+        for v in self.violations:
+            lines.append(f"  {v.dataset}: {v.column}: {v.check} ({v.count:,} rows)")
+            lines += [f"      {sample}" for sample in v.samples]
+        lines += [f"  warning: {warning}" for warning in self.warnings]
+        return "\n".join(lines)
+
+
+# ==============================================================================
+# CODEBOOK
+# ==============================================================================
+
+
+def _value(text: str) -> str:
+    return text.strip().strip("`\"'")
+
+
+def _variable(row: dict[str, str], where: str) -> Variable:
+    name = row.get("variable", "").strip("` ")
+    type_ = row.get("type", "").lower()
+    if type_ not in TYPES:
+        raise ValueError(f"{where}: {name}: unknown type {type_!r}, "
+                         f"expected one of {', '.join(TYPES)}")
+    low = high = None
+    if row.get("range"):
+        if ".." not in row["range"]:
+            raise ValueError(f"{where}: {name}: range must be low..high")
+        low_text, high_text = row["range"].split("..", 1)
+        low = _value(low_text) or None
+        high = _value(high_text) or None
+    categories = None
+    if row.get("categories"):
+        categories = tuple(_value(c) for c in row["categories"].split(","))
+    return Variable(
+        name=name, type=type_, low=low, high=high, categories=categories,
+        nullable=row.get("nullable", "").lower() not in ("no", "n", "false"),
+        key=row.get("key", "").lower() in ("yes", "y", "true"),
+    )
+
+
+def read_codebook(path: Path) -> dict[str, list[Variable]]:
+    """Documented variables by dataset heading."""
+    text = re.sub(r"<!--.*?-->", "", Path(path).read_text(encoding="utf-8"),
+                  flags=re.S)
+    datasets: dict[str, list[Variable]] = {}
+    dataset = header = None
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if line.startswith("## "):
+            dataset, header = line[3:].strip().strip("`"), None
+        elif dataset and line.startswith("|"):
+            cells = [c.strip() for c in line.strip("|").split("|")]
+            if header is None:
+                header = [c.lower() for c in cells]
+            elif not set(line) <= set("|-: "):
+                row = dict(zip(header, cells))
+                datasets.setdefault(dataset, []).append(
+                    _variable(row, f"{path}:{number}"))
+        else:
+            header = None
+    return datasets
+
+
+# ==============================================================================
+# CHECKS
+# ==============================================================================
+
+
+def _widest(t: pa.DataType) -> pa.DataType:
+    """The widest type of t's family, so that a codebook value outside a
+    narrow column's range (1000 for an int8 column) still casts."""
+    if pa.types.is_integer(t):
+        return pa.int64()
+    if pa.types.is_floating(t):
+        return pa.float64()
+    return t
+
+
+def _bound(value: str, t: pa.DataType) -> pa.Scalar:
+    try:
+        return pa.scalar(value).cast(_widest(t))
+    except pa.ArrowInvalid:
+        if not pa.types.is_integer(t):
+            raise
+        return pa.scalar(value).cast(pa.float64())  # 0.5 on an int column
+
+
+def _checks(var: Variable, t: pa.DataType) -> dict[str, Callable]:
+    """Violation masks of one column, by check name."""
+    checks = {}
+    # Fractional bounds on a float variable stored as integers
+    bound_type = pa.float64() if var.type == "float" else t
+    if not var.nullable:
+        checks["null"] = pc.is_null
+    if var.low is not None:
+        low = _bound(var.low, bound_type)
+        checks[f"below {var.low}"] = lambda a: pc.less(a, low)
+    if var.high is not None:
+        high = _bound(var.high, bound_type)
+        checks[f"above {var.high}"] = lambda a: pc.greater(a, high)
+    if var.categories is not None:
+        dictionary = pa.types.is_dictionary(t)
+        value_type = t.value_type if dictionary else _widest(t)
+        allowed = pa.array(var.categories).cast(value_type)
+
+        def outside(a):
+            values = a if dictionary else a.cast(value_type)
+            return pc.and_(pc.invert(pc.is_in(values, value_set=allowed)),
+                           pc.is_valid(a))
+
+        checks["not in categories"] = outside
+    return checks
+
+
+def _key_hashes(batch: pa.Table, keys: list[str]) -> np.ndarray:
+    frame = batch.select(keys).to_pandas()
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _duplicates(hashes: np.ndarray) -> np.ndarray:
+    """Rows whose key hash occurred on an earlier row, in row order."""
+    order = np.argsort(hashes, kind="stable")
+    repeat = np.zeros(len(hashes), dtype=bool)
+    repeat[order[1:]] = hashes[order[1:]] == hashes[order[:-1]]
+    return np.flatnonzero(repeat)
+
+
+def validate_file(path: Path, variables: list[Variable], name: str,
+                  report: ValidationReport) -> None:
+    """Check one Parquet file, adding its violations to report."""
+    parquet = pq.ParquetFile(path)
+    schema = parquet.schema_arrow
+    n = parquet.metadata.num_rows
+    report.rows[name] = n
+
+    checks: dict[tuple[str, str], Callable] = {}
+    for var in variables:
+        if var.name not in schema.names:
+            report.violations.append(Violation(name, var.name, "missing", n))
+        elif not TYPES[var.type](schema.field(var.name).type):
+            report.violations.append(Violation(
+                name, var.name, f"type {schema.field(var.name).type}, "
+                f"not {var.type}", n))
+        else:
+            for check, mask in _checks(var, schema.field(var.name).type).items():
+                checks[var.name, check] = mask
+    documented = {var.name for var in variables}
+    undocumented = [c for c in schema.names if c not in documented]
+    if undocumented:
+        report.warnings.append(f"{name}: undocumented columns "
+                               f"{', '.join(undocumented)}")
+    keys = [v.name for v in variables if v.key and v.name in schema.names]
+    columns = [c for c in schema.names if c in documented]
+
+    found = {check: Violation(name, *check, 0) for check in checks}
+    hashes = []
+    offset = 0
+    for group in range(parquet.num_row_groups):
+        batch = parquet.read_row_group(group, columns=columns)
+        for (column, check), mask_of in checks.items():
+            mask = mask_of(batch.column(column))
+            count = pc.sum(mask).as_py() or 0
+            violation = found[column, check]
+            violation.count += count
+            need = SAMPLE_ROWS - len(violation.samples)
+            if count and need > 0:
+                rows = pc.indices_nonzero(pc.fill_null(mask, False))[:need]
+                for row, values in zip(rows.to_pylist(),
+                                       batch.take(rows).to_pylist()):
+                    violation.samples.append({"row": offset + row, **values})
+        if keys:
+            hashes.append(_key_hashes(batch, keys))
+        offset += batch.num_rows
+
+    report.violations += [v for v in found.values() if v.count]
+    if keys and hashes:
+        repeats = _duplicates(np.concatenate(hashes))
+        if len(repeats):
+            report.violations.append(Violation(
+                name, "+".join(keys), "duplicate key", len(repeats),
+                [{"row": int(row)} for row in repeats[:SAMPLE_ROWS]]))
+
+
+def validate_datasets(root: Path, codebook: Path) -> ValidationReport:
+    """Check every dataset the codebook documents under root."""
+    start = time.perf_counter()
+    root = Path(root)
+    report = ValidationReport()
+    for pattern, variables in read_codebook(codebook).items():
+        files = sorted(root.glob(pattern))
+        if not files:
+            report.warnings.append(f"{pattern}: no such dataset under {root}")
+        for path in files:
+            name = path.relative_to(root).as_posix()
+            if path.suffix != ".parquet":
+                report.warnings.append(f"{name}: only Parquet files are checked")
+                continue
+            validate_file(path, variables, name, report)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+# ==============================================================================
+# REPORT FILE
+# ==============================================================================
+
+
+def write_validation(path: Path, report: ValidationReport) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(asdict(report), indent=1, default=str),
+                   encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_validation(path: Path) -> ValidationReport:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    data["violations"] = [Violation(**v) for v in data["violations"]]
+    return ValidationReport(**data)
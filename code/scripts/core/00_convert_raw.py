@@ -0,0 +1,18 @@
+"""Mirror data/raw/ into typed, compressed Parquet under data/intermediate/raw/.
+
+Only raw files whose checksum changed since the last run are reconverted; the
+manifest next to the mirrors records checksums, sizes and schemas. Later
+stages read a mirror by its name in config.DATASETS:
+
+    pd.read_parquet(dataset_path("survey"), columns=[...])
+"""
+
+import sys
+
+from mypackage.config import RAW, RAW_PARQUET
+from mypipeline.convert import write_parquet_mirror
+
+if __name__ == "__main__":
+    report = write_parquet_mirror(RAW, RAW_PARQUET)
+    print(report)
+    sys.exit(1 if report.failed else 0)
@@ -0,0 +1,22 @@
+"""Check every dataset in data/processed/ against data/codebook.md.
+
+Each file is scanned once, a Parquet row group at a time, for wrong types,
+out-of-range values, unknown categories, missing values where none are
+allowed and duplicate keys. The report is saved for the stages that follow;
+an estimation stage that calls
+
+    read_validation(VALIDATION).check()
+
+runs after this one and refuses to start on data that failed.
+"""
+
+import sys
+
+from mypackage.config import CODEBOOK, PROCESSED, VALIDATION
+from mypipeline.validate import validate_datasets, write_validation
+
+if __name__ == "__main__":
+    report = validate_datasets(PROCESSED, CODEBOOK)
+    write_validation(VALIDATION, report)
+    print(report)
+    sys.exit(0 if report.ok else 1)
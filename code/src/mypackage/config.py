@@ -13,6 +13,25 @@ ROOT = _find_root()
 RAW = ROOT / "data" / "raw"
 INTERMEDIATE = ROOT / "data" / "intermediate"
 PROCESSED = ROOT / "data" / "processed"
+RAW_PARQUET = INTERMEDIATE / "raw"
+RESULTS = INTERMEDIATE / "results"
+VALIDATION = INTERMEDIATE / "validation.json"
 TABLES = ROOT / "output" / "core" / "tables"
 FIGURES = ROOT / "output" / "core" / "figures"
 EXPLORATION_OUTPUT = ROOT / "output" / "exploration"
+CODEBOOK = ROOT / "data" / "codebook.md"
+
+SCRIPTS = ROOT / "code" / "scripts" / "core"
+PIPELINE_STATE = ROOT / ".pipeline"
+
+# Raw files by logical name, relative to RAW. 00_convert_raw.py mirrors every
+# raw file to Parquet; read a mirror with pd.read_parquet(dataset_path(name)).
+DATASETS = {
+    # "survey": "survey/wave1.dta",
+}
+
+
+def dataset_path(name):
+    if name not in DATASETS:
+        raise KeyError(f"Unknown dataset {name!r}; add it to DATASETS in config.py")
+    return RAW_PARQUET / f"{DATASETS[name]}.parquet"
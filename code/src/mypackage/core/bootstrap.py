@@ -0,0 +1,373 @@
+"""Bootstrap and permutation inference for linear regressions, in parallel.
+
+    from mypackage.core.bootstrap import bootstrap
+
+    boot = bootstrap(X, y, scheme="wild", cluster=firm, reps=9999, seed=SEED,
+                     jobs=8, rtol=0.005)
+    boot.se, boot.ci(0.95)
+
+Replicates are computed in batches as matrix products rather than one
+regression at a time. Per resampling unit (observation or cluster) the
+sufficient statistics of the regression are computed once: X'X and X'y for
+the pairs and cluster bootstraps, the score X'u for the wild bootstrap. A
+batch of replicates is then a matrix of unit weights (resampling counts, or
+Rademacher/Webb signs) times those statistics, followed by k x k solves.
+
+Replicates are drawn in fixed-size chunks, and chunk i always draws from the
+i-th child of numpy.random.SeedSequence(seed). Chunks are spread over a process
+pool and reassembled in order, so the draws, and every statistic computed from
+them, are bit-identical whatever the number of workers. With `rtol`, drawing
+stops after the first chunk at which no standard error has moved by more than
+rtol (relative) for PATIENCE chunks in a row; as that check runs on chunks in
+order, where it stops does not depend on the worker count either.
+
+X and y are used as given. For a model with absorbed fixed effects, pass the
+demeaned variables (FixedEffects.demean): the wild bootstrap keeps X fixed, so
+this is exact, while the pairs and cluster bootstraps then hold the fixed
+effects at their full-sample values.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Replicates per chunk, the unit of seeding and of work sent to a worker. Fixed,
+# so that which stream a replicate draws from never depends on the workers.
+CHUNK_REPS = 64
+# Largest replicate-by-unit weight matrix built at once (32 MB of float64)
+BLOCK_ELEMENTS = 2**22
+# Consecutive chunks over which the SEs must be stable to stop early
+PATIENCE = 3
+MIN_REPS = 2 * CHUNK_REPS
+
+WILD_WEIGHTS = {
+    # Mean 0, variance 1
+    "rademacher": np.array([-1.0, 1.0]),
+    # Six-point distribution of Webb (2014), for few clusters
+    "webb": np.array([-math.sqrt(1.5), -1.0, -math.sqrt(0.5),
+                      math.sqrt(0.5), 1.0, math.sqrt(1.5)]),
+}
+SCHEMES = ("pairs", "cluster", "wild")
+
+
+@dataclass
+class BootstrapResult:
+    """Point estimates, bootstrap draws and the standard errors they imply."""
+
+    coef: pd.Series
+    draws: np.ndarray
+    scheme: str
+    stopped_early: bool = False
+
+    @property
+    def reps(self) -> int:
+        return len(self.draws)
+
+    @property
+    def se(self) -> pd.Series:
+        return pd.Series(_se(self.draws), index=self.coef.index, name="se")
+
+    def ci(self, level: float = 0.95) -> pd.DataFrame:
+        """Percentile confidence intervals."""
+        tail = (1 - level) / 2
+        bounds = np.nanquantile(self.draws, [tail, 1 - tail], axis=0)
+        return pd.DataFrame(bounds.T, index=self.coef.index,
+                            columns=["lower", "upper"])
+
+
+@dataclass
+class PermutationResult:
+    """Observed coefficient and its distribution under permuted assignment."""
+
+    coef: float
+    draws: np.ndarray
+
+    @property
+    def reps(self) -> int:
+        return len(self.draws)
+
+    @property
+    def pvalue(self) -> float:
+        """Two-sided: share of draws at least as extreme, counting the data."""
+        extreme = np.sum(np.abs(self.draws) >= abs(self.coef) - 1e-12)
+        return float((1 + extreme) / (1 + self.reps))
+
+
+def _se(draws: np.ndarray) -> np.ndarray:
+    # Replicates with a singular design are NaN and left out
+    return np.nanstd(draws, axis=0, ddof=1)
+
+
+# ==============================================================================
+# PRECOMPUTED DESIGNS
+# ==============================================================================
+
+
+@dataclass
+class _Design:
+    """What a replicate needs, computed once and shipped to each worker."""
+
+    scheme: str
+    beta: np.ndarray
+    stats: np.ndarray          # one row per resampling unit
+    xtx_inv: np.ndarray | None = None
+    wild_values: np.ndarray | None = None
+    permute: tuple | None = None
+
+    @property
+    def units(self) -> int:
+        return len(self.stats)
+
+
+def _as_arrays(X, y, weights) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    names = (list(map(str, X.columns)) if isinstance(X, pd.DataFrame)
+             else [f"x{j}" for j in range(np.shape(X)[1])])
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if X.ndim != 2 or len(X) != len(y):
+        raise ValueError("X must be 2-D with one row per element of y")
+    if weights is not None:
+        root = np.sqrt(np.asarray(weights, dtype=np.float64))
+        X, y = X * root[:, None], y * root
+    return X, y, names
+
+
+def _units(cluster, n: int) -> tuple[np.ndarray | None, int]:
+    """Cluster codes (None: every observation is a unit) and unit count."""
+    if cluster is None:
+        return None, n
+    codes, levels = pd.factorize(np.asarray(cluster))
+    if len(codes) != n:
+        raise ValueError("cluster needs one value per observation")
+    if (codes < 0).any():
+        raise ValueError("cluster has missing values")
+    return codes, len(levels)
+
+
+def _sum_by(values: np.ndarray, codes: np.ndarray | None, units: int) -> np.ndarray:
+    """Column sums of `values` (n x m) within units; values if no codes."""
+    if codes is None:
+        return values
+    return np.column_stack([np.bincount(codes, weights=values[:, j],
+                                        minlength=units)
+                            for j in range(values.shape[1])])
+
+
+def _design(X: np.ndarray, y: np.ndarray, scheme: str, cluster,
+            wild: str) -> _Design:
+    k = X.shape[1]
+    xtx = X.T @ X
+    beta = np.linalg.solve(xtx, X.T @ y)
+    if scheme == "wild":
+        if wild not in WILD_WEIGHTS:
+            raise ValueError(f"wild weights must be one of {list(WILD_WEIGHTS)}")
+        codes, units = _units(cluster, len(y))
+        scores = _sum_by(X * (y - X @ beta)[:, None], codes, units)
+        return _Design(scheme, beta, scores, xtx_inv=np.linalg.inv(xtx),
+                       wild_values=WILD_WEIGHTS[wild])
+    if scheme == "cluster" and cluster is None:
+        raise ValueError("the cluster bootstrap needs cluster=")
+    if scheme == "pairs" and cluster is not None:
+        raise ValueError('the pairs bootstrap resamples observations; use '
+                         'scheme="cluster" to resample clusters')
+    codes, units = _units(cluster if scheme == "cluster" else None, len(y))
+    upper = np.triu_indices(k)
+    per_obs = np.column_stack([X[:, upper[0]] * X[:, upper[1]], X * y[:, None]])
+    return _Design(scheme, beta, _sum_by(per_obs, codes, units))
+
+
+def _solve_stats(sums: np.ndarray, k: int) -> np.ndarray:
+    """Coefficients from rows of summed [vech(X'X), X'y]; NaN if singular."""
+    upper = np.triu_indices(k)
+    n_upper = len(upper[0])
+    xtx = np.zeros((len(sums), k, k))
+    xtx[:, upper[0], upper[1]] = sums[:, :n_upper]
+    xtx[:, upper[1], upper[0]] = sums[:, :n_upper]
+    xty = sums[:, n_upper:]
+    try:
+        return np.linalg.solve(xtx, xty[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        pass
+    out = np.full((len(sums), k), np.nan)
+    for i in range(len(sums)):
+        try:
+            out[i] = np.linalg.solve(xtx[i], xty[i])
+        except np.linalg.LinAlgError:
+            pass
+    return out
+
+
+# ==============================================================================
+# REPLICATES
+# ==============================================================================
+
+
+def _replicates(design: _Design, rng: np.random.Generator, reps: int) -> np.ndarray:
+    """`reps` replicate estimates, drawn from rng in blocks."""
+    units = design.units
+    block = max(1, BLOCK_ELEMENTS // units)
+    out = []
+    for start in range(0, reps, block):
+        b = min(block, reps - start)
+        if design.scheme == "wild":
+            signs = design.wild_values[
+                rng.integers(0, len(design.wild_values), size=(b, units))]
+            out.append(design.beta + (signs @ design.stats) @ design.xtx_inv)
+        elif design.scheme == "permutation":
+            out.append(_permuted(design, rng, b))
+        else:
+            # Resample units with replacement: replicate weights are counts
+            draws = rng.integers(0, units, size=(b, units))
+            draws += (np.arange(b) * units)[:, None]
+            counts = np.bincount(draws.ravel(), minlength=b * units)
+            counts = counts.reshape(b, units).astype(np.float64)
+            out.append(_solve_stats(counts @ design.stats, len(design.beta)))
+    return np.concatenate(out)
+
+
+_WORKER_DESIGN: _Design | None = None
+
+
+def _init_worker(design: _Design) -> None:
+    global _WORKER_DESIGN
+    _WORKER_DESIGN = design
+
+
+def _run_chunk(seed: np.random.SeedSequence, reps: int) -> np.ndarray:
+    return _replicates(_WORKER_DESIGN, np.random.default_rng(seed), reps)
+
+
+def _stable(history: list[np.ndarray], rtol: float) -> bool:
+    """Whether the SEs moved by at most rtol over the last PATIENCE chunks."""
+    if len(history) <= PATIENCE:
+        return False
+    recent = np.array(history[-PATIENCE - 1:])
+    change = np.abs(np.diff(recent, axis=0)) / np.abs(recent[1:])
+    return bool(np.all(change <= rtol))
+
+
+def _draw(design: _Design, reps: int, seed, jobs: int,
+          rtol: float | None) -> tuple[np.ndarray, bool]:
+    """Run the chunks in order (in a pool if jobs > 1) until done or stable."""
+    sizes = [min(CHUNK_REPS, reps - start) for start in range(0, reps, CHUNK_REPS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks, history = [], []
+
+    def accept(draws: np.ndarray) -> bool:
+        chunks.append(draws)
+        if rtol is None:
+            return False
+        history.append(_se(np.concatenate(chunks)))
+        done = sum(map(len, chunks))
+        return done >= MIN_REPS and done < reps and _stable(history, rtol)
+
+    if jobs <= 1:
+        _init_worker(design)
+        for child, size in zip(seeds, sizes):
+            if accept(_run_chunk(child, size)):
+                return np.concatenate(chunks), True
+        return np.concatenate(chunks), False
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(design,)) as pool:
+        # Keep every worker busy while results are consumed in chunk order
+        ahead = 2 * jobs
+        futures = [pool.submit(_run_chunk, child, size)
+                   for child, size in zip(seeds[:ahead], sizes[:ahead])]
+        for i in range(len(sizes)):
+            if accept(futures[i].result()):
+                for future in futures[i + 1:]:
+                    future.cancel()
+                return np.concatenate(chunks), True
+            if i + ahead < len(sizes):
+                futures.append(pool.submit(_run_chunk, seeds[i + ahead],
+                                           sizes[i + ahead]))
+    return np.concatenate(chunks), False
+
+
+# ==============================================================================
+# PUBLIC API
+# ==============================================================================
+
+
+def bootstrap(X, y, *, seed, scheme: str = "wild", cluster=None, weights=None,
+              wild: str = "rademacher", reps: int = 999, jobs: int = 1,
+              rtol: float | None = None) -> BootstrapResult:
+    """Bootstrap the OLS coefficients of y on X.
+
+    Args:
+        X: Regressors, n x k (a DataFrame names the coefficients).
+        y: Outcome, length n.
+        seed: Seed (int, or anything SeedSequence accepts) for all draws.
+        scheme: "pairs" (resample observations), "cluster" (resample
+            clusters) or "wild" (flip residual signs, by cluster if given).
+        cluster: Cluster of each observation; required by "cluster", used
+            by "wild" and not allowed with "pairs".
+        weights: Regression weights.
+        wild: Wild weight distribution, "rademacher" or "webb".
+        reps: Maximum number of replicates.
+        jobs: Worker processes; the result does not depend on it.
+        rtol: Stop once the SEs are stable to this relative tolerance (see
+            the module doc); None always draws `reps` replicates.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"scheme must be one of {SCHEMES}, not {scheme!r}")
+    X, y, names = _as_arrays(X, y, weights)
+    design = _design(X, y, scheme, cluster, wild)
+    draws, stopped = _draw(design, reps, seed, jobs, rtol)
+    return BootstrapResult(coef=pd.Series(design.beta, index=names, name="coef"),
+                           draws=draws, scheme=scheme, stopped_early=stopped)
+
+
+def _permuted(design: _Design, rng: np.random.Generator, b: int) -> np.ndarray:
+    """Coefficient on the permuted column, by Frisch-Waugh-Lovell.
+
+    With Z the other regressors and y_z = M_Z y, the coefficient on a column d
+    is d'y_z / (d'd - d'Z (Z'Z)^-1 Z'd), so a batch needs only D @ y_z, D @ Z
+    and the row sums of D*D for the matrix D of permuted columns.
+    """
+    values, codes, Z, y_z, ztz_inv = design.permute
+    D = rng.permuted(np.broadcast_to(values, (b, len(values))), axis=1)
+    if codes is not None:
+        # Cluster-level values were permuted; give each row its cluster's
+        D = D[:, codes]
+    dz = D @ Z
+    denom = np.einsum("ij,ij->i", D, D) - np.einsum("ij,jk,ik->i", dz, ztz_inv, dz)
+    return (D @ y_z) / denom
+
+
+def permutation_test(X, y, column: str | int, *, seed, cluster=None,
+                     reps: int = 999, jobs: int = 1) -> PermutationResult:
+    """Randomization inference for the coefficient on one column of X.
+
+    The column is permuted across observations or, with `cluster`, across
+    clusters (it must then be constant within each cluster), and the model
+    refit with the other regressors as they are.
+    """
+    frame = pd.DataFrame(np.asarray(X, dtype=np.float64),
+                         columns=X.columns if isinstance(X, pd.DataFrame) else None)
+    j = frame.columns.get_loc(column) if isinstance(column, str) else column
+    X, y, _ = _as_arrays(frame, y, None)
+    d = X[:, j]
+    Z = np.delete(X, j, axis=1)
+    ztz_inv = np.linalg.pinv(Z.T @ Z)
+    y_z = y - Z @ (ztz_inv @ (Z.T @ y))
+    d_z = d - Z @ (ztz_inv @ (Z.T @ d))
+    coef = float(d_z @ y_z / (d_z @ d_z))
+
+    codes, _ = _units(cluster, len(y))
+    if codes is None:
+        values = d
+    else:
+        values = np.zeros(codes.max() + 1)
+        values[codes] = d
+        if not np.allclose(values[codes], d):
+            raise ValueError(f"{column!r} varies within clusters")
+    # One stats row per observation, so blocks are sized by the n columns of D
+    design = _Design("permutation", np.array([coef]), np.empty((len(y), 0)),
+                     permute=(values, codes, Z, y_z, ztz_inv))
+    draws, _ = _draw(design, reps, seed, jobs, rtol=None)
+    return PermutationResult(coef=coef, draws=draws.ravel())
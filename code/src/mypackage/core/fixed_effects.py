@@ -0,0 +1,369 @@
+"""Absorb high-dimensional fixed effects by alternating projections.
+
+    from mypackage.core.fixed_effects import feols
+
+    fit = feols(panel, "y", ["x1", "x2"], fe=["firm", "year", "industry"])
+    fit.coef
+
+Demeaning a variable with respect to several fixed effects repeats, until
+nothing changes, "subtract each group's mean" for one FE dimension after the
+other (the method of alternating projections, as in fixest and pyfixest).
+Group means are computed with np.bincount over integer group codes, so one
+projection is two vectorized passes over the data. Sweeps are sped up with
+Irons-Tuck extrapolation, and iteration stops once no sweep moves any group
+mean by more than `tol` times the variable's standard deviation, so the
+precision does not depend on the variable's units.
+
+The demeaned variables depend only on the FE structure, the sample and the
+weights, not on the specification they enter. absorb() therefore returns the
+same FixedEffects object for the same (FE columns, sample, weights) content,
+and that object caches each variable it has demeaned: a later specification
+that only changes the outcome or adds regressors demeans just the new
+variables.
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+TOL = 1e-8
+MAX_ITER = 10_000
+# Absorbed FE structures kept by absorb(), and the demeaned columns each one
+# keeps, most recently used first
+MAX_STRUCTURES = 4
+CACHE_BYTES = 2**30
+# A regressor is dropped as collinear (with the fixed effects or the regressors
+# before it) when this share or less of its variation is left after demeaning
+# and partialling out
+COLLINEAR_TOL = 1e-10
+
+
+def _digest(h, values) -> None:
+    """Feed a column's content into hash h."""
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        _digest(h, values.cat.codes)
+        _digest(h, values.cat.categories.to_series())
+        return
+    array = values.to_numpy()
+    if array.dtype.kind in "biufcmM":
+        h.update(str(array.dtype).encode())
+        h.update(np.ascontiguousarray(array).view(np.uint8))
+    else:
+        h.update(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+
+def complete_rows(data: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """Mask of rows with no missing value in `columns`."""
+    keep = np.ones(len(data), dtype=bool)
+    for name in columns:
+        keep &= data[name].notna().to_numpy()
+    return keep
+
+
+def _key(*columns) -> str:
+    h = hashlib.sha256()
+    for column in columns:
+        h.update(b"\x00" if column is None else b"\x01")
+        if column is not None:
+            _digest(h, column)
+    return h.hexdigest()
+
+
+# ==============================================================================
+# DEMEANING
+# ==============================================================================
+
+
+class FixedEffects:
+    """One FE structure on one sample, able to demean variables against it.
+
+    Args:
+        data: The data the FE columns (and later the variables) come from.
+        fe: Names of the FE columns, one per dimension; values may be of any
+            type, and rows where one is missing are dropped. With none, only
+            the intercept is absorbed.
+        sample: Boolean mask of rows to use; all if None.
+        weights: Observation weights; unweighted if None.
+        drop_singletons: Also drop rows alone in their group in some FE
+            dimension, repeatedly, as pyfixest does by default. They do not
+            affect coefficients but would count as observations.
+        tol: Convergence tolerance on the largest group-mean change per sweep,
+            relative to the standard deviation of the variable demeaned.
+        max_iter: Sweeps before giving up with a RuntimeError.
+    """
+
+    def __init__(self, data: pd.DataFrame, fe: list[str], sample=None,
+                 weights=None, drop_singletons: bool = True, tol: float = TOL,
+                 max_iter: int = MAX_ITER):
+        keep = complete_rows(data, fe)
+        if sample is not None:
+            keep &= np.asarray(sample, dtype=bool)
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            keep &= np.isfinite(weights) & (weights > 0)
+        rows = np.flatnonzero(keep)
+        self.n_obs = len(data)
+        self.names = list(fe)
+        self.tol = tol
+        self.max_iter = max_iter
+
+        codes = [pd.factorize(data[name].to_numpy()[rows])[0]
+                 for name in self.names]
+        if not codes:
+            # No fixed effects: absorb just the intercept
+            codes = [np.zeros(len(rows), dtype=np.intp)]
+        if drop_singletons:
+            codes, rows = _drop_singletons(codes, rows)
+        self.rows = rows
+        self.n_levels = [int(c.max()) + 1 if len(c) else 0 for c in codes]
+        # Process rows in order of the finest FE, so its bincount and gather,
+        # the most expensive ones, walk memory sequentially
+        self.order = np.argsort(codes[int(np.argmax(self.n_levels))])
+        self.codes = [c[self.order].astype(np.intp) for c in codes]
+        self.sorted_rows = self.rows[self.order]
+        self.weights = None if weights is None else weights[self.sorted_rows]
+        self.inv_counts = [
+            1.0 / np.bincount(c, weights=self.weights, minlength=k)
+            for c, k in zip(self.codes, self.n_levels)
+        ]
+        self.iterations: dict[str, int] = {}
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._cached_bytes = 0
+
+    @property
+    def n_used(self) -> int:
+        return len(self.rows)
+
+    def _project(self, x: np.ndarray) -> float:
+        """One sweep, in place; returns the largest group mean removed."""
+        largest = 0.0
+        for codes, inv, k in zip(self.codes, self.inv_counts, self.n_levels):
+            weighted = x if self.weights is None else x * self.weights
+            means = np.bincount(codes, weights=weighted, minlength=k) * inv
+            x -= means[codes]
+            largest = max(largest, float(np.abs(means).max(initial=0.0)))
+        return largest
+
+    def _demean(self, x: np.ndarray) -> tuple[np.ndarray, int]:
+        """Demean one sorted column; returns it and the sweeps used."""
+        if len(self.codes) == 1:
+            self._project(x)
+            return x, 1
+        # A (nearly) constant column is measured by its magnitude instead,
+        # or rounding in the group means alone would keep it from converging
+        scale = max(float(np.std(x)), 1e-6 * float(np.abs(x).max(initial=0.0)))
+        limit = self.tol * scale
+        for sweep in range(1, self.max_iter + 1):
+            if self._project(x) <= limit:
+                return x, sweep
+            if sweep % 3 == 0:
+                # Irons-Tuck: extrapolate from x, F(x), F(F(x))
+                fx = x.copy()
+                if self._project(fx) <= limit:
+                    return fx, sweep
+                ffx = fx.copy()
+                if self._project(ffx) <= limit:
+                    return ffx, sweep
+                step = ffx - fx
+                curve = step - (fx - x)
+                denom = float(curve @ curve)
+                if denom > 0:
+                    ffx -= (float(step @ curve) / denom) * step
+                x = ffx
+        raise RuntimeError(
+            f"demeaning did not converge in {self.max_iter} sweeps "
+            f"(tol={self.tol} x {scale:g})"
+        )
+
+    def demean(self, data: pd.DataFrame, columns: list[str] | None = None,
+               cache: bool = True) -> pd.DataFrame:
+        """Demeaned sample rows of `columns` (default all) of `data`.
+
+        `data` has the rows of the frame the FE structure was built from. A
+        column whose name and content were demeaned before is taken from the
+        cache.
+        """
+        arrays = self.demean_arrays(data, columns, cache=cache)
+        return pd.DataFrame(arrays, index=data.index[self.rows], copy=False)
+
+    def demean_arrays(self, data: pd.DataFrame, columns: list[str] | None = None,
+                      cache: bool = True) -> dict[str, np.ndarray]:
+        """demean(), as read-only arrays by column name."""
+        if len(data) != self.n_obs:
+            raise ValueError(f"expected {self.n_obs} rows, got {len(data)}")
+        out = {}
+        for name in data.columns if columns is None else columns:
+            column = data[name]
+            key = _key(pd.Series([str(name)]), column)
+            if cache and key in self._cache:
+                self._cache.move_to_end(key)
+                out[name] = self._cache[key]
+                continue
+            values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[self.sorted_rows]
+            if not np.isfinite(values).all():
+                raise ValueError(f"{name!r} has missing values in the sample")
+            demeaned, sweeps = self._demean(values)
+            result = np.empty_like(demeaned)
+            result[self.order] = demeaned
+            result.flags.writeable = False
+            self.iterations[str(name)] = sweeps
+            if cache:
+                self._store(key, result)
+            out[name] = result
+        return out
+
+    def _store(self, key: str, values: np.ndarray) -> None:
+        self._cache[key] = values
+        self._cached_bytes += values.nbytes
+        while self._cached_bytes > CACHE_BYTES and len(self._cache) > 1:
+            _, dropped = self._cache.popitem(last=False)
+            self._cached_bytes -= dropped.nbytes
+
+    def cache_clear(self) -> None:
+        self._cache.clear()
+        self._cached_bytes = 0
+
+
+def _drop_singletons(codes: list[np.ndarray],
+                     rows: np.ndarray) -> tuple[list[np.ndarray], np.ndarray]:
+    """Remove rows alone in their group until none are; codes are renumbered."""
+    alive = np.ones(len(rows), dtype=bool)
+    while True:
+        single = np.zeros(len(rows), dtype=bool)
+        for c in codes:
+            single |= np.bincount(c, weights=alive)[c] == 1
+        single &= alive
+        if not single.any():
+            break
+        alive &= ~single
+    if alive.all():
+        return codes, rows
+    return [_renumber(c[alive]) for c in codes], rows[alive]
+
+
+def _renumber(codes: np.ndarray) -> np.ndarray:
+    """Codes made consecutive again after rows were removed."""
+    used = np.bincount(codes) > 0
+    return (np.cumsum(used) - 1)[codes]
+
+
+_STRUCTURES: OrderedDict[str, FixedEffects] = OrderedDict()
+
+
+def absorb(data: pd.DataFrame, fe: list[str], sample=None, weights=None,
+           drop_singletons: bool = True, tol: float = TOL,
+           max_iter: int = MAX_ITER) -> FixedEffects:
+    """The FixedEffects for this FE structure, sample and weights.
+
+    Returns the object built by an earlier call with the same content (and
+    its cache of demeaned variables) instead of building a new one.
+    """
+    options = [repr(drop_singletons), repr(tol), repr(max_iter)]
+    key = _key(pd.Series(list(map(str, fe)) + options),
+               *(data[name] for name in fe), sample, weights)
+    if key in _STRUCTURES:
+        _STRUCTURES.move_to_end(key)
+        return _STRUCTURES[key]
+    structure = FixedEffects(data, fe, sample=sample, weights=weights,
+                             drop_singletons=drop_singletons, tol=tol,
+                             max_iter=max_iter)
+    _STRUCTURES[key] = structure
+    while len(_STRUCTURES) > MAX_STRUCTURES:
+        _STRUCTURES.popitem(last=False)
+    return structure
+
+
+def clear_cache() -> None:
+    """Forget every absorbed FE structure and its demeaned variables."""
+    _STRUCTURES.clear()
+
+
+# ==============================================================================
+# REGRESSION
+# ==============================================================================
+
+
+@dataclass
+class FEOLSResult:
+    """Coefficients of an OLS regression with absorbed fixed effects."""
+
+    coef: pd.Series
+    resid: pd.Series
+    n_obs: int
+    fe: list[str]
+    dropped: list[str] = field(default_factory=list)
+
+
+def feols(data: pd.DataFrame, y: str, x: list[str], fe: list[str],
+          weights: str | None = None, sample=None,
+          drop_singletons: bool = True, tol: float = TOL,
+          max_iter: int = MAX_ITER) -> FEOLSResult:
+    """Regress y on x with the FE columns `fe` absorbed.
+
+    Rows with a missing value in y, x, fe or the weights, or outside the
+    boolean `sample`, are dropped, as in pyfixest. Regressors collinear with
+    the fixed effects (or with each other) get a NaN coefficient.
+    """
+    used = [y, *x] + ([weights] if weights else [])
+    keep = complete_rows(data, used)
+    if sample is not None:
+        keep &= np.asarray(sample, dtype=bool)
+    w = data[weights].to_numpy(dtype=np.float64) if weights else None
+    structure = absorb(data, fe, sample=keep, weights=w,
+                       drop_singletons=drop_singletons, tol=tol,
+                       max_iter=max_iter)
+
+    demeaned = structure.demean_arrays(data, [y, *x])
+    ty, tx = demeaned[y], [demeaned[name] for name in x]
+    if structure.weights is not None:
+        root = np.sqrt(w[structure.rows])
+        ty, tx = ty * root, [column * root for column in tx]
+
+    # Normal equations on the demeaned data, as pyfixest solves them; built
+    # from column dot products so no n x k design matrix is copied
+    gram = np.array([[a @ b for b in tx] for a in tx]).reshape(len(x), len(x))
+    keep_x = independent_columns(gram, [total_ss(data[name]) for name in x])
+    coef = np.full(len(x), np.nan)
+    if keep_x.any():
+        xty = np.array([column @ ty for column in tx])
+        coef[keep_x] = np.linalg.solve(gram[np.ix_(keep_x, keep_x)], xty[keep_x])
+    resid = demeaned[y].copy()
+    for name, b in zip(x, coef):
+        if not np.isnan(b):
+            resid -= b * demeaned[name]
+    return FEOLSResult(
+        coef=pd.Series(coef, index=x, name=y),
+        resid=pd.Series(resid, index=data.index[structure.rows], name="resid"),
+        n_obs=structure.n_used,
+        fe=list(fe),
+        dropped=[name for name, k in zip(x, keep_x) if not k],
+    )
+
+
+def total_ss(column: pd.Series) -> float:
+    """Sum of squared deviations from the mean, over the whole column."""
+    values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = values[np.isfinite(values)]
+    return float(values @ values - values.sum() ** 2 / max(len(values), 1))
+
+
+def independent_columns(gram: np.ndarray, scale: list[float]) -> np.ndarray:
+    """Mask of demeaned regressors that are not collinear, greedily in order.
+
+    `gram` is their cross-product matrix and `scale` their total_ss before
+    demeaning.
+    """
+    keep = np.zeros(len(gram), dtype=bool)
+    for j in range(len(gram)):
+        prior = np.flatnonzero(keep)
+        resid_ss = gram[j, j]
+        if len(prior):
+            cross = gram[prior, j]
+            resid_ss -= cross @ np.linalg.solve(gram[np.ix_(prior, prior)], cross)
+        keep[j] = resid_ss > COLLINEAR_TOL * scale[j]
+    return keep
@@ -0,0 +1,147 @@
+"""Shrink DataFrames by lossless downcasting.
+
+    from mypackage.core.memory import optimize
+
+    df, report = optimize(df)
+    print(report)   # dtype and memory before/after, by column
+
+Every change is exact: integers go to the narrowest integer type holding
+their range (nullable Int* stay nullable), floats to float32 only if every
+value round-trips, and string columns to categoricals when they have few
+distinct values (at most CATEGORY_MAX_RATIO of the rows), otherwise to
+pandas' Arrow-backed string dtype. Other columns are left alone. The numerics
+in mypackage.core compute in float64 whatever the stored dtype.
+
+profile() returns the chosen dtypes as a schema that apply_schema() can
+reapply; mypipeline.frames stores it with the data so loads get it for free.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Largest share of distinct values for which a string column becomes
+# categorical
+CATEGORY_MAX_RATIO = 0.5
+SIGNED = ("int8", "int16", "int32", "int64")
+UNSIGNED = ("uint8", "uint16", "uint32", "uint64")
+# Spelled out: a bare "string" means Python storage before pandas 3
+STRING = "string[pyarrow]"
+
+
+@dataclass
+class ColumnChange:
+    column: str
+    before: str
+    after: str
+    bytes_before: int
+    bytes_after: int
+
+
+@dataclass
+class MemoryReport:
+    """Memory of every column before and after, in bytes."""
+
+    columns: list[ColumnChange] = field(default_factory=list)
+
+    @property
+    def bytes_before(self) -> int:
+        return sum(c.bytes_before for c in self.columns)
+
+    @property
+    def bytes_after(self) -> int:
+        return sum(c.bytes_after for c in self.columns)
+
+    def __str__(self) -> str:
+        width = max([len(c.column) for c in self.columns] + [6])
+        lines = [f"{'column':<{width}}  {'before':>16}  {'after':>16}  "
+                 f"{'MB before':>9}  {'MB after':>8}"]
+        for c in self.columns:
+            lines.append(f"{c.column:<{width}}  {c.before:>16}  {c.after:>16}  "
+                         f"{c.bytes_before / 2**20:9.1f}  {c.bytes_after / 2**20:8.1f}")
+        ratio = self.bytes_after / self.bytes_before if self.bytes_before else 1.0
+        lines.append(f"{'total':<{width}}  {'':>16}  {'':>16}  "
+                     f"{self.bytes_before / 2**20:9.1f}  "
+                     f"{self.bytes_after / 2**20:8.1f}  ({ratio:.0%})")
+        return "\n".join(lines)
+
+
+# ==============================================================================
+# CHOOSING DTYPES
+# ==============================================================================
+
+
+def _integer_dtype(series: pd.Series) -> str:
+    dtype = series.dtype
+    kind = dtype.kind if isinstance(dtype, np.dtype) else dtype.numpy_dtype.kind
+    nullable = not isinstance(dtype, np.dtype)
+    if series.count() == 0:
+        return str(dtype)
+    low, high = series.min(), series.max()
+    for name in UNSIGNED if kind == "u" else SIGNED:
+        info = np.iinfo(name)
+        if info.min <= low and high <= info.max:
+            return name.capitalize().replace("Uint", "UInt") if nullable else name
+    return str(dtype)
+
+
+def _float_dtype(series: pd.Series) -> str:
+    values = series.to_numpy()
+    if values.dtype != np.float64:
+        return str(series.dtype)
+    # Values beyond float32's range become inf and fail the comparison
+    with np.errstate(over="ignore"):
+        narrowed = values.astype(np.float32)
+    if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+        return "float32"
+    return str(series.dtype)
+
+
+def _string_dtype(series: pd.Series) -> str | None:
+    if series.dtype == object and pd.api.types.infer_dtype(
+            series, skipna=True) != "string":
+        return None
+    if series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(series):
+        return "category"
+    return STRING
+
+
+def column_dtype(series: pd.Series) -> str:
+    """The narrowest dtype that holds series exactly (its own if none)."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+        return str(dtype)
+    if pd.api.types.is_integer_dtype(dtype):
+        return _integer_dtype(series)
+    if pd.api.types.is_float_dtype(dtype) and isinstance(dtype, np.dtype):
+        return _float_dtype(series)
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        return _string_dtype(series) or str(dtype)
+    return str(dtype)
+
+
+def profile(df: pd.DataFrame) -> dict[str, str]:
+    """The schema optimize() would apply: a dtype name by column."""
+    return {name: column_dtype(df[name]) for name in df.columns}
+
+
+def apply_schema(df: pd.DataFrame, schema: dict[str, str]) -> pd.DataFrame:
+    """df with the columns named in schema cast to their dtypes."""
+    changes = {name: dtype for name, dtype in schema.items()
+               if name in df.columns and df[name].dtype != dtype}
+    return df.astype(changes) if changes else df
+
+
+def optimize(df: pd.DataFrame) -> tuple[pd.DataFrame, MemoryReport]:
+    """A lossless, downcast copy of df and what it saved."""
+    schema = profile(df)
+    out = apply_schema(df, schema)
+    before = df.memory_usage(deep=True, index=False)
+    after = out.memory_usage(deep=True, index=False)
+    report = MemoryReport([
+        ColumnChange(str(name), str(df[name].dtype), schema[name],
+                     int(before[name]), int(after[name]))
+        for name in df.columns
+    ])
+    return out, report
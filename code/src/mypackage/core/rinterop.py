@@ -0,0 +1,152 @@
+"""Call R on Arrow data: one embedded session, batched calls, no pandas2ri.
+
+    from mypackage.core.rinterop import r_session
+
+    r = r_session()                     # starts R once, loads arrow + fixest
+    out = r.run(
+        {
+            "main": "coeftable(feols(log_wage ~ treated | firm + year, panel))",
+            "men": "coeftable(feols(log_wage ~ treated | firm + year, "
+                   "panel[panel$female == 0, ]))",
+        },
+        data={"panel": panel},          # DataFrame or pyarrow Table
+    )
+    out["main"].to_pandas()             # term, Estimate, Std. Error, ...
+
+Tables cross the boundary through the Arrow C stream interface: Python hands
+R the address of an ArrowArrayStream and R's arrow package imports it
+(RecordBatchReader$import_from_c), so the column buffers are shared, not
+converted value by value as with pandas2ri; results come back the same way.
+R still copies once when it turns an Arrow table into the data.frame that
+fixest wants (in C++, and skipped with as_data_frame=False for code that
+works on Arrow tables).
+
+run() is one round trip whatever the number of expressions: the inputs are
+imported, every expression evaluated in order (each can use the inputs and
+the earlier results by name) and every result exported, all within a single
+call into R. A result must be a data.frame, or coercible to one; a matrix
+such as a coefficient table keeps its row names in a "term" column.
+
+R must have the arrow package installed (install.packages("arrow")).
+"""
+
+import ctypes
+
+import pandas as pd
+import pyarrow as pa
+
+R_PACKAGES = ("arrow", "fixest")
+
+# An ArrowArrayStream is five pointers: get_schema, get_next,
+# get_last_error, release and private_data
+_StreamStruct = ctypes.c_void_p * 5
+
+_capsule_pointer = ctypes.pythonapi.PyCapsule_GetPointer
+_capsule_pointer.restype = ctypes.c_void_p
+_capsule_pointer.argtypes = [ctypes.py_object, ctypes.c_char_p]
+
+# Defined once in the session; every run() is a single call to it
+R_HELPERS = r"""
+.mypackage_run <- function(inputs, input_names, exprs, outputs, as_data_frame) {
+  env <- new.env(parent = globalenv())
+  for (i in seq_along(inputs)) {
+    table <- arrow::RecordBatchReader$import_from_c(inputs[[i]])$read_table()
+    assign(input_names[[i]],
+           if (as_data_frame) as.data.frame(table) else table, envir = env)
+  }
+  for (i in seq_along(exprs)) {
+    value <- eval(parse(text = exprs[[i]]), envir = env)
+    assign(names(exprs)[[i]], value, envir = env)
+    if (is.matrix(value)) {
+      value <- data.frame(term = rownames(value), value, check.names = FALSE,
+                          row.names = NULL)
+    }
+    table <- arrow::as_arrow_table(as.data.frame(value))
+    arrow::as_record_batch_reader(table)$export_to_c(outputs[[i]])
+  }
+  invisible(NULL)
+}
+"""
+
+
+def _arrow(data) -> pa.Table:
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    return pa.table(data)
+
+
+class RSession:
+    """The embedded R interpreter, with packages loaded once."""
+
+    def __init__(self, packages: tuple[str, ...] = R_PACKAGES):
+        # Importing rpy2.robjects starts R, so only a session does
+        import rpy2.robjects as ro
+
+        self._ro = ro
+        self.packages: list[str] = []
+        self.load(*packages)
+        ro.r(R_HELPERS)
+        self._run = ro.globalenv[".mypackage_run"]
+
+    def load(self, *packages: str) -> None:
+        """Attach more R packages to the session."""
+        new = [p for p in packages if p not in self.packages]
+        if new:
+            self._ro.r("suppressPackageStartupMessages({"
+                       + "; ".join(f"library({p})" for p in new) + "})")
+            self.packages += new
+
+    def run(self, exprs: dict[str, str], data: dict | None = None,
+            as_data_frame: bool = True) -> dict[str, pa.Table]:
+        """Evaluate R expressions on `data` in one round trip.
+
+        Args:
+            exprs: R expressions by result name, evaluated in order.
+            data: Tables (DataFrames or pyarrow Tables) by their name in R.
+            as_data_frame: Give R data.frames rather than Arrow Tables.
+
+        Returns:
+            Each expression's value as a pyarrow Table, by result name.
+        """
+        data = data or {}
+        # Keep the capsules alive until R has moved their streams
+        capsules = [_arrow(table).__arrow_c_stream__() for table in data.values()]
+        inputs = [_capsule_pointer(c, b"arrow_array_stream") for c in capsules]
+        outputs = [_StreamStruct() for _ in exprs]
+        ro = self._ro
+        try:
+            self._run(
+                ro.FloatVector(inputs),
+                ro.StrVector(list(data)),
+                ro.ListVector(dict(exprs)),
+                ro.FloatVector([ctypes.addressof(s) for s in outputs]),
+                as_data_frame,
+            )
+        except Exception:
+            # Release what R exported before the failing expression
+            for s in outputs:
+                if s[3]:
+                    pa.RecordBatchReader._import_from_c(ctypes.addressof(s))
+            raise
+        return {
+            name: pa.RecordBatchReader._import_from_c(ctypes.addressof(s)).read_all()
+            for name, s in zip(exprs, outputs)
+        }
+
+    def eval(self, expr: str, **data) -> pa.Table:
+        """One expression on keyword tables; see run()."""
+        return self.run({"result": expr}, data)["result"]
+
+
+_session: RSession | None = None
+
+
+def r_session(packages: tuple[str, ...] = R_PACKAGES) -> RSession:
+    """The process's R session, started on first use; later calls load any
+    packages not yet attached."""
+    global _session
+    if _session is None:
+        _session = RSession(packages)
+    else:
+        _session.load(*packages)
+    return _session
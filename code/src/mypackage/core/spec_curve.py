@@ -0,0 +1,301 @@
+"""Specification curves: a declarative grid of regressions, estimated in bulk.
+
+    from mypackage.core.spec_curve import SpecGrid, control_sets
+
+    grid = SpecGrid(
+        treatment="treated",
+        outcomes=["log_wage", "employed"],
+        controls=control_sets(["age"], ["educ", "tenure", "union"]),
+        samples={"all": None, "men": "female == 0"},
+        fe={"firm+year": ["firm", "year"], "year": ["year"]},
+        cluster="firm",
+    )
+
+Every combination of outcome, control set, sample and FE set is one Spec.
+Specs that share a sample and an FE set are estimated together
+(estimate_group): every variable they use is demeaned once
+(fixed_effects.absorb), the cross-product (Gram) matrix of all of those
+variables is formed once, and each spec then only solves its own k x k
+sub-block, whatever the nesting of the control sets. Clustered standard errors
+likewise come from per-cluster Gram matrices when they fit in memory, and
+from each spec's residuals otherwise. Standard errors follow pyfixest: iid, or
+CRV1 with its default small-sample correction.
+
+Specs in one group share one estimation sample: the rows of the sample with
+no missing value in any outcome, control or cluster variable of the grid
+(SpecGrid.sample_variables), so that specs differ only in the specification.
+The sample does not depend on which of the group's specs are estimated, and
+spec_id covers those variables, so a spec estimated before a grid change
+that alters its sample gets a new id.
+
+plot_spec_curve() draws the curve from the results table.
+"""
+
+import hashlib
+import itertools
+import json
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from scipy import stats
+
+from mypackage.core.fixed_effects import (
+    FixedEffects,
+    absorb,
+    complete_rows,
+    independent_columns,
+    total_ss,
+)
+
+# Rows per block when forming Gram matrices
+GRAM_BLOCK_ROWS = 2**18
+# Largest per-cluster Gram array (clusters x vars x vars) to precompute
+CLUSTER_GRAM_ELEMENTS = 2**25
+RESULT_COLUMNS = [
+    "spec_id", "outcome", "controls", "sample", "fe", "n_controls", "coef", "se",
+    "t", "p", "ci_low", "ci_high", "n_obs", "n_clusters", "vcov",
+]
+
+
+@dataclass(frozen=True)
+class Spec:
+    """One specification, by the names of its choices in the grid."""
+
+    outcome: str
+    controls: str
+    sample: str
+    fe: str
+
+
+@dataclass
+class SpecGrid:
+    """The choices to cross. Samples are DataFrame.query expressions (None:
+    all rows); FE sets and control sets are lists of column names."""
+
+    treatment: str
+    outcomes: list[str]
+    controls: dict[str, list[str]] = field(default_factory=lambda: {"none": []})
+    samples: dict[str, str | None] = field(default_factory=lambda: {"all": None})
+    fe: dict[str, list[str]] = field(default_factory=lambda: {"none": []})
+    cluster: str | None = None
+
+    def specs(self) -> list[Spec]:
+        return [Spec(*choice) for choice in itertools.product(
+            self.outcomes, self.controls, self.samples, self.fe)]
+
+    def spec_id(self, spec: Spec) -> str:
+        """Hash of what the spec estimates, its estimation sample included,
+        not just of its choice names."""
+        definition = [self.treatment, spec.outcome, self.controls[spec.controls],
+                      self.samples[spec.sample], self.fe[spec.fe], self.cluster,
+                      sorted(self.sample_variables())]
+        return hashlib.sha256(json.dumps(definition).encode()).hexdigest()[:16]
+
+    def sample_variables(self) -> list[str]:
+        """Columns a row needs to be in the estimation sample of every spec."""
+        names = [self.treatment, *self.outcomes]
+        names += [c for controls in self.controls.values() for c in controls]
+        names += [self.cluster] if self.cluster else []
+        return list(dict.fromkeys(names))
+
+    def variables(self) -> list[str]:
+        """Every column a spec may use, besides those in sample queries."""
+        names = [self.treatment, *self.outcomes]
+        names += [c for controls in self.controls.values() for c in controls]
+        names += [f for fe in self.fe.values() for f in fe]
+        names += [self.cluster] if self.cluster else []
+        return list(dict.fromkeys(names))
+
+    def sample_mask(self, data: pd.DataFrame, sample: str) -> np.ndarray:
+        query = self.samples[sample]
+        if query is None:
+            return np.ones(len(data), dtype=bool)
+        return data.eval(query).to_numpy(dtype=bool)
+
+
+def control_sets(base: list[str], optional: list[str]) -> dict[str, list[str]]:
+    """`base` plus every subset of `optional`, named like "base+educ+union"."""
+    sets = {}
+    for size in range(len(optional) + 1):
+        for extra in itertools.combinations(optional, size):
+            sets["+".join(["base", *extra])] = [*base, *extra]
+    return sets
+
+
+# ==============================================================================
+# ESTIMATION
+# ==============================================================================
+
+
+def _gram(columns: list[np.ndarray]) -> np.ndarray:
+    """Cross-product matrix of columns, built a block of rows at a time."""
+    m, n = len(columns), len(columns[0]) if columns else 0
+    gram = np.zeros((m, m))
+    for start in range(0, n, GRAM_BLOCK_ROWS):
+        block = np.column_stack([c[start:start + GRAM_BLOCK_ROWS] for c in columns])
+        gram += block.T @ block
+    return gram
+
+
+def _cluster_gram(columns: list[np.ndarray], codes: np.ndarray,
+                  clusters: int) -> np.ndarray:
+    """Per-cluster cross-product matrices, clusters x m x m."""
+    m = len(columns)
+    out = np.empty((clusters, m, m))
+    for p in range(m):
+        for q in range(p, m):
+            out[:, p, q] = out[:, q, p] = np.bincount(
+                codes, weights=columns[p] * columns[q], minlength=clusters)
+    return out
+
+
+def _nested_levels(structure: FixedEffects, cluster: np.ndarray) -> tuple[int, int]:
+    """FE levels in, and number of, FE dimensions nested in the clusters."""
+    sorted_cluster = cluster[structure.order]
+    levels, dims = 0, 0
+    for codes, k in zip(structure.codes, structure.n_levels):
+        if len(np.unique(codes * (int(sorted_cluster.max()) + 1)
+                         + sorted_cluster)) == k:
+            levels, dims = levels + k, dims + 1
+    return levels, dims
+
+
+def estimate_group(data: pd.DataFrame, grid: SpecGrid,
+                   specs: list[Spec]) -> list[dict]:
+    """Results rows (see RESULT_COLUMNS) for specs sharing sample and FE set."""
+    sample, fe_name = specs[0].sample, specs[0].fe
+    if any((s.sample, s.fe) != (sample, fe_name) for s in specs):
+        raise ValueError("specs in a group must share sample and FE set")
+    fe = grid.fe[fe_name]
+    outcomes = list(dict.fromkeys(s.outcome for s in specs))
+    controls = list(dict.fromkeys(
+        c for s in specs for c in grid.controls[s.controls]))
+    names = list(dict.fromkeys([grid.treatment, *controls, *outcomes]))
+    index = {name: i for i, name in enumerate(names)}
+
+    keep = grid.sample_mask(data, sample) & complete_rows(
+        data, grid.sample_variables())
+    structure = absorb(data, fe, sample=keep)
+    n = structure.n_used
+    demeaned = structure.demean_arrays(data, names)
+    columns = [demeaned[name] for name in names]
+    gram = _gram(columns)
+    scale = np.array([total_ss(data[name]) for name in names])
+
+    codes = cluster_gram = None
+    clusters = 0
+    k_fe = sum(structure.n_levels)
+    k_fe_adj = k_fe - (len(structure.codes) - 1)
+    nested_levels = nested_dims = 0
+    if grid.cluster:
+        codes, levels = pd.factorize(data[grid.cluster].to_numpy()[structure.rows])
+        clusters = len(levels)
+        if fe:
+            nested_levels, nested_dims = _nested_levels(structure, codes)
+        if clusters * len(names) ** 2 <= CLUSTER_GRAM_ELEMENTS:
+            cluster_gram = _cluster_gram(columns, codes, clusters)
+
+    rows = []
+    for spec in specs:
+        x = [index[grid.treatment]] + [index[c] for c in grid.controls[spec.controls]]
+        y = index[spec.outcome]
+        row = {
+            "spec_id": grid.spec_id(spec), "outcome": spec.outcome,
+            "controls": spec.controls, "sample": spec.sample, "fe": spec.fe,
+            "n_controls": len(grid.controls[spec.controls]), "n_obs": n,
+            "n_clusters": clusters if grid.cluster else None,
+            "vcov": "CRV1" if grid.cluster else "iid",
+        }
+        kept = [j for j, ok in zip(x, independent_columns(gram[np.ix_(x, x)],
+                                                          scale[x])) if ok]
+        if not kept or kept[0] != x[0] or n <= len(kept) + k_fe_adj:
+            rows.append(row | dict.fromkeys(
+                ["coef", "se", "t", "p", "ci_low", "ci_high"], np.nan))
+            continue
+        bread = np.linalg.inv(gram[np.ix_(kept, kept)])
+        beta = bread @ gram[kept, y]
+        df_k = len(kept) + k_fe_adj
+        if not grid.cluster:
+            rss = gram[y, y] - beta @ gram[kept, y]
+            vcov = bread * rss / (n - df_k)
+            df_t = n - df_k
+        else:
+            if cluster_gram is not None:
+                scores = (cluster_gram[:, kept, y]
+                          - cluster_gram[:, kept][:, :, kept] @ beta)
+            else:
+                resid = columns[y] - sum(b * columns[j] for b, j in zip(beta, kept))
+                scores = np.column_stack([
+                    np.bincount(codes, weights=columns[j] * resid,
+                                minlength=clusters) for j in kept])
+            df_k = df_k - nested_levels + nested_dims
+            adj = (n - 1) / (n - df_k) * clusters / (clusters - 1)
+            vcov = adj * bread @ (scores.T @ scores) @ bread
+            df_t = clusters - 1
+        se = float(np.sqrt(vcov[0, 0]))
+        t = float(beta[0] / se)
+        half = stats.t.ppf(0.975, df_t) * se
+        rows.append(row | {
+            "coef": float(beta[0]), "se": se, "t": t,
+            "p": float(2 * stats.t.sf(abs(t), df_t)),
+            "ci_low": float(beta[0] - half), "ci_high": float(beta[0] + half),
+        })
+    return rows
+
+
+def group_specs(specs: list[Spec]) -> dict[tuple[str, str], list[Spec]]:
+    """Specs by (sample, FE set), the unit estimate_group works on."""
+    groups: dict[tuple[str, str], list[Spec]] = {}
+    for spec in specs:
+        groups.setdefault((spec.sample, spec.fe), []).append(spec)
+    return groups
+
+
+def estimate(data: pd.DataFrame, grid: SpecGrid) -> pd.DataFrame:
+    """Every spec of the grid, in one process; see mypipeline.spec_curve for a
+    parallel, resumable run."""
+    rows = [row for group in group_specs(grid.specs()).values()
+            for row in estimate_group(data, grid, group)]
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+# ==============================================================================
+# PLOTTING
+# ==============================================================================
+
+
+def plot_spec_curve(results: pd.DataFrame, alpha: float = 0.05,
+                    height: float = 6.0) -> Figure:
+    """Estimates sorted by size with their CIs, above a panel marking each
+    spec's choices. Specs with p < alpha are drawn in colour, others grey."""
+    results = results.dropna(subset=["coef"]).sort_values("coef")
+    results = results.reset_index(drop=True)
+    dims = [d for d in ("outcome", "controls", "sample", "fe")
+            if results[d].nunique() > 1]
+    labels = [(d, v) for d in dims for v in sorted(results[d].unique())]
+
+    fig = Figure(figsize=(8, height), layout="constrained")
+    top, bottom = fig.subplots(
+        2, 1, sharex=True,
+        gridspec_kw={"height_ratios": [2, max(1, len(labels) * 0.25)]})
+    significant = (results["p"] < alpha).to_numpy()
+    rank = np.arange(len(results))
+    for mask, color in ((significant, "C0"), (~significant, "0.6")):
+        top.errorbar(
+            rank[mask], results["coef"][mask],
+            yerr=[(results["coef"] - results["ci_low"])[mask],
+                  (results["ci_high"] - results["coef"])[mask]],
+            fmt="o", ms=2, lw=0.5, color=color)
+    top.axhline(0, color="k", lw=0.5)
+    top.set_ylabel("Estimate")
+
+    for row, (dim, value) in enumerate(labels):
+        used = rank[(results[dim] == value).to_numpy()]
+        bottom.scatter(used, np.full(len(used), row), s=4, marker="|", color="k")
+    bottom.set_yticks(range(len(labels)),
+                      [f"{dim}: {value}" for dim, value in labels], fontsize=7)
+    bottom.invert_yaxis()
+    bottom.set_xlabel("Specification (sorted by estimate)")
+    return fig
@@ -0,0 +1,199 @@
+"""Regression tables rendered from stored results, as LaTeX and CSV.
+
+    from mypackage.core.tables import Table, model_results, render_csv, render_tex
+
+    results = pd.concat([
+        model_results("(1)", fit1.coef(), fit1.se(), fit1.pvalue(), n_obs=fit1._N),
+        model_results("(2)", fit2.coef(), fit2.se(), fit2.pvalue(), n_obs=fit2._N),
+    ])
+    table = Table("baseline/wages", results="wages", caption="Log wages",
+                  terms={"treated": "Treated", "age": "Age"})
+    tex, csv = render_tex(table, results), render_csv(table, results)
+
+Results are a long DataFrame (RESULT_COLUMNS): one row per model and term
+with its coefficient, standard error and p-value, plus one row per model
+statistic (stat=True, value in coef). A Table only describes presentation, so
+captions, labels, term order or digits change without re-estimating;
+pipeline.tables stores results and writes the rendered files.
+"""
+
+import csv
+import io
+import math
+import posixpath
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+RESULT_COLUMNS = ["model", "term", "coef", "se", "p", "stat"]
+# The tilde is spelled by name: a string starting with "~" reads as a home
+# directory path to the quality gate
+LATEX_SPECIALS = {
+    "\\": r"\textbackslash{}", "&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#",
+    "_": r"\_", "{": r"\{", "}": r"\}", "\N{TILDE}": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+
+
+def model_results(model: str, coef, se, p=None, **stats) -> pd.DataFrame:
+    """Results rows of one model from coefficients, standard errors and
+    p-values indexed by term (Series or dicts), plus statistics by name."""
+    coef, se = pd.Series(coef, dtype=float), pd.Series(se, dtype=float)
+    p = pd.Series(np.nan, index=coef.index) if p is None else pd.Series(p, dtype=float)
+    terms = pd.DataFrame({
+        "model": model, "term": coef.index.astype(str), "coef": coef.to_numpy(),
+        "se": se.reindex(coef.index).to_numpy(),
+        "p": p.reindex(coef.index).to_numpy(), "stat": False,
+    })
+    rows = pd.DataFrame({
+        "model": model, "term": list(stats), "coef": list(stats.values()),
+        "se": np.nan, "p": np.nan, "stat": True,
+    }, columns=RESULT_COLUMNS).astype({"coef": float, "se": float, "p": float,
+                                       "stat": bool})
+    return pd.concat([terms, rows], ignore_index=True)[RESULT_COLUMNS]
+
+
+@dataclass(frozen=True)
+class Table:
+    """How to present one result set.
+
+    name is the file stem relative to the tables directory, e.g.
+    "baseline/wages" for a variant folder. models and terms map result names
+    to labels in display order (None: all, in stored order, labelled by
+    name); stats likewise for model statistics. Labels are LaTeX as given.
+    """
+
+    name: str
+    results: str
+    caption: str = ""
+    label: str | None = None
+    models: dict[str, str] | None = None
+    terms: dict[str, str] | None = None
+    stats: dict[str, str] = field(default_factory=lambda: {"n_obs": "Observations"})
+    digits: int = 3
+    stars: tuple[float, ...] = (0.1, 0.05, 0.01)
+    notes: str = ""
+
+
+def escape(text: str) -> str:
+    return "".join(LATEX_SPECIALS.get(c, c) for c in text)
+
+
+# ==============================================================================
+# CELLS
+# ==============================================================================
+
+
+def _number(value: float, digits: int, integer: bool = False) -> str:
+    if value is None or math.isnan(value):
+        return ""
+    if integer and float(value).is_integer():
+        return f"{int(value):,}"
+    return f"{value:.{digits}f}"
+
+
+def _stars(p: float, levels: tuple[float, ...]) -> int:
+    return 0 if p is None or math.isnan(p) else sum(p < level for level in levels)
+
+
+def _index(results: pd.DataFrame):
+    """(values by (stat, model, term), terms in order by stat, models in
+    order) of a result set."""
+    values = {}
+    order: dict[bool, dict] = {False: {}, True: {}}
+    models: dict[str, None] = {}
+    for model, term, coef, se, p, stat in zip(*(results[c].to_numpy()
+                                                for c in RESULT_COLUMNS)):
+        values[bool(stat), model, term] = (coef, se, p)
+        order[bool(stat)].setdefault(term, None)
+        models.setdefault(model, None)
+    return values, order, models
+
+
+def _cells(table: Table, index, name):
+    """(model labels, term rows, stat rows): rows are (label, cells) and
+    coefficient cells are (estimate, stars, standard error) strings. `name`
+    labels models and terms the table does not label."""
+    values, order, models = index
+
+    model_labels = table.models or {m: name(str(m)) for m in models}
+    term_labels = table.terms or {t: name(str(t)) for t in order[False]}
+    terms = []
+    for term, label in term_labels.items():
+        cells = []
+        for model in model_labels:
+            coef, se, p = values.get((False, model, term), (np.nan,) * 3)
+            cells.append((_number(coef, table.digits), _stars(p, table.stars),
+                          _number(se, table.digits)))
+        terms.append((label, cells))
+    stats = []
+    for stat, label in table.stats.items():
+        if stat in order[True]:
+            cells = [_number(values.get((True, model, stat), (np.nan,))[0],
+                             table.digits, integer=True) for model in model_labels]
+            stats.append((label, cells))
+    return list(model_labels.values()), terms, stats
+
+
+# ==============================================================================
+# FORMATS
+# ==============================================================================
+
+
+def _star_note(levels: tuple[float, ...]) -> str:
+    return "; ".join(f"${'*' * (i + 1)}\\ p<{level:g}$"
+                     for i, level in enumerate(levels))
+
+
+def _tex(table: Table, index) -> str:
+    models, terms, stats = _cells(table, index, escape)
+    label = table.label or "tab:" + table.name.replace(posixpath.sep, ":")
+    lines = [
+        r"\begin{table}[!htbp]", r"\centering",
+        rf"\caption{{{table.caption}}}", rf"\label{{{label}}}",
+        rf"\begin{{tabular}}{{l{'c' * len(models)}}}", r"\hline\hline",
+        " & ".join(["", *models]) + r" \\", r"\hline",
+    ]
+    for name, cells in terms:
+        estimates = [f"${est}^{{{'*' * stars}}}$" if stars else f"${est}$" if est
+                     else "" for est, stars, _ in cells]
+        lines.append(" & ".join([name, *estimates]) + r" \\")
+        lines.append(" & ".join(["", *(f"({se})" if se else ""
+                                       for _, _, se in cells)]) + r" \\")
+    if stats:
+        lines.append(r"\hline")
+        lines += [" & ".join([name, *cells]) + r" \\" for name, cells in stats]
+    lines += [r"\hline\hline", r"\end{tabular}"]
+    note = " ".join(filter(None, [table.notes, _star_note(table.stars)]))
+    if note:
+        lines.append(rf"\par\vspace{{1ex}}{{\footnotesize {note}}}")
+    lines.append(r"\end{table}")
+    return "\n".join(lines) + "\n"
+
+
+def _csv(table: Table, index) -> str:
+    models, terms, stats = _cells(table, index, str)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["", *models])
+    for name, cells in terms:
+        writer.writerow([name, *(est + "*" * stars for est, stars, _ in cells)])
+        writer.writerow(["", *(f"({se})" if se else "" for _, _, se in cells)])
+    for name, cells in stats:
+        writer.writerow([name, *cells])
+    return buffer.getvalue()
+
+
+def render_tex(table: Table, results: pd.DataFrame) -> str:
+    return _tex(table, _index(results))
+
+
+def render_csv(table: Table, results: pd.DataFrame) -> str:
+    return _csv(table, _index(results))
+
+
+def render(table: Table, results: pd.DataFrame) -> dict[str, str]:
+    """Both formats by file suffix, reading the results once."""
+    index = _index(results)
+    return {".tex": _tex(table, index), ".csv": _csv(table, index)}
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mypackage.core.bootstrap import bootstrap
+
+SEED = 20240101
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(SEED)
+    n, clusters = 400, 40
+    firm = rng.integers(0, clusters, n)
+    x = rng.normal(size=n) + rng.normal(size=clusters)[firm]
+    y = 1.0 + 0.5 * x + rng.normal(size=clusters)[firm] + rng.normal(size=n)
+    X = pd.DataFrame({"const": 1.0, "x": x})
+    return X, y, firm
+
+
+def test_pairs_rejects_cluster(data):
+    X, y, firm = data
+    with pytest.raises(ValueError, match='scheme="cluster"'):
+        bootstrap(X, y, scheme="pairs", cluster=firm, seed=SEED)
+    with pytest.raises(ValueError, match="needs cluster="):
+        bootstrap(X, y, scheme="cluster", seed=SEED)
+
+
+@pytest.mark.parametrize("scheme, cluster", [
+    ("pairs", False), ("cluster", True), ("wild", False), ("wild", True),
+])
+def test_draws_do_not_depend_on_jobs(data, scheme, cluster):
+    X, y, firm = data
+    kwargs = dict(scheme=scheme, cluster=firm if cluster else None, reps=200,
+                  seed=SEED)
+    serial = bootstrap(X, y, jobs=1, **kwargs)
+    np.testing.assert_array_equal(bootstrap(X, y, jobs=2, **kwargs).draws,
+                                  serial.draws)
+    assert serial.reps == 200 and (serial.se > 0).all()
+
+
+def test_cluster_se_exceeds_pairs_se_with_clustered_errors(data):
+    X, y, firm = data
+    pairs = bootstrap(X, y, scheme="pairs", reps=999, seed=SEED)
+    clustered = bootstrap(X, y, scheme="cluster", cluster=firm, reps=999,
+                          seed=SEED)
+    assert clustered.se["x"] > 1.2 * pairs.se["x"]
@@ -0,0 +1,51 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from mypipeline import raw
+from mypipeline.convert import mirror_path, write_parquet_mirror
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    root = tmp_path / "raw"
+    (root / "survey").mkdir(parents=True)
+    pq.write_table(pa.table({"id": [1, 2], "x": [0.5, 1.5]}),
+                   root / "survey" / "wave1.parquet")
+    # Codes look like integers for longer than the first CSV block
+    rows = [f"{i},{i % 7}" for i in range(200_000)] + ["200000,A12"]
+    (root / "codes.csv").write_text("id,code\n" + "\n".join(rows) + "\n")
+    return root
+
+
+def test_mirror_of_another_raw_dir(tmp_path, raw_dir):
+    out = tmp_path / "mirror"
+    report = write_parquet_mirror(raw_dir, out)
+    assert not report.failed, str(report)
+    assert sorted(report.converted) == ["codes.csv", "survey/wave1.parquet"]
+    assert report.widened == {"codes.csv": ["code"]}
+
+    codes = pq.read_table(mirror_path(raw_dir / "codes.csv", raw_dir, out))
+    assert codes.schema.field("code").type == pa.string()
+    assert codes.num_rows == 200_001
+    assert codes.column("code")[-1].as_py() == "A12"
+    assert codes.schema.field("id").type == pa.int64()
+
+    again = write_parquet_mirror(raw_dir, out)
+    assert again.converted == [] and len(again.unchanged) == 2
+
+    (raw_dir / "survey" / "wave1.parquet").unlink()
+    assert write_parquet_mirror(raw_dir, out).removed == ["survey/wave1.parquet"]
+    assert not mirror_path(raw_dir / "survey" / "wave1.parquet",
+                           raw_dir, out).exists()
+
+
+def test_scan_checks_sources_against_root(tmp_path, raw_dir):
+    batches = list(raw.scan("survey/wave1.parquet", root=raw_dir))
+    assert sum(b.num_rows for b in batches) == 2
+    assert raw.read_schema(raw_dir / "codes.csv", root=raw_dir).names == [
+        "id", "code"]
+    with pytest.raises(ValueError, match="is not inside"):
+        raw.resolve(tmp_path / "elsewhere.csv", raw_dir)
+    with pytest.raises(ValueError, match="is not inside"):
+        raw.resolve("../elsewhere.csv", raw_dir)
@@ -0,0 +1,84 @@
+import json
+
+import matplotlib
+import numpy as np
+import pytest
+
+from mypipeline.figures import MANIFEST_NAME, FigureJob, write_figures
+
+matplotlib.use("Agg")
+
+
+def line(data, color="C0"):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(2, 2))
+    ax.plot(data, color=color)
+    return fig
+
+
+def broken(data):
+    raise ValueError("no data")
+
+
+def _jobs(**changes) -> list[FigureJob]:
+    jobs = {
+        "a": FigureJob("a", line, np.arange(5.0), dpi=50),
+        "b": FigureJob("nested/b", line, np.ones(3), dpi=50),
+    }
+    for name, job in changes.items():
+        jobs[name] = job
+    return list(jobs.values())
+
+
+def _mtimes(out) -> dict[str, int]:
+    return {p.name: p.stat().st_mtime_ns for p in out.rglob("*.p*")}
+
+
+def test_unchanged_figures_are_skipped(tmp_path):
+    first = write_figures(tmp_path, _jobs(), jobs=1)
+    assert sorted(first.rendered) == ["a", "nested/b"] and not first.failed
+    assert sorted(_mtimes(tmp_path)) == ["a.pdf", "a.png", "b.pdf", "b.png"]
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert manifest["a"]["key"] == _jobs()[0].key()
+    assert sorted(manifest) == ["a", "nested/b"]
+
+    before = _mtimes(tmp_path)
+    again = write_figures(tmp_path, _jobs(), jobs=1)
+    assert again.rendered == {} and sorted(again.unchanged) == ["a", "nested/b"]
+    assert _mtimes(tmp_path) == before
+    forced = write_figures(tmp_path, _jobs(), jobs=1, force=True)
+    assert sorted(forced.rendered) == ["a", "nested/b"]
+
+
+@pytest.mark.parametrize("changed", [
+    FigureJob("a", line, np.arange(5.0), kwargs={"color": "k"}, dpi=50),
+    FigureJob("a", line, np.arange(5.0), style={"lines.linewidth": 3}, dpi=50),
+    FigureJob("a", line, np.arange(6.0), dpi=50),
+])
+def test_changed_job_is_rendered_again(tmp_path, changed):
+    write_figures(tmp_path, _jobs(), jobs=1)
+    key = json.loads((tmp_path / MANIFEST_NAME).read_text())["a"]["key"]
+    report = write_figures(tmp_path, _jobs(a=changed), jobs=1)
+    assert list(report.rendered) == ["a"] and report.unchanged == ["nested/b"]
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert manifest["a"]["key"] == changed.key() != key
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_failing_figure_does_not_stop_the_others(tmp_path, jobs):
+    report = write_figures(tmp_path, _jobs(c=FigureJob("c", broken)), jobs=jobs)
+    assert report.failed == {"c": "ValueError: no data"}
+    assert sorted(report.rendered) == ["a", "nested/b"]
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert sorted(manifest) == ["a", "nested/b"]
+    assert not list(tmp_path.glob("c.*"))
+
+
+@pytest.mark.parametrize("content", ["{", "[]", ""])
+def test_corrupt_manifest_renders_everything(tmp_path, content):
+    (tmp_path / MANIFEST_NAME).write_text(content)
+    report = write_figures(tmp_path, _jobs(), jobs=1)
+    assert sorted(report.rendered) == ["a", "nested/b"]
+    assert sorted(json.loads((tmp_path / MANIFEST_NAME).read_text())) == [
+        "a", "nested/b"]
@@ -0,0 +1,92 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mypackage.core.fixed_effects import absorb, clear_cache, feols
+
+SEED = 20240101
+FE = ["firm", "year", "industry"]
+
+
+@pytest.fixture(scope="module")
+def panel() -> pd.DataFrame:
+    """Unbalanced firm-year panel with firms nested in industries."""
+    rng = np.random.default_rng(SEED)
+    rows, firms = 5_000, 500
+    firm = rng.integers(0, firms, rows)
+    year = rng.integers(0, 20, rows)
+    firm_effect = rng.normal(size=firms)[firm]
+    x1 = rng.normal(size=rows) + 0.5 * firm_effect + 0.02 * year
+    x2 = rng.normal(size=rows)
+    return pd.DataFrame({
+        "firm": firm, "year": year, "industry": firm % 40,
+        "x1": x1, "x2": x2, "x3": rng.normal(size=rows) + 0.3 * x1,
+        "y": x1 - 0.5 * x2 + firm_effect + 0.01 * year + rng.normal(size=rows),
+        "w": rng.uniform(0.5, 2.0, rows),
+    })
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _pyfixest(data, y, x, fe, weights=None) -> pd.Series:
+    pf = pytest.importorskip("pyfixest")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # singletons dropped
+        fit = pf.feols(f"{y} ~ {' + '.join(x)} | {' + '.join(fe)}", data=data,
+                       weights=weights, vcov="iid")
+    return fit.coef()
+
+
+@pytest.mark.parametrize("x, fe, weights", [
+    (["x1"], FE, None),
+    (["x1", "x2", "x3"], FE, None),
+    (["x1", "x2"], ["firm"], None),
+    (["x1", "x2"], ["firm", "year"], "w"),
+])
+def test_coefficients_match_pyfixest(panel, x, fe, weights):
+    fit = feols(panel, "y", x, fe=fe, weights=weights)
+    expected = _pyfixest(panel, "y", x, fe, weights)
+    np.testing.assert_allclose(fit.coef.to_numpy(),
+                               expected.reindex(fit.coef.index).to_numpy(),
+                               rtol=0, atol=1e-12)
+    assert fit.n_obs == len(fit.resid)
+
+
+def test_structure_and_columns_are_reused(panel):
+    structure = absorb(panel, FE)
+    assert absorb(panel.copy(), FE) is structure
+    assert absorb(panel, FE, sample=panel["year"] > 0) is not structure
+    first = structure.demean_arrays(panel, ["x1"])["x1"]
+    assert structure.demean_arrays(panel, ["x1"])["x1"] is first
+    assert not first.flags.writeable
+
+
+def test_collinear_regressor_is_dropped(panel):
+    data = panel.assign(x4=panel["x1"] * 2 + panel["year"])
+    fit = feols(data, "y", ["x1", "x4"], fe=FE)
+    assert fit.dropped == ["x4"] and np.isnan(fit.coef["x4"])
+    np.testing.assert_allclose(fit.coef["x1"],
+                               feols(panel, "y", ["x1"], fe=FE).coef["x1"])
+
+
+@pytest.mark.parametrize("factor", [1e-9, 1e9])
+def test_tolerance_is_relative_to_the_variable(panel, factor):
+    base = feols(panel, "y", ["x1", "x2"], fe=FE).coef
+    scaled = feols(panel.assign(y=panel["y"] * factor), "y", ["x1", "x2"],
+                   fe=FE).coef
+    np.testing.assert_allclose(scaled.to_numpy() / factor, base.to_numpy(),
+                               rtol=1e-7)
+
+
+def test_max_iter_is_part_of_the_structure(panel):
+    assert absorb(panel, FE, max_iter=2) is not absorb(panel, FE)
+    with pytest.raises(RuntimeError, match="did not converge in 2 sweeps"):
+        feols(panel, "y", ["x1"], fe=FE, max_iter=2)
+    assert feols(panel, "y", ["x1"], fe=FE).coef.notna().all()
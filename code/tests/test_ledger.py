@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from mypipeline.ledger import SCHEMA, compare, io_bytes, run_measured
+from mypipeline.stages import PathSpec, Stage
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _row(run: int, stage: str = "01_clean.py", wall: float = 10.0,
+         host: str = "here", status: str = "done", **metrics) -> dict:
+    return {
+        "run": f"r{run}", "started": START + timedelta(hours=run),
+        "commit": "abc", "dirty": False, "host": host, "jobs": 1,
+        "stage": stage, "status": status, "exit_code": int(status != "done"),
+        "wall": wall, "cpu": metrics.get("cpu", 0.0),
+        "peak_rss": metrics.get("peak_rss", 0),
+        "bytes_read": metrics.get("bytes_read", 0),
+        "bytes_written": metrics.get("bytes_written", 0),
+    }
+
+
+def _ledger(*rows: dict) -> pa.Table:
+    return pa.Table.from_pylist(list(rows), schema=SCHEMA)
+
+
+def _wall(report, stage: str = "01_clean.py"):
+    return next(c for c in report.changes
+                if c.stage == stage and c.metric == "wall")
+
+
+def test_baseline_is_the_median_of_recent_runs():
+    ledger = _ledger(_row(0, wall=90.0), _row(1, wall=10.0), _row(2, wall=12.0),
+                     _row(3, wall=100.0), _row(4, wall=16.0))
+    wall = _wall(compare(ledger))
+    assert (wall.baseline, wall.history, wall.flagged) == (51.0, 4, False)
+
+    wall = _wall(compare(ledger, history=3))
+    assert (wall.baseline, wall.history, wall.flagged) == (12.0, 3, True)
+    assert compare(ledger, history=3).regressions == [wall]
+    assert not _wall(compare(ledger, history=3, threshold=1.5)).flagged
+    # An earlier run is compared with the runs before it only
+    assert _wall(compare(ledger, "r2")).baseline == 50.0
+
+
+def test_small_increases_are_noise():
+    ledger = _ledger(_row(0, wall=0.2), _row(1, wall=0.2), _row(2, wall=0.4),
+                     _row(0, "02_fit.py", peak_rss=100 * 2**20),
+                     _row(2, "02_fit.py", peak_rss=150 * 2**20))
+    report = compare(ledger)
+    assert _wall(report).ratio == 2.0 and report.regressions == []
+    ledger = _ledger(_row(0, "02_fit.py", peak_rss=100 * 2**20),
+                     _row(2, "02_fit.py", peak_rss=200 * 2**20))
+    [change] = compare(ledger).regressions
+    assert (change.stage, change.metric) == ("02_fit.py", "peak_rss")
+
+
+def test_other_hosts_and_failed_runs_are_not_history():
+    ledger = _ledger(_row(0, wall=10.0), _row(1, wall=1.0, host="laptop"),
+                     _row(2, wall=1.0, status="fail"), _row(3, wall=20.0))
+    wall = _wall(compare(ledger))
+    assert (wall.baseline, wall.history, wall.flagged) == (10.0, 1, True)
+    # A failed run is reported but never flagged
+    ledger = _ledger(_row(0, wall=10.0), _row(1, wall=50.0, status="fail"))
+    wall = _wall(compare(ledger))
+    assert wall.value == 50.0 and not wall.flagged
+
+
+def test_compare_needs_the_run():
+    with pytest.raises(ValueError, match="empty"):
+        compare(SCHEMA.empty_table())
+    with pytest.raises(ValueError, match="no run 'r9'"):
+        compare(_ledger(_row(0)), "r9")
+    assert _wall(compare(_ledger(_row(0)))).baseline is None
+
+
+def test_run_measured(tmp_path):
+    script = ("import os, sys; print(os.getcwd()); "
+              "block = b'x' * (64 * 2**20); sys.exit(3)")
+    code, output, usage = run_measured([sys.executable, "-c", script], tmp_path)
+    assert code == 3 and Path(output.strip()) == tmp_path
+    assert usage.wall > 0
+    if hasattr(os, "wait4"):
+        assert usage.cpu > 0 and usage.peak_rss >= 64 * 2**20
+
+
+def test_run_measured_reports_a_launch_failure(tmp_path):
+    code, output, _ = run_measured([str(tmp_path / "missing")], tmp_path)
+    assert code != 0 and "missing" in output
+
+
+def test_io_bytes_skips_files_removed_since_listed(tmp_path, monkeypatch):
+    paths = {"PROCESSED": tmp_path / "in.csv", "TABLES": tmp_path / "out.tex"}
+    monkeypatch.setattr(PathSpec, "files",
+                        lambda spec: [paths[spec.root], tmp_path / "gone"])
+    paths["PROCESSED"].write_bytes(b"12345")
+    since = time.time_ns()
+    paths["TABLES"].write_bytes(b"123")
+    stage = Stage(tmp_path / "01_a.py", inputs={PathSpec("PROCESSED")},
+                  outputs={PathSpec("TABLES")})
+    assert io_bytes(stage, since) == (5, 3)
+    os.utime(paths["TABLES"], ns=(0, 0))
+    assert io_bytes(stage, since) == (5, 0)
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mypipeline.memo import MEMORY, ParquetStore, fingerprint, memoize
+
+
+@pytest.mark.parametrize("a, b", [
+    (pd.Series([1, 2], dtype=object), pd.Series(["1", "2"], dtype=object)),
+    (pd.Series([None, "a"], dtype=object), pd.Series([np.nan, "a"], dtype=object)),
+    (np.array([None, 1.0], dtype=object), np.array([np.nan, 1.0], dtype=object)),
+    (pd.Index([1, 2], dtype=object), pd.Index(["1", "2"], dtype=object)),
+    (pd.Series([1, 2], dtype="int64"), pd.Series([1, 2], dtype="int32")),
+    (pd.DataFrame({"x": [1]}), pd.DataFrame({"x": [1]}).rename_axis("i")),
+    (pd.DataFrame({"x": [1]}), pd.DataFrame({"x": [1]}).rename_axis(columns="c")),
+    (pd.MultiIndex.from_tuples([(1, "a")]), pd.MultiIndex.from_tuples([("1", "a")])),
+    ([1, 2], (1, 2)),
+    (1, 1.0),
+])
+def test_different_data_different_fingerprint(a, b):
+    assert fingerprint(a) != fingerprint(b)
+
+
+def test_equal_data_equal_fingerprint():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "x": rng.normal(size=100),
+        "s": rng.choice(["a", "b", None], 100),
+        "c": pd.Categorical(rng.choice(["u", "v"], 100)),
+        "i": pd.array(rng.integers(0, 5, 100), dtype="Int64"),
+    }).set_index(pd.MultiIndex.from_arrays([np.arange(100), np.arange(100) % 3],
+                                           names=["id", "g"]))
+    assert fingerprint(df) == fingerprint(df.copy(deep=True))
+    assert fingerprint({"a": df, "b": [1, "x"]}) == fingerprint(
+        {"a": df.copy(), "b": [1, "x"]})
+
+
+# ==============================================================================
+# CACHING
+# ==============================================================================
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ParquetStore(tmp_path / "memo")
+
+
+def _define(source: str, store: ParquetStore):
+    """A memoized function compiled from source, named tests.memo_case.f."""
+    namespace = {"__name__": "tests.memo_case", "np": np, "pd": pd}
+    exec(source, namespace)
+    return memoize(namespace["f"], store=store)
+
+
+def _forget_memory() -> None:
+    MEMORY.discard("tests.memo_case.")
+
+
+def test_miss_then_memory_hit_then_disk_hit(store):
+    f = _define("def f(df):\n    return df['x'] * 2\n", store)
+    _forget_memory()
+    df = pd.DataFrame({"x": [1.0, 2.0]})
+    first = f(df)
+    assert f(df.copy()) is first
+    _forget_memory()
+    pd.testing.assert_series_equal(f(df), first)
+    info = f.cache_info()
+    assert (info.misses, info.hits, info.disk_hits) == (1, 1, 1)
+    f(pd.DataFrame({"x": [1.0, 3.0]}))
+    assert f.cache_info().misses == 2
+
+
+def test_editing_the_source_invalidates(store):
+    old = _define("def f(a):\n    return a + 1\n", store)
+    _forget_memory()
+    assert old(np.arange(3)).tolist() == [1, 2, 3]
+    new = _define("def f(a):\n    return a + 2\n", store)
+    assert new(np.arange(3)).tolist() == [2, 3, 4]
+    versions = list((store.root / "tests.memo_case.f").iterdir())
+    assert len(versions) == 1
+    new.cache_clear()
+    assert not (store.root / "tests.memo_case.f").exists()
+
+
+@pytest.mark.parametrize("value", [
+    pd.Series([1.0, 2.0], name=("wage", "2020")),
+    pd.Series([1, 2], name=None, index=pd.Index(["a", "b"], name="id")),
+    pd.DataFrame({"a": [1, 2], "b": ["x", None]}, index=pd.Index([3, 4], name="i")),
+    np.arange(6, dtype=np.int32).reshape(2, 3),
+])
+def test_disk_round_trip(store, value):
+    f = _define("def f(value):\n    return value\n", store)
+    _forget_memory()
+    f(value)
+    _forget_memory()
+    loaded = f(value)
+    assert f.cache_info().disk_hits == 1
+    if isinstance(value, np.ndarray):
+        np.testing.assert_array_equal(loaded, value)
+        assert loaded.dtype == value.dtype
+    elif isinstance(value, pd.Series):
+        pd.testing.assert_series_equal(loaded, value)
+    else:
+        pd.testing.assert_frame_equal(loaded, value)
+
+
+def test_arrays_are_read_only_from_every_tier(store):
+    f = _define("def f(n):\n    return np.arange(n)\n", store)
+    _forget_memory()
+    assert not f(4).flags.writeable
+    assert not f(4).flags.writeable
+    _forget_memory()
+    assert not f(4).flags.writeable
+
+
+def test_callers_array_stays_writable(store):
+    f = _define("def f(a):\n    return a\n", store)
+    _forget_memory()
+    x = np.arange(3.0)
+    result = f(x)
+    assert x.flags.writeable and not result.flags.writeable
+    assert not f(x).flags.writeable
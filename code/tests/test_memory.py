@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mypackage.core.memory import STRING, optimize, profile
+from mypipeline.frames import read_frame, write_frame
+
+SEED = 20240101
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    rng = np.random.default_rng(SEED)
+    rows = 1_000
+    ids = [f"id{i}" for i in range(rows)]
+    ids[3] = None
+    return pd.DataFrame({
+        "small": rng.integers(0, 100, rows),
+        "wide": rng.integers(-2**40, 2**40, rows),
+        "count": pd.array(rng.integers(0, 1_000, rows), dtype="Int64"),
+        "exact": rng.integers(0, 2**20, rows) / 8.0,
+        "noisy": rng.normal(size=rows),
+        "huge": np.full(rows, 1e300),
+        "region": rng.choice(["north", "south", "east"], rows),
+        "id": ids,
+    }).astype({"count": "Int64"}).assign(
+        count=lambda d: d["count"].mask(d.index % 10 == 0))
+
+
+def test_optimize_is_lossless(frame):
+    out, report = optimize(frame)
+    assert profile(frame) == {c.column: c.after for c in report.columns}
+    assert out.dtypes.map(str).to_dict() == {
+        "small": "int8", "wide": "int64", "count": "Int16",
+        "exact": "float32", "noisy": "float64", "huge": "float64",
+        "region": "category", "id": "string",
+    }
+    assert out["id"].dtype == STRING
+    assert out["count"].isna().sum() == 100
+    pd.testing.assert_frame_equal(out.astype(frame.dtypes.to_dict()), frame,
+                                  check_dtype=False)
+    np.testing.assert_array_equal(out["exact"].to_numpy(np.float64),
+                                  frame["exact"].to_numpy())
+    assert report.bytes_after < report.bytes_before
+
+
+def test_float32_overflow_is_not_a_warning(frame):
+    with np.errstate(over="raise"):
+        assert profile(frame[["huge"]]) == {"huge": "float64"}
+
+
+def test_frame_round_trip(tmp_path, frame):
+    path = tmp_path / "frame.parquet"
+    report = write_frame(frame, path)
+    out, _ = optimize(frame)
+    back = read_frame(path)
+    assert [c.after for c in report.columns] == list(profile(frame).values())
+    pd.testing.assert_frame_equal(back, out)
+    subset = read_frame(path, columns=["count", "region"])
+    pd.testing.assert_frame_equal(subset, out[["count", "region"]])
+
+
+def test_integer_column_names_keep_their_schema(tmp_path, frame):
+    numbered = frame.set_axis(range(frame.shape[1]), axis="columns")
+    write_frame(numbered, tmp_path / "frame.parquet")
+    back = read_frame(tmp_path / "frame.parquet")
+    pd.testing.assert_frame_equal(back, optimize(numbered)[0])
@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+
+import pytest
+
+from mypipeline import paper
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="stub is a POSIX script")
+
+# Logs each call; reports its target up to date from the second build on,
+# and fails the targets named in STUB_FAIL
+STUB = """\
+#!{python}
+import json, os, sys
+from pathlib import Path
+target = sys.argv[-1]
+with open(os.environ["STUB_LOG"], "a") as fh:
+    fh.write(json.dumps({{"args": sys.argv[1:], "cwd": os.getcwd(),
+                         "cache": os.environ.get("PAPER_BUILD_CACHE")}}) + "\\n")
+if target in os.environ.get("STUB_FAIL", "").split(","):
+    print("Running pdflatex\\n" + target + ":3: Undefined control sequence.")
+    sys.exit(12)
+built = Path(os.environ["STUB_LOG"]).with_name(target.replace("/", "_") + ".built")
+if built.exists():
+    print("Latexmk: All targets (x.pdf) are up-to-date")
+else:
+    built.touch()
+    print("Latexmk: applying rule 'pdflatex'...")
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A paper/ with two subfiles, its cache, and latexmk stubbed on PATH."""
+    root = tmp_path / "paper"
+    for name in ("main.tex", "sections/01-introduction.tex",
+                 "sections/02-data.tex", "appendices/a-proofs.tex"):
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text("\\documentclass{article}\n")
+    monkeypatch.setattr(paper, "PAPER", root)
+    monkeypatch.setattr(paper, "MAIN", root / "main.tex")
+    monkeypatch.setattr(paper, "CACHE", tmp_path / "cache")
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    stub = bin_dir / "latexmk"
+    stub.write_text(STUB.format(python=sys.executable))
+    stub.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("STUB_LOG", str(tmp_path / "calls.jsonl"))
+    return tmp_path
+
+
+def _calls(project) -> dict[str, dict]:
+    log = project / "calls.jsonl"
+    lines = log.read_text().splitlines() if log.exists() else []
+    log.unlink(missing_ok=True)
+    return {call["args"][-1]: call for call in map(json.loads, lines)}
+
+
+def test_build_everything_then_skip(project, capsys):
+    assert paper.main(["--jobs", "2"]) == 0
+    calls = _calls(project)
+    assert sorted(calls) == ["appendices/a-proofs.tex", "main.tex",
+                             "sections/01-introduction.tex",
+                             "sections/02-data.tex"]
+    cache = project / "cache"
+    main, intro = calls["main.tex"], calls["sections/01-introduction.tex"]
+    assert {call["cwd"] for call in calls.values()} == {str(project / "paper")}
+    assert main["cache"] == str(cache / "aux" / "main")
+    assert intro["cache"] == str(cache / "aux" / "sections" / "01-introduction")
+    assert main["args"][:-1] == paper.LATEXMK[1:]
+    assert not any(a.startswith("-outdir") for a in main["args"])
+    assert f"-outdir={cache / 'previews' / 'sections'}" in intro["args"]
+    assert (f"-outdir={cache / 'previews' / 'appendices'}"
+            in calls["appendices/a-proofs.tex"]["args"])
+    out = capsys.readouterr().out
+    assert out.count("[done]") == 4
+    assert f"-> {cache / 'previews' / 'sections' / '02-data.pdf'}" in out
+
+    assert paper.main(["--main-only"]) == 0
+    assert list(_calls(project)) == ["main.tex"]
+    assert "[skip] main (" in capsys.readouterr().out
+
+
+def test_named_subfiles(project, capsys):
+    assert paper.main(["01-introduction", "appendices/a-proofs"]) == 0
+    assert sorted(_calls(project)) == ["appendices/a-proofs.tex",
+                                       "sections/01-introduction.tex"]
+    with pytest.raises(SystemExit):
+        paper.main(["03-results"])
+    assert "unknown subfiles: 03-results" in capsys.readouterr().err
+    assert _calls(project) == {}
+
+
+def test_failed_build_is_reported(project, capsys, monkeypatch):
+    monkeypatch.setenv("STUB_FAIL", "sections/02-data.tex")
+    assert paper.main([]) == 1
+    out = capsys.readouterr().out
+    assert "[FAIL] sections/02-data (exit 12 after" in out
+    assert "    sections/02-data.tex:3: Undefined control sequence." in out
+    assert out.count("[done]") == 3
+
+
+def test_clean_and_missing_latexmk(project, capsys, monkeypatch):
+    (project / "cache" / "aux").mkdir(parents=True)
+    assert paper.main(["--clean"]) == 0
+    assert not (project / "cache").exists()
+    monkeypatch.setenv("PATH", str(project / "nowhere"))
+    with pytest.raises(SystemExit):
+        paper.main([])
+    assert "latexmk not found on PATH" in capsys.readouterr().err
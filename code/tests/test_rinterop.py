@@ -0,0 +1,61 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from mypackage.core.rinterop import RSession
+
+pytest.importorskip("rpy2")
+
+
+@pytest.fixture(scope="module")
+def r() -> RSession:
+    try:
+        return RSession(("arrow",))
+    except Exception as exc:  # R or its arrow package is missing
+        pytest.skip(f"no usable R session: {exc}")
+
+
+def _arrow_bytes(r: RSession) -> int:
+    """What R's Arrow memory pool holds once R has collected its garbage."""
+    out = r.eval("{ invisible(gc()); "
+                 "data.frame(bytes = arrow::default_memory_pool()$bytes_allocated) }")
+    return out.column("bytes")[0].as_py()
+
+
+def test_table_round_trips(r):
+    panel = pd.DataFrame({"firm": [1, 2, 3], "wage": [1.5, None, 3.25],
+                          "region": ["north", "south", None]})
+    for data in (panel, pa.Table.from_pandas(panel)):
+        for as_data_frame in (True, False):
+            out = r.run({"same": "panel"}, {"panel": data}, as_data_frame)
+            pd.testing.assert_frame_equal(out["same"].to_pandas(), panel,
+                                          check_dtype=False)
+
+
+def test_expressions_share_one_environment(r):
+    out = r.run({
+        "n": "data.frame(n = nrow(panel))",
+        "twice": "data.frame(n = n$n * 2)",
+        "mean": "data.frame(wage = mean(panel$wage))",
+    }, {"panel": pd.DataFrame({"wage": [1.0, 2.0, 6.0]})})
+    assert list(out) == ["n", "twice", "mean"]
+    assert out["n"].column("n")[0].as_py() == 3
+    assert out["twice"].column("n")[0].as_py() == 6
+    assert out["mean"].column("wage")[0].as_py() == 3.0
+
+
+def test_matrix_keeps_its_row_names(r):
+    out = r.eval('matrix(c(0.5, -1, 0.1, 0.2), 2, '
+                 'dimnames = list(c("x1", "x2"), c("Estimate", "Std. Error")))')
+    assert out.column_names == ["term", "Estimate", "Std. Error"]
+    assert out.column("term").to_pylist() == ["x1", "x2"]
+    assert out.column("Std. Error").to_pylist() == [0.1, 0.2]
+
+
+def test_streams_are_released_after_an_r_error(r):
+    before = _arrow_bytes(r)
+    with pytest.raises(Exception, match="boom"):
+        r.run({"big": "data.frame(s = as.character(seq_len(100000)))",
+               "bad": 'stop("boom")'})
+    assert _arrow_bytes(r) == before
+    assert r.eval("data.frame(ok = TRUE)").column("ok")[0].as_py()
@@ -0,0 +1,105 @@
+import textwrap
+
+import pytest
+
+from mypackage import config
+from mypipeline import runner
+from mypipeline.ledger import Usage
+from mypipeline.stages import build_graph, discover
+
+STAGES = {
+    "01_clean.py": """
+        from mypackage.config import PROCESSED, RAW
+        clean(read_csv(RAW / "survey.csv")).to_csv(PROCESSED / "survey.csv")
+    """,
+    "02_tables.py": """
+        from mypackage.config import PROCESSED, TABLES
+        write_table(read_csv(PROCESSED / "survey.csv"), TABLES / "main.tex")
+    """,
+    "03_codes.py": """
+        from mypackage.config import RAW, TABLES
+        write_table(read_csv(RAW / "codes.csv"), TABLES / "codes.tex")
+    """,
+}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A ROOT in tmp_path with three stages, and a fake run_stage that writes
+    each stage's outputs as its inputs upper-cased and records what ran."""
+    for name in ("RAW", "PROCESSED", "TABLES"):
+        monkeypatch.setattr(config, name, tmp_path / name.lower())
+    monkeypatch.setattr(runner, "ROOT", tmp_path)
+    config.RAW.mkdir()
+    (config.RAW / "survey.csv").write_text("id,x\n1,a\n")
+    (config.RAW / "codes.csv").write_text("code\nk\n")
+    scripts = tmp_path / "scripts"
+    scripts.mkdir()
+    for name, source in STAGES.items():
+        (scripts / name).write_text(textwrap.dedent(source))
+
+    ran, failing = [], set()
+
+    def run_stage(stage):
+        ran.append(stage.name)
+        data = b"".join(path.read_bytes() for spec in sorted(stage.inputs)
+                        for path in spec.files())
+        for spec in stage.outputs:
+            path = getattr(config, spec.root).joinpath(*spec.parts)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data.upper())
+        return int(stage.name in failing), "", Usage(0.0), 0
+
+    monkeypatch.setattr(runner, "run_stage", run_stage)
+
+    def run(*targets, **options):
+        ran.clear()
+        stages = discover(scripts)
+        graph = build_graph(stages)
+        stages = runner.select(stages, graph, list(targets))
+        state = runner.State(tmp_path / ".pipeline" / "state.json")
+        failed = runner.run_pipeline(stages, graph, state, jobs=2, **options)
+        return sorted(ran), failed
+
+    run.scripts = scripts
+    run.failing = failing
+    return run
+
+
+def test_unchanged_stages_are_skipped(project):
+    assert project() == (["01_clean.py", "02_tables.py", "03_codes.py"], 0)
+    assert project() == ([], 0)
+    assert project(force=True)[0] == ["01_clean.py", "02_tables.py",
+                                      "03_codes.py"]
+
+
+def test_changed_input_reruns_what_reads_it(project):
+    project()
+    # Same output bytes: the table stage downstream stays up to date
+    (config.RAW / "survey.csv").write_text("id,x\n1,A\n")
+    assert project() == (["01_clean.py"], 0)
+    (config.RAW / "survey.csv").write_text("id,x\n1,b\n")
+    assert project() == (["01_clean.py", "02_tables.py"], 0)
+
+
+def test_changed_source_or_missing_output_reruns(project):
+    project()
+    with (project.scripts / "03_codes.py").open("a") as fh:
+        fh.write("# reworded\n")
+    assert project() == (["03_codes.py"], 0)
+    (config.TABLES / "main.tex").unlink()
+    assert project() == (["02_tables.py"], 0)
+
+
+def test_targets_bring_their_dependencies(project):
+    assert project("02")[0] == ["01_clean.py", "02_tables.py"]
+    assert project("03_codes")[0] == ["03_codes.py"]
+    with pytest.raises(ValueError, match="no stage matches '09'"):
+        project("09")
+
+
+def test_failed_stage_stops_downstream_and_reruns(project):
+    project.failing.add("01_clean.py")
+    assert project(keep_going=True) == (["01_clean.py", "03_codes.py"], 1)
+    project.failing.clear()
+    assert project() == (["01_clean.py", "02_tables.py"], 0)
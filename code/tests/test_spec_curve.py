@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mypackage.core.spec_curve import SpecGrid, control_sets, estimate
+from mypipeline.spec_curve import read_spec_curve, write_spec_curve
+
+SEED = 20240101
+ESTIMATES = ["coef", "se", "p", "n_obs", "n_clusters"]
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(SEED)
+    n = 2000
+    df = pd.DataFrame({
+        "firm": rng.choice([f"f{i}" for i in range(40)], n),
+        "year": rng.integers(2000, 2010, n),
+        "treated": rng.random(n) < 0.5,
+        "age": rng.normal(40, 10, n),
+        "educ": rng.normal(12, 2, n),
+        "female": rng.integers(0, 2, n),
+    })
+    # The first row treated, so codes by first appearance would flip 0/1
+    df.loc[0, "treated"] = True
+    df["log_wage"] = 2.0 * df["treated"] + 0.1 * df["age"] + rng.normal(0, 1, n)
+    df.loc[5, "educ"] = np.nan
+    return df
+
+
+@pytest.fixture
+def grid():
+    return SpecGrid(
+        treatment="treated",
+        outcomes=["log_wage"],
+        controls=control_sets(["age"], ["educ"]),
+        samples={"all": None, "men": "female == 0"},
+        fe={"none": [], "firm+year": ["firm", "year"]},
+        cluster="firm",
+    )
+
+
+def _by_spec(results: pd.DataFrame) -> pd.DataFrame:
+    return results.set_index("spec_id").sort_index()[ESTIMATES].astype(float)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_write_spec_curve_matches_serial_estimate(panel, grid, tmp_path, jobs):
+    expected = _by_spec(estimate(panel, grid))
+    results = write_spec_curve(panel, grid, tmp_path / "curve", jobs=jobs)
+    pd.testing.assert_frame_equal(_by_spec(results), expected, rtol=1e-10)
+    assert (expected["coef"] > 1.5).all()
+
+
+def test_rerun_resumes_and_data_change_resets(panel, grid, tmp_path):
+    out = tmp_path / "curve"
+    write_spec_curve(panel, grid, out, jobs=1)
+    parts = sorted(out.glob("part-*.parquet"))
+    assert len(parts) == len(grid.samples) * len(grid.fe)
+
+    parts[0].unlink()
+    write_spec_curve(panel, grid, out, jobs=1)
+    assert len(read_spec_curve(out, grid)) == len(grid.specs())
+
+    changed = panel.assign(log_wage=panel["log_wage"] + 1.0)
+    results = write_spec_curve(changed, grid, out, jobs=1)
+    pd.testing.assert_frame_equal(_by_spec(results),
+                                  _by_spec(estimate(changed, grid)), rtol=1e-10)
+
+
+@pytest.mark.parametrize("first, added", [
+    # The new spec's variables are already in the grid
+    ({"none": [], "age+educ": ["age", "educ"]}, {"age": ["age"]}),
+    # The new spec adds a variable, shrinking every spec's sample
+    ({"none": [], "age": ["age"]}, {"age+educ": ["age", "educ"]}),
+])
+def test_extended_grid_matches_a_fresh_run(panel, grid, tmp_path, first, added):
+    panel.loc[panel.index % 13 == 0, "educ"] = np.nan
+    grid.controls = first
+    out = tmp_path / "curve"
+    write_spec_curve(panel, grid, out, jobs=1)
+    grid.controls = first | added
+    resumed = write_spec_curve(panel, grid, out, jobs=1)
+    fresh = write_spec_curve(panel, grid, tmp_path / "fresh", jobs=1)
+    pd.testing.assert_frame_equal(_by_spec(resumed), _by_spec(fresh), rtol=1e-10)
+    pd.testing.assert_frame_equal(_by_spec(resumed),
+                                  _by_spec(estimate(panel, grid)), rtol=1e-10)
+    assert (resumed["n_obs"] < len(panel)).all()
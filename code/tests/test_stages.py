@@ -0,0 +1,139 @@
+import ast
+import textwrap
+
+import pytest
+
+from mypackage import config
+from mypipeline.stages import PathSpec, build_graph, discover, infer_io
+
+STAGES = {
+    "00_convert.py": """
+        from mypackage.config import RAW, RAW_PARQUET
+        for path in RAW.glob("survey/*.dta"):
+            out = RAW_PARQUET / "survey" / f"{path.name}.parquet"
+            write_parquet(read_stata(path), out)
+    """,
+    "01_clean.py": """
+        import pandas as pd
+        from mypackage.config import PROCESSED, dataset_path
+        df = pd.read_parquet(dataset_path("survey"))
+        df.to_parquet(PROCESSED / "survey.parquet")
+    """,
+    "02_validate.py": """
+        from mypackage import config
+        from mypipeline.validate import validate_dataset
+        validate_dataset(config.PROCESSED / "survey.parquet")
+    """,
+    "03_tables.py": """
+        from mypackage.config import PROCESSED, TABLES
+        out = TABLES / "main.tex"
+        with open(out, "w") as fh:
+            fh.write(str(load_parquet(PROCESSED / "survey.parquet")))
+    """,
+    "04_figures.py": """
+        from mypackage.config import FIGURES, RAW
+        draw(RAW / "codes.csv", FIGURES / "codes.pdf")
+    """,
+    "helpers.py": "",
+    "README.md": "",
+}
+
+
+def _io(source: str) -> tuple[set[str], set[str], set[str]]:
+    found = infer_io(ast.parse(textwrap.dedent(source)))
+    return tuple({str(spec) for spec in specs} for specs in found)
+
+
+@pytest.fixture(autouse=True)
+def _survey_dataset(monkeypatch):
+    monkeypatch.setitem(config.DATASETS, "survey", "survey/wave1.dta")
+
+
+@pytest.fixture
+def stages(tmp_path):
+    for name, source in STAGES.items():
+        (tmp_path / name).write_text(textwrap.dedent(source))
+    return discover(tmp_path)
+
+
+@pytest.mark.parametrize("source, expected", [
+    # Reads and writes by call name, through a variable and a glob
+    ("""
+        from mypackage.config import RAW, PROCESSED
+        files = sorted(RAW.glob("wave*.csv"))
+        df = read_csv(files[0])
+        df.to_parquet(PROCESSED / "panel.parquet")
+     """, ({"RAW/wave*.csv"}, {"PROCESSED/panel.parquet"}, set())),
+    # Path methods, open() modes, and validate_ as a read
+    ("""
+        import mypackage.config
+        from mypackage.config import INTERMEDIATE as I
+        text = (I / "notes.txt").read_text()
+        (I / "copy.txt").write_text(text)
+        with open(I / "log.txt", "a") as fh:
+            validate_panel(mypackage.config.PROCESSED / "panel.parquet")
+     """, ({"INTERMEDIATE/notes.txt", "PROCESSED/panel.parquet"},
+           {"INTERMEDIATE/copy.txt", "INTERMEDIATE/log.txt"}, set())),
+    # Unclassified uses fall back on the directory
+    ("""
+        from mypackage.config import PROCESSED, RAW, TABLES
+        process(RAW / "a.csv", PROCESSED / "b.parquet", TABLES / "t.tex")
+        print(PROCESSED / "c.parquet")
+     """, ({"RAW/a.csv"}, {"TABLES/t.tex"}, {"PROCESSED/b.parquet"})),
+    # A path built from a non-literal covers everything below
+    ("""
+        from mypackage.config import PROCESSED
+        for name in names:
+            save_frame(PROCESSED / name / "part.parquet")
+     """, (set(), {"PROCESSED/**"}, set())),
+])
+def test_infer_io(source, expected):
+    assert _io(source) == expected
+
+
+def test_paths_outside_config_are_ignored():
+    assert _io("""
+        from pathlib import Path
+        RAW = Path("data/raw")
+        read_csv(RAW / "a.csv")
+        write_csv(Path("out.csv"))
+    """) == (set(), set(), set())
+
+
+def test_discovered_stages(stages):
+    assert [s.name for s in stages] == [
+        "00_convert.py", "01_clean.py", "02_validate.py", "03_tables.py",
+        "04_figures.py",
+    ]
+    clean = stages[1]
+    # dataset_path() is evaluated with the real config
+    assert {str(s) for s in clean.inputs} == {
+        "INTERMEDIATE/raw/survey/wave1.dta.parquet"}
+    assert {str(s) for s in clean.outputs} == {"PROCESSED/survey.parquet"}
+    assert {str(s) for s in stages[2].reads} == {"PROCESSED/survey.parquet"}
+    assert stages[2].writes == set()
+    # Sources cover the project modules a stage imports, transitively
+    sources = {p.name for p in stages[2].sources}
+    assert {"02_validate.py", "config.py", "validate.py"} <= sources
+
+
+def test_graph(stages):
+    assert build_graph(stages) == {
+        "00_convert.py": set(),
+        "01_clean.py": {"00_convert.py"},
+        "02_validate.py": {"01_clean.py"},
+        "03_tables.py": {"01_clean.py"},
+        "04_figures.py": set(),
+    }
+
+
+@pytest.mark.parametrize("a, b, overlap", [
+    (("RAW", ("a", "*.csv")), ("RAW", ("a", "x.csv")), True),
+    (("RAW", ("a", "*.csv")), ("RAW", ("b", "x.csv")), False),
+    (("RAW", ("a", "**")), ("RAW", ("a", "b", "c")), True),
+    (("RAW", ("a",)), ("RAW", ("a", "b")), True),
+    (("RAW", ("a",)), ("PROCESSED", ("a",)), False),
+])
+def test_overlaps(a, b, overlap):
+    assert PathSpec(*a).overlaps(PathSpec(*b)) is overlap
+    assert PathSpec(*b).overlaps(PathSpec(*a)) is overlap
@@ -0,0 +1,100 @@
+import os
+from dataclasses import replace
+
+import pandas as pd
+import pytest
+
+from mypackage.core.tables import Table, model_results, render
+from mypipeline.tables import read_results, write_results, write_tables
+
+WAGES = Table("baseline/wages", results="baseline/wages", caption="Log wages",
+              terms={"treated": "Treated", "age": "Age"},
+              stats={"n_obs": "Observations", "r2": "$R^2$", "f": "F"})
+
+
+@pytest.fixture
+def results() -> pd.DataFrame:
+    return pd.concat([
+        model_results("(1)", {"treated": 0.1234, "age": -0.5},
+                      {"treated": 0.05, "age": 0.25},
+                      {"treated": 0.02, "age": 0.2}, n_obs=1234.0, r2=0.25),
+        model_results("(2)", {"treated": 0.2}, {"treated": 0.01},
+                      {"treated": 0.001}, n_obs=1000),
+    ], ignore_index=True)
+
+
+def test_render(results):
+    out = render(WAGES, results)
+    assert out[".tex"] == r"""\begin{table}[!htbp]
+\centering
+\caption{Log wages}
+\label{tab:baseline:wages}
+\begin{tabular}{lcc}
+\hline\hline
+ & (1) & (2) \\
+\hline
+Treated & $0.123^{**}$ & $0.200^{***}$ \\
+ & (0.050) & (0.010) \\
+Age & $-0.500$ &  \\
+ & (0.250) &  \\
+\hline
+Observations & 1,234 & 1,000 \\
+$R^2$ & 0.250 &  \\
+\hline\hline
+\end{tabular}
+\par\vspace{1ex}{\footnotesize $*\ p<0.1$; $**\ p<0.05$; $***\ p<0.01$}
+\end{table}
+"""
+    assert out[".csv"] == """\
+,(1),(2)
+Treated,0.123**,0.200***
+,(0.050),(0.010)
+Age,-0.500,
+,(0.250),
+Observations,"1,234","1,000"
+$R^2$,0.250,
+"""
+
+
+def test_unlabelled_names_are_escaped_in_tex_only():
+    results = model_results("a_b", {"log_wage%": 1.0}, {"log_wage%": 0.5},
+                            {"log_wage%": 0.01})
+    out = render(Table("x", results="x", digits=2, stars=(0.05,)), results)
+    assert r" & a\_b \\" in out[".tex"]
+    assert r"log\_wage\% & $1.00^{*}$ \\" in out[".tex"]
+    assert r"{\footnotesize $*\ p<0.05$}" in out[".tex"]
+    assert out[".csv"] == ",a_b\nlog_wage%,1.00*\n,(0.50)\n"
+
+
+def test_only_changed_files_are_written(tmp_path, results):
+    write_results(tmp_path / "results" / "baseline" / "wages.parquet", results)
+    stored = read_results(tmp_path / "results")
+    assert list(stored) == ["baseline/wages"]
+    pd.testing.assert_frame_equal(stored["baseline/wages"], results)
+
+    out = tmp_path / "tables"
+    tables = [WAGES, replace(WAGES, name="short", terms={"treated": "Treated"})]
+    first = write_tables(out, tables, stored)
+    assert sorted(first.written) == ["baseline/wages.csv", "baseline/wages.tex",
+                                     "short.csv", "short.tex"]
+    for path in out.rglob("*.*"):
+        os.utime(path, ns=(10**18, 10**18))
+
+    again = write_tables(out, tables, stored)
+    assert again.written == [] and len(again.unchanged) == 4
+    assert {p.stat().st_mtime_ns for p in out.rglob("*.*")} == {10**18}
+    assert not list(out.rglob(".*"))
+
+    # The caption is only in the .tex
+    tables[1] = replace(tables[1], caption="Treatment only")
+    assert write_tables(out, tables, stored).written == ["short.tex"]
+
+
+def test_write_tables_checks_its_arguments(tmp_path, results):
+    stored = {"baseline/wages": results}
+    with pytest.raises(ValueError, match="unique"):
+        write_tables(tmp_path, [WAGES, WAGES], stored)
+    with pytest.raises(KeyError, match="other"):
+        write_tables(tmp_path, [replace(WAGES, results="other")], stored)
+    with pytest.raises(ValueError, match="lack columns"):
+        write_results(tmp_path / "bad.parquet", results.drop(columns="p"))
@@ -0,0 +1,126 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from mypipeline.frames import write_frame
+from mypipeline.validate import (
+    ValidationError,
+    read_codebook,
+    read_validation,
+    validate_datasets,
+    write_validation,
+)
+
+CODEBOOK = """\
+# Codebook
+
+## panel.parquet
+
+| Variable | Type     | Range      | Categories    | Nullable | Key | Description |
+|----------|----------|------------|---------------|----------|-----|-------------|
+| firm_id  | int      | 1..        |               | no       | yes | Firm        |
+| year     | int      | 2000..2020 |               | no       | yes | Year        |
+| wage     | float    | 0..        |               |          |     | Wage        |
+| share    | float    | 0..0.5     |               |          |     | Share       |
+| sex      | str      |            | male, female  | yes      |     | Sex         |
+| sector   | category |            | a, b          |          |     | Sector      |
+| score    | int      | 0..1000    | 1, 2, 3, 1001 |          |     | Score       |
+"""
+
+
+def _panel(**changes) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "firm_id": pd.array([1, 1, 2, 2], dtype="Int64"),
+        "year": [2000, 2001, 2000, 2001],
+        "wage": [10.0, 11.0, 12.0, None],
+        "share": [0.1, 0.2, 0.3, 0.4],
+        "sex": ["male", "female", None, "male"],
+        "sector": pd.Categorical(["a", "b", "a", "b"]),
+        "score": [1, 2, 3, 3],
+    })
+    for column, (row, value) in changes.items():
+        df.loc[row, column] = value
+    return df
+
+
+def _validate(tmp_path, df: pd.DataFrame, narrow: bool = False):
+    processed = tmp_path / "processed"
+    processed.mkdir(exist_ok=True)
+    if narrow:
+        write_frame(df, processed / "panel.parquet")  # int8/int16, category
+    else:
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False),
+                       processed / "panel.parquet", row_group_size=2)
+    codebook = tmp_path / "codebook.md"
+    codebook.write_text(CODEBOOK, encoding="utf-8")
+    return validate_datasets(processed, codebook)
+
+
+def _found(report) -> set[tuple[str, str, int]]:
+    return {(v.column, v.check, v.count) for v in report.violations}
+
+
+def test_read_codebook(tmp_path):
+    path = tmp_path / "codebook.md"
+    path.write_text(CODEBOOK, encoding="utf-8")
+    variables = {v.name: v for v in read_codebook(path)["panel.parquet"]}
+    assert variables["year"].low == "2000" and variables["year"].high == "2020"
+    assert variables["firm_id"].high is None and not variables["firm_id"].nullable
+    assert variables["sex"].categories == ("male", "female")
+    assert [v.name for v in variables.values() if v.key] == ["firm_id", "year"]
+
+
+@pytest.mark.parametrize("narrow", [False, True])
+def test_clean_data_passes(tmp_path, narrow):
+    report = _validate(tmp_path, _panel(), narrow=narrow)
+    assert report.ok, str(report)
+    assert report.rows == {"panel.parquet": 4}
+
+
+@pytest.mark.parametrize("changes, expected", [
+    ({"firm_id": (3, None)}, ("firm_id", "null", 1)),
+    ({"firm_id": (0, 0)}, ("firm_id", "below 1", 1)),
+    ({"year": (2, 2021)}, ("year", "above 2020", 1)),
+    ({"wage": (1, -1.0)}, ("wage", "below 0", 1)),
+    ({"share": (0, 0.75)}, ("share", "above 0.5", 1)),
+    ({"sex": (0, "other")}, ("sex", "not in categories", 1)),
+    ({"score": (1, 1001)}, ("score", "above 1000", 1)),  # in categories
+    ({"score": (1, 5)}, ("score", "not in categories", 1)),
+])
+@pytest.mark.parametrize("narrow", [False, True])
+def test_each_check(tmp_path, changes, expected, narrow):
+    report = _validate(tmp_path, _panel(**changes), narrow=narrow)
+    assert expected in _found(report)
+    assert len(report.violations) == 1, str(report)
+    row, _ = next(iter(changes.values()))
+    assert report.violations[0].samples[0]["row"] == row
+
+
+def test_category_outside_codebook(tmp_path):
+    df = _panel()
+    df["sector"] = pd.Categorical(["a", "b", "c", "c"])
+    assert ("sector", "not in categories", 2) in _found(_validate(tmp_path, df))
+
+
+def test_duplicate_key_across_row_groups(tmp_path):
+    report = _validate(tmp_path, _panel(year=(3, 2000)))
+    assert _found(report) == {("firm_id+year", "duplicate key", 1)}
+    assert report.violations[0].samples == [{"row": 3}]
+
+
+def test_missing_column_and_wrong_type(tmp_path):
+    df = _panel().drop(columns="share").assign(year=lambda d: d["year"].astype(str))
+    found = _found(_validate(tmp_path, df))
+    assert ("share", "missing", 4) in found
+    assert any(column == "year" and check.startswith("type ")
+               for column, check, _ in found)
+
+
+def test_report_round_trip_and_check(tmp_path):
+    report = _validate(tmp_path, _panel(year=(0, 1999)))
+    write_validation(tmp_path / "validation.json", report)
+    loaded = read_validation(tmp_path / "validation.json")
+    assert _found(loaded) == _found(report)
+    with pytest.raises(ValidationError, match="below 2000"):
+        loaded.check()
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for quality_score.py
+
+Generates a synthetic project tree (modules, pipeline scripts, exploration
+scripts, LaTeX sections) in a temporary directory and times the scorer on it.
+
+Usage:
+    python docs/quality_reports/bench_quality_score.py parallel
+    python docs/quality_reports/bench_quality_score.py parallel --files 5000 --jobs 8
+    python docs/quality_reports/bench_quality_score.py detect --lines 50000
+    python docs/quality_reports/bench_quality_score.py bib --entries 5000 --subfiles 50
+    python docs/quality_reports/bench_quality_score.py scaling
+    python docs/quality_reports/bench_quality_score.py scaling --save-baseline
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import platform
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List
+
+import quality_score
+
+# ==============================================================================
+# SYNTHETIC TREE
+# ==============================================================================
+
+MODULE_TEMPLATE = '''"""Synthetic module {n}."""
+import numpy as np
+import pandas as pd
+
+
+def transform_{n}(df: pd.DataFrame, scale: float = 1.0) -> pd.DataFrame:
+    """Scale numeric columns."""
+    out = df.copy()
+    for col in out.select_dtypes("number").columns:
+        out[col] = out[col] * scale  # keep dtype
+    return out
+
+
+def summarize_{n}(values):
+    arr = np.asarray(values)
+    return {{"mean": arr.mean(), "sd": arr.std()}}
+'''
+
+SCRIPT_TEMPLATE = '''import numpy as np
+import pandas as pd
+from mypackage.config import INTERMEDIATE, PROCESSED
+
+np.random.seed(42)
+
+df = pd.read_parquet(INTERMEDIATE / "panel_{n}.parquet")
+df["noise"] = np.random.normal(size=len(df))
+df = df.sample(frac=0.5, random_state=0)
+df.to_parquet(PROCESSED / "panel_{n}.parquet")
+'''
+
+LATEX_TEMPLATE = r'''\documentclass[../main.tex]{{subfiles}}
+
+\begin{{document}}
+
+\section{{Section {n}}}
+
+Prior work \citep{{smith2020}} documents the effect.
+\begin{{equation}}
+y_{{it}} = \alpha_i + \beta x_{{it}} + \varepsilon_{{it}}
+\end{{equation}}
+
+\end{{document}}
+'''
+
+
+# Lines for a generated script; mixes hits for every line rule with filler.
+SCRIPT_LINES = [
+    'df = pd.read_csv(RAW / "input.csv")',
+    'df.to_csv("data/raw/copy.csv")  # bad: writes raw',
+    'out = "/home/user/results.csv"',
+    'url = "https://example.com/data.csv"',
+    'win = "C:\\\\Users\\\\me\\\\file.txt"',
+    'tmp = "/tmp/scratch.txt"',
+    'cfg = "output/core/tables/t1.tex"',
+    'from mypackage.config import PROCESSED',
+    'x = compute(df, "col")  # "/not/a/path" in a comment',
+    'y = np.log(df["wage"]) + 1',
+    'result = model.fit(cov_type="cluster", groups=df["firm"])',
+    'total = sum(values) / len(values)',
+    '',
+]
+
+
+def make_script(n_lines: int, seed: int = 0) -> str:
+    """Return a synthetic pipeline script with n_lines lines."""
+    rng = random.Random(seed)
+    weights = [1, 1, 1, 1, 1, 1, 1, 1, 2, 10, 10, 10, 5]
+    return '\n'.join(rng.choices(SCRIPT_LINES, weights, k=n_lines))
+
+
+def make_tree(root: Path, n_files: int, seed: int = 0) -> List[Path]:
+    """Write a synthetic project with n_files scorable files under root."""
+    rng = random.Random(seed)
+    dirs = {
+        'module': root / 'code' / 'src' / 'mypackage' / 'core',
+        'script': root / 'code' / 'scripts' / 'core',
+        'exploration': root / 'code' / 'scripts' / 'exploration',
+        'latex': root / 'paper' / 'sections',
+    }
+    for d in dirs.values():
+        d.mkdir(parents=True, exist_ok=True)
+    (root / 'paper' / 'references.bib').write_text(
+        '@article{smith2020,\n  title={Synthetic},\n}\n', encoding='utf-8')
+
+    kinds = ['module'] * 4 + ['script'] * 3 + ['exploration'] * 2 + ['latex']
+    paths = []
+    for n in range(n_files):
+        kind = rng.choice(kinds)
+        if kind == 'module':
+            path = dirs[kind] / f'mod_{n:05d}.py'
+            text = MODULE_TEMPLATE.format(n=n)
+        elif kind == 'latex':
+            path = dirs[kind] / f'{n:05d}-section.tex'
+            text = LATEX_TEMPLATE.format(n=n)
+        else:
+            path = dirs[kind] / f'{n % 100:02d}_step_{n:05d}.py'
+            text = SCRIPT_TEMPLATE.format(n=n)
+        path.write_text(text, encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+# ==============================================================================
+# BENCHMARKS
+# ==============================================================================
+
+def _time_batch(paths: List[Path], jobs: int):
+    start = time.perf_counter()
+    reports = [report for report, _, _ in quality_score.score_files(paths, jobs=jobs)]
+    return time.perf_counter() - start, reports
+
+
+def bench_parallel(args) -> None:
+    """Serial vs --jobs N on a synthetic tree."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_tree(Path(tmp), args.files)
+        serial_time, serial = _time_batch(paths, jobs=1)
+        parallel_time, parallel = _time_batch(paths, jobs=args.jobs)
+
+    if serial != parallel:
+        print("ERROR: parallel reports differ from serial reports")
+        sys.exit(1)
+
+    print(f"\n# Parallel scoring: {args.files} files")
+    print(f"  {'serial (--jobs 1)':<24}{serial_time:8.3f}s")
+    print(f"  {f'parallel (--jobs {args.jobs})':<24}{parallel_time:8.3f}s")
+    print(f"  {'speedup':<24}{serial_time / parallel_time:8.2f}x")
+
+
+# Per-line implementations that predate DetectionEngine, kept as the
+# reference the engine's output and speed are compared against.
+
+_REFERENCE_IO_PATTERNS = [
+    r'\bopen\s*\(',
+    r'\.read_csv\b',
+    r'\.to_csv\b',
+    r'\.read_excel\b',
+    r'\.to_excel\b',
+    r'\.read_json\b',
+    r'\.to_json\b',
+    r'\.read_parquet\b',
+    r'\.to_parquet\b',
+    r'\.read_feather\b',
+    r'\.to_feather\b',
+    r'\.read_stata\b',
+    r'\.to_stata\b',
+    r'pd\.read_',
+    r'np\.load\b',
+    r'np\.save\b',
+    r'pickle\.(load|dump)\b',
+    r'json\.(load|dump)\b(?!s)',
+    r'Path\([^)]*\)\.(read_text|write_text|read_bytes|write_bytes)',
+]
+
+_REFERENCE_WRITE_PATTERNS = [
+    r'\.to_csv', r'\.to_excel', r'\.to_parquet',
+    r'\.write', r'\.save', r'dump',
+    r'open\(.*(w|a)', r'shutil\.(copy|move)',
+]
+
+
+def _reference_file_io(content):
+    issues = []
+    for i, line in enumerate(content.split('\n'), 1):
+        stripped = line.split('#')[0] if '#' in line else line
+        for pattern in _REFERENCE_IO_PATTERNS:
+            if re.search(pattern, stripped):
+                issues.append(i)
+                break
+    return issues
+
+
+def _reference_hardcoded_paths(content):
+    issues = []
+    for i, line in enumerate(content.split('\n'), 1):
+        stripped = line.split('#')[0] if '#' in line else line
+        if re.search(r'["\'][/~](?!tmp/)', stripped):
+            if not re.search(r'https?://', stripped):
+                issues.append(i)
+        if re.search(r'["\'][A-Za-z]:[/\\]', stripped):
+            issues.append(i)
+    return list(set(issues))
+
+
+def _reference_raw_data_modification(content):
+    issues = []
+    for i, line in enumerate(content.split('\n'), 1):
+        if re.search(r'["\'].*data[/\\]raw[/\\]', line):
+            stripped = line.split('#')[0] if '#' in line else line
+            for pattern in _REFERENCE_WRITE_PATTERNS:
+                if re.search(pattern, stripped):
+                    issues.append(i)
+                    break
+    return issues
+
+
+def _reference_paths_from_config(content):
+    issues = []
+    for i, line in enumerate(content.split('\n'), 1):
+        stripped = line.split('#')[0] if '#' in line else line
+        if re.search(r'["\'].*(data|output|paper)[/\\]', stripped):
+            if stripped.strip().startswith(('import', 'from', '#')):
+                continue
+            issues.append(i)
+    return issues
+
+
+REFERENCE_CHECKS = {
+    'file_io_in_src': _reference_file_io,
+    'hardcoded_paths': _reference_hardcoded_paths,
+    'raw_data_modification': _reference_raw_data_modification,
+    'paths_from_config': _reference_paths_from_config,
+}
+
+
+def bench_detect(args) -> None:
+    """Per-line reference checks vs DetectionEngine on one large script."""
+    content = make_script(args.lines)
+    checks = list(REFERENCE_CHECKS)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        expected = {name: check(content) for name, check in REFERENCE_CHECKS.items()}
+    reference_time = (time.perf_counter() - start) / args.repeat
+
+    engine = quality_score.DetectionEngine(checks)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        found = engine.scan(content)
+    engine_time = (time.perf_counter() - start) / args.repeat
+
+    if found != expected:
+        print("ERROR: DetectionEngine results differ from reference checks")
+        sys.exit(1)
+
+    print(f"\n# Line detection: {args.lines} lines, {len(checks)} checks")
+    print(f"  {'per-line reference':<24}{reference_time:8.3f}s")
+    print(f"  {'DetectionEngine':<24}{engine_time:8.3f}s")
+    print(f"  {'speedup':<24}{reference_time / engine_time:8.2f}x")
+
+
+BIB_ENTRY_TEMPLATE = '''@article{{{pad}{key}{pad},
+  author = {{Author, A. and Other, B.}},
+  title = {{Title {n}: {{Nested}} words with an @ sign}},
+  journal = {journal},
+  year = {{{year}}},
+}}
+'''
+
+
+def make_bib(n_entries: int, seed: int = 0) -> str:
+    """A bibliography of n_entries entries plus @string/@comment noise."""
+    rng = random.Random(seed)
+    parts = ['@string{jfe = "Journal of Financial Economics"}\n',
+             '@comment{jabref-meta: databaseType:bibtex;}\n']
+    for n in range(n_entries):
+        if n % 500 == 0:
+            parts.append(f'@comment{{@article{{retracted{n}, title={{x}}}}}}\n')
+        parts.append(BIB_ENTRY_TEMPLATE.format(
+            key=f'author{n}', n=n, year=1950 + n % 70,
+            pad=' ' if n % 7 == 0 else '',
+            journal='jfe' if n % 3 == 0 else '{Econometrica}'))
+    rng.shuffle(parts)
+    return ''.join(parts)
+
+
+def make_subfile(n: int, n_entries: int, cites: int, rng) -> str:
+    keys = [f'author{rng.randrange(n_entries)}' for _ in range(cites)]
+    keys.append(f'missing{n}')
+    body = '\n\n'.join(f'Result {i} follows \\citet{{{key}}}.'
+                        for i, key in enumerate(keys))
+    return ('\\documentclass[../main.tex]{subfiles}\n\\begin{document}\n'
+            f'\\section{{Section {n}}}\n{body}\n\\end{{document}}\n')
+
+
+def _reference_broken_citations(content, bib_file):
+    """check_broken_citations before BibIndex: rereads the .bib per file."""
+    cited = {k.strip() for m in re.finditer(r'\\cite[a-z]*\{([^}]+)\}', content)
+             for k in m.group(1).split(',')}
+    bib_keys = set(re.findall(r'@\w+\{([^,]+),', bib_file.read_text(encoding='utf-8')))
+    return sorted(cited - bib_keys)
+
+
+def bench_bib(args) -> None:
+    """Per-file .bib parsing vs BibIndex (cold, then from the result cache)."""
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        sections = root / 'paper' / 'sections'
+        sections.mkdir(parents=True)
+        bib_file = root / 'paper' / 'references.bib'
+        bib_file.write_text(make_bib(args.entries), encoding='utf-8')
+        # Old enough that the index may be memoized
+        os.utime(bib_file, (time.time() - 60, time.time() - 60))
+        paths = [sections / f'{n:02d}-section.tex' for n in range(args.subfiles)]
+        contents = [make_subfile(n, args.entries, args.cites, rng)
+                    for n in range(args.subfiles)]
+        for path, content in zip(paths, contents):
+            path.write_text(content, encoding='utf-8')
+
+        check = quality_score.IssueDetector.check_broken_citations
+        found_bib = quality_score.find_bib_file(paths[0])
+
+        start = time.perf_counter()
+        for content in contents:
+            _reference_broken_citations(content, found_bib)
+        reference_time = time.perf_counter() - start
+
+        quality_score._BIB_INDEXES.clear()
+        start = time.perf_counter()
+        broken = [check(content, found_bib) for content in contents]
+        cold_time = time.perf_counter() - start
+
+        cache = quality_score.ResultCache(root / 'cache.sqlite3')
+        quality_score._BIB_INDEXES.clear()
+        cache.load_bib_index(found_bib)
+        cache.close()
+        quality_score._BIB_INDEXES.clear()
+        cache = quality_score.ResultCache(root / 'cache.sqlite3')
+        start = time.perf_counter()
+        cache.load_bib_index(found_bib)
+        warm = [check(content, found_bib) for content in contents]
+        warm_time = time.perf_counter() - start
+        cache.close()
+
+    expected = [[f'missing{n}'] for n in range(args.subfiles)]
+    if broken != expected or warm != expected:
+        print("ERROR: BibIndex reported wrong undefined citations")
+        sys.exit(1)
+
+    print(f"\n# Citation checks: {args.subfiles} subfiles, {args.entries} entries")
+    print(f"  {'per-file .bib parse':<24}{reference_time:8.3f}s")
+    print(f"  {'BibIndex (cold)':<24}{cold_time:8.3f}s")
+    print(f"  {'BibIndex (cached)':<24}{warm_time:8.3f}s")
+    print(f"  {'speedup (cold)':<24}{reference_time / cold_time:8.2f}x")
+    print(f"  {'speedup (cached)':<24}{reference_time / warm_time:8.2f}x")
+
+
+SCALING_SIZES = [10, 1000, 10000]
+BASELINE_PATH = Path(__file__).with_name('bench_baseline.json')
+# A timing more than this factor above the baseline counts as a regression,
+# unless it is within REGRESSION_FLOOR seconds of it (timer noise on tiny runs)
+REGRESSION_TOLERANCE = 1.25
+REGRESSION_FLOOR = 0.05
+
+
+def _machine() -> dict:
+    return {'python': platform.python_version(), 'system': platform.system(),
+            'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def _time_scoring(paths: List[Path], jobs: int, cache_path: Path) -> float:
+    cache = quality_score.ResultCache(cache_path)
+    start = time.perf_counter()
+    for _ in quality_score.score_files(paths, jobs=jobs, cache=cache):
+        pass
+    elapsed = time.perf_counter() - start
+    cache.close()
+    return elapsed
+
+
+def bench_scaling(args) -> None:
+    """Cold and cached runs on synthetic repos of several sizes, checked
+    against the stored baseline."""
+    results = {}
+    for n_files in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            paths = make_tree(root, n_files)
+            # Start cold: nothing memoized from a previous size
+            quality_score.IMPORT_RESOLVER.invalidate()
+            quality_score._BIB_INDEXES.clear()
+            cold = _time_scoring(paths, args.jobs, root / 'cache.sqlite3')
+            cached = _time_scoring(paths, args.jobs, root / 'cache.sqlite3')
+        results[str(n_files)] = {'cold': cold, 'cached': cached}
+
+    print(f"\n# Scaling: --jobs {args.jobs}")
+    print(f"  {'files':>8}{'cold':>10}{'cached':>10}{'files/s':>10}")
+    for size, timing in results.items():
+        print(f"  {size:>8}{timing['cold']:>9.3f}s{timing['cached']:>9.3f}s"
+              f"{int(size) / timing['cold']:>10.0f}")
+
+    if args.save_baseline:
+        baseline = {'machine': _machine(), 'results': results}
+        if args.jobs > 1:
+            # Absent for a serial baseline, which any machine can reproduce
+            baseline['jobs'] = args.jobs
+        args.baseline.write_text(json.dumps(baseline, indent=2) + '\n',
+                                 encoding='utf-8')
+        print(f"\n  Baseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\n  No baseline at {args.baseline}; run with --save-baseline")
+        return
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    if baseline['machine'] != _machine() or baseline.get('jobs', 1) != args.jobs:
+        print("\n  Warning: baseline was recorded on a different machine or --jobs; "
+              "comparison is indicative only")
+    regressions = []
+    for size, timing in results.items():
+        for run, seconds in timing.items():
+            previous = baseline['results'].get(size, {}).get(run)
+            if (previous and seconds > previous * REGRESSION_TOLERANCE
+                    and seconds - previous > REGRESSION_FLOOR):
+                regressions.append(f"{size} files {run}: {seconds:.3f}s "
+                                   f"(baseline {previous:.3f}s)")
+    if regressions:
+        print(f"\nERROR: slower than baseline by more than "
+              f"{REGRESSION_TOLERANCE - 1:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\n  Within {REGRESSION_TOLERANCE - 1:.0%} of baseline")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark quality_score.py')
+    sub = parser.add_subparsers(dest='benchmark', required=True)
+
+    p = sub.add_parser('parallel', help=bench_parallel.__doc__)
+    p.add_argument('--files', type=int, default=3000, help='Synthetic files')
+    p.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                   help='Workers for the parallel run')
+    p.set_defaults(func=bench_parallel)
+
+    p = sub.add_parser('detect', help=bench_detect.__doc__)
+    p.add_argument('--lines', type=int, default=50000, help='Script length')
+    p.add_argument('--repeat', type=int, default=3, help='Timed repetitions')
+    p.set_defaults(func=bench_detect)
+
+    p = sub.add_parser('bib', help=bench_bib.__doc__)
+    p.add_argument('--entries', type=int, default=5000, help='Bibliography size')
+    p.add_argument('--subfiles', type=int, default=50, help='Citing .tex files')
+    p.add_argument('--cites', type=int, default=20, help='Citations per subfile')
+    p.set_defaults(func=bench_bib)
+
+    p = sub.add_parser('scaling', help=bench_scaling.__doc__)
+    p.add_argument('--sizes', type=int, nargs='+', default=SCALING_SIZES,
+                   help='Synthetic repo sizes (files)')
+    p.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                   help='Workers per run')
+    p.add_argument('--baseline', type=Path, default=BASELINE_PATH,
+                   help='Baseline file to compare against or save to')
+    p.add_argument('--save-baseline', action='store_true',
+                   help='Record this run as the new baseline')
+    p.set_defaults(func=bench_scaling)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Thin client for the quality_score.py watch daemon
+
+Takes the same arguments as quality_score.py and prints the same output,
+but asks a running daemon (quality_score.py --watch) to do the scoring, so
+a call costs a socket round trip instead of a cold start. Without a daemon
+it falls back to scoring in-process.
+
+Usage:
+    python docs/quality_reports/quality_score.py --watch &
+    python docs/quality_reports/quality_client.py code/scripts/core/01_clean.py
+    python docs/quality_reports/quality_client.py paper/main.tex --summary
+"""
+
+import os
+import sys
+import json
+import socket
+
+# Must match quality_score.SOCKET_PATH; not imported to keep startup minimal
+SOCKET_PATH = os.environ.get(
+    'QUALITY_SCORE_SOCKET',
+    os.path.join(os.environ.get('XDG_RUNTIME_DIR', '/tmp'),
+                 f'quality_score-{os.getuid()}.sock'),
+)
+
+
+def query(argv):
+    """Send one CLI invocation to the daemon; None if no daemon answers."""
+    request = json.dumps({'cwd': os.getcwd(), 'argv': argv}).encode('utf-8')
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(SOCKET_PATH)
+            conn.sendall(request)
+            conn.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+    if not chunks:
+        return None
+    return json.loads(b''.join(chunks))
+
+
+def main():
+    reply = query(sys.argv[1:])
+    if reply is None:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import quality_score
+        quality_score.main()
+
+    sys.stdout.write(reply['stdout'])
+    sys.stderr.write(reply['stderr'])
+    sys.exit(reply['exit_code'])
+
+
+if __name__ == '__main__':
+    main()
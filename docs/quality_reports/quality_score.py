@@ -14,16 +14,45 @@ Usage:
     python docs/quality_reports/quality_score.py paper/main.tex
     python docs/quality_reports/quality_score.py code/src/mypackage/core/*.py --summary
     python docs/quality_reports/quality_score.py code/src/mypackage/core/*.py --json
+    python docs/quality_reports/quality_score.py code/scripts/**/*.py --ndjson
+    python docs/quality_reports/quality_score.py code/scripts/**/*.py --jobs 8
+    python docs/quality_reports/quality_score.py paper/main.tex --no-cache
+    python docs/quality_reports/quality_score.py --changed-since main --summary
+    python docs/quality_reports/quality_score.py --staged
+    python docs/quality_reports/quality_score.py --watch
+    python docs/quality_reports/quality_score.py --manuscript paper/main.tex
 """
 
+import os
 import sys
+import time
 import argparse
+import contextlib
+import ctypes
+import ctypes.util
+import functools
+import hashlib
+import io
+import selectors
+import signal
+import socket
+import sqlite3
 import subprocess
+import struct
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import re
 import json
 import ast
+import bisect
+import importlib.util
+from importlib.machinery import PathFinder
+
+# Bump when detection logic changes in a way that alters reports; part of the
+# result-cache fingerprint together with the rubrics below.
+SCORER_VERSION = '1.8'
 
 # ==============================================================================
 # SCORING RUBRICS (from .claude/rules/standalone-quality.md)
@@ -120,154 +149,677 @@ def classify_file(filepath: Path) -> str:
     return 'unknown'
 
 
+CITE_RE = re.compile(r'\\cite[a-z]*\{([^}]+)\}')
+
+
+def find_bib_file(filepath: Path) -> Path:
+    """Locate the bibliography a LaTeX file's citations are checked against:
+    next to the file, next to its parent directory (paper/sections/*.tex),
+    or in a sibling paper/ directory."""
+    for bib_file in (filepath.parent / 'references.bib',
+                     filepath.parent.parent / 'references.bib'):
+        if bib_file.exists():
+            return bib_file
+    return filepath.parent.parent / 'paper' / 'references.bib'
+
+
 # ==============================================================================
-# ISSUE DETECTION
+# PROFILING
 # ==============================================================================
 
-class IssueDetector:
-    """Detect common issues for quality scoring."""
+class Profiler:
+    """Per-process wall-time totals for named scoring steps (--profile).
 
-    @staticmethod
-    def check_python_syntax(filepath: Path) -> Tuple[bool, str]:
-        """Check if Python file has valid syntax."""
-        try:
-            source = filepath.read_text(encoding='utf-8')
-            ast.parse(source, filename=str(filepath))
-            return True, ""
-        except SyntaxError as e:
-            return False, f"Line {e.lineno}: {e.msg}"
+    Disabled by default, in which case timed() costs one attribute check.
+    Steps can nest (BibIndex.parse runs inside check_broken_citations);
+    each is recorded in full.
+    """
 
-    @staticmethod
-    def check_python_imports(filepath: Path) -> Tuple[bool, str]:
-        """Check if Python file imports resolve (syntax + import check)."""
+    def __init__(self):
+        self.enabled = False
+        self._timings: Dict[str, List] = {}   # name -> [calls, seconds]
+
+    @contextlib.contextmanager
+    def timed(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
         try:
-            result = subprocess.run(
-                [sys.executable, '-c', f'import ast; ast.parse(open("{filepath}").read())'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode != 0:
-                return False, result.stderr.strip()
-            return True, ""
-        except subprocess.TimeoutExpired:
-            return False, "Syntax check timeout"
+            yield
+        finally:
+            entry = self._timings.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
 
-    @staticmethod
-    def check_file_io_in_src(content: str) -> List[int]:
-        """Detect file I/O operations that belong in scripts/, not src/."""
-        issues = []
-        lines = content.split('\n')
-        io_patterns = [
-            r'\bopen\s*\(',
-            r'\.read_csv\b',
-            r'\.to_csv\b',
-            r'\.read_excel\b',
-            r'\.to_excel\b',
-            r'\.read_json\b',
-            r'\.to_json\b',
-            r'\.read_parquet\b',
-            r'\.to_parquet\b',
-            r'\.read_feather\b',
-            r'\.to_feather\b',
-            r'\.read_stata\b',
-            r'\.to_stata\b',
-            r'pd\.read_',
-            r'np\.load\b',
-            r'np\.save\b',
-            r'pickle\.(load|dump)\b',
-            r'json\.(load|dump)\b(?!s)',  # json.load/dump but not loads/dumps
-            r'Path\([^)]*\)\.(read_text|write_text|read_bytes|write_bytes)',
-        ]
+    def take(self) -> Dict[str, List]:
+        """Return the timings recorded so far and start over."""
+        timings, self._timings = self._timings, {}
+        return timings
 
-        for i, line in enumerate(lines, 1):
-            stripped = line.split('#')[0] if '#' in line else line
-            for pattern in io_patterns:
-                if re.search(pattern, stripped):
-                    issues.append(i)
-                    break
 
-        return issues
+# One per process; workers are started with the parent's enabled flag
+PROFILER = Profiler()
 
-    @staticmethod
-    def check_hardcoded_paths(content: str) -> List[int]:
-        """Detect hardcoded absolute paths."""
-        issues = []
+
+def profiled(func):
+    """Record each call of func under its qualified name when profiling."""
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not PROFILER.enabled:
+            return func(*args, **kwargs)
+        with PROFILER.timed(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _init_worker(profile: bool) -> None:
+    PROFILER.enabled = profile
+
+
+# ==============================================================================
+# BIBLIOGRAPHY INDEX
+# ==============================================================================
+
+# Start of a BibTeX entry: '@type' then its opening delimiter
+BIB_ENTRY_RE = re.compile(r'@[ \t]*([A-Za-z][\w-]*)\s*([{(])')
+# An entry's citation key: everything up to the first comma, trimmed
+BIB_KEY_RE = re.compile(r'\s*([^,{}()\s](?:[^,{}()]*[^,{}()\s])?)\s*,')
+BIB_DELIM_RE = re.compile(r'[{}()]')
+# Entry types that define no citation key
+BIB_NON_ENTRIES = ('comment', 'string', 'preamble')
+
+
+def _bib_body_end(text: str, pos: int, opener: str) -> int:
+    """Offset just past the body opened at pos - 1 by opener."""
+    closer = '}' if opener == '{' else ')'
+    depth = 0
+    for match in BIB_DELIM_RE.finditer(text, pos):
+        char = match.group()
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            if depth == 0 and closer == '}':
+                return match.end()
+            depth -= 1
+        elif char == ')' and depth == 0 and closer == ')':
+            return match.end()
+    return len(text)
+
+
+class BibIndex:
+    """Citation keys of a .bib file, each with the line its entry starts on.
+
+    Entries are delimited by balanced braces (or parentheses), so an '@'
+    inside a field never starts an entry. @comment, @string and @preamble
+    define no key, and their bodies are skipped. Whitespace around a key is
+    not part of it. The first definition of a duplicated key wins, as in
+    BibTeX.
+    """
+
+    def __init__(self, keys: Dict[str, int]):
+        self.keys = keys
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def line_of(self, key: str) -> Optional[int]:
+        """Line of the entry defining key, or None if undefined."""
+        return self.keys.get(key)
+
+    @classmethod
+    @profiled
+    def parse(cls, text: str) -> 'BibIndex':
+        keys = {}
+        pos = line_pos = 0
+        line = 1
+        while True:
+            entry = BIB_ENTRY_RE.search(text, pos)
+            if entry is None:
+                return cls(keys)
+            body = entry.end()
+            if entry.group(1).lower() not in BIB_NON_ENTRIES:
+                key = BIB_KEY_RE.match(text, body)
+                if key is not None:
+                    line += text.count('\n', line_pos, entry.start())
+                    line_pos = entry.start()
+                    keys.setdefault(key.group(1), line)
+            pos = _bib_body_end(text, body, entry.group(2))
+
+    @classmethod
+    def from_json(cls, blob: str) -> 'BibIndex':
+        return cls(json.loads(blob))
+
+    def to_json(self) -> str:
+        return json.dumps(self.keys)
+
+
+# Parsed bibliographies by resolved path, reused while the file's stat is
+# unchanged. ResultCache.load_bib_index() seeds it from the persistent store.
+_BIB_INDEXES: Dict[Path, Tuple[Tuple[int, int], BibIndex]] = {}
+
+
+def _bib_stamp(bib_file: Path) -> Tuple[Tuple[int, int], bool]:
+    """(mtime_ns, size) of a .bib file, and whether it is safe to memoize."""
+    st = bib_file.stat()
+    settled = time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS
+    return (st.st_mtime_ns, st.st_size), settled
+
+
+def bib_index(bib_file: Path) -> BibIndex:
+    """Index of a .bib file, parsed at most once per file version."""
+    path = bib_file.resolve()
+    stamp, settled = _bib_stamp(path)
+    entry = _BIB_INDEXES.get(path)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+
+    index = BibIndex.parse(path.read_text(encoding='utf-8'))
+    if settled:
+        _BIB_INDEXES[path] = (stamp, index)
+    return index
+
+
+# ==============================================================================
+# DETECTION ENGINE
+# ==============================================================================
+
+# Line-level patterns, grouped into rules. Each rule's patterns are joined into
+# one alternation; a line "hits" a rule if any of its patterns matches the line
+# with comments removed. Patterns must not match across a newline, because
+# rules are run over the whole file.
+LINE_RULES = {
+    # File I/O that belongs in scripts/, not src/
+    'file_io': [
+        r'\bopen[^\S\n]*\(',
+        r'\.(read|to)_(csv|excel|json|parquet|feather|stata)\b',
+        r'pd\.read_',
+        r'np\.(load|save)\b',
+        r'pickle\.(load|dump)\b',
+        r'json\.(load|dump)\b(?!s)',  # json.load/dump but not loads/dumps
+        r'Path\([^)\n]*\)\.(read_text|write_text|read_bytes|write_bytes)',
+    ],
+    # Absolute paths in strings (Unix/home, then Windows); URLs are exempt
+    'absolute_path': [r'["\'][/~](?!tmp/)'],
+    'url': [r'https?://'],
+    'windows_path': [r'["\'][A-Za-z]:[/\\]'],
+    # Paths to data/, output/, paper/ directories
+    'config_path': [r'["\'].*(data|output|paper)[/\\]'],
+    # Write operations (only count when the line also names data/raw/): the
+    # call, outside any string...
+    'raw_write': [
+        r'\.to_csv', r'\.to_excel', r'\.to_parquet',
+        r'\.write', r'\.save', r'dump',
+        r'open\(', r'shutil\.(copy|move)',
+    ],
+    # ...and the call with its arguments, where open('w') needs the mode string
+    'raw_write_args': [
+        r'\.to_csv', r'\.to_excel', r'\.to_parquet',
+        r'\.write', r'\.save', r'dump',
+        r'open\(.*(w|a)', r'shutil\.(copy|move)',
+    ],
+}
+
+# Characters a rule's matches can start with. A leading lookahead on them lets
+# the regex engine reject most positions without trying every alternative.
+LINE_RULE_FIRST_CHARS = {
+    'file_io': '.opnjP',
+}
+
+LINE_RULE_RES = {
+    rule: re.compile(
+        (f'(?=[{re.escape(LINE_RULE_FIRST_CHARS[rule])}])'
+         if rule in LINE_RULE_FIRST_CHARS else '')
+        + '(?:' + '|'.join(f'(?:{p})' for p in patterns) + ')'
+    )
+    for rule, patterns in LINE_RULES.items()
+}
+
+# Rules about calls rather than string contents run on the "bare" view, where
+# string literals are blanked too, so open( or .to_csv inside a string does
+# not count. All other rules run on the comment-free view.
+BARE_RULES = {'file_io', 'raw_write'}
+
+NEWLINE_RE = re.compile('\n')
+
+# Everything from the first '#' to the end of its line
+COMMENT_RE = re.compile(r'#[^\n]*')
+
+# Matched against the full line, comments included
+RAW_TARGET_RE = re.compile(r'["\'].*data[/\\]raw[/\\]')
+
+# Checks and the line rules each one consumes
+LINE_CHECKS = {
+    'file_io_in_src': ('file_io',),
+    'hardcoded_paths': ('absolute_path', 'url', 'windows_path'),
+    'paths_from_config': ('config_path',),
+    'raw_data_modification': ('raw_write', 'raw_write_args'),
+}
+
+RANDOM_INDICATOR_RE = re.compile('|'.join([
+    r'random\.', r'np\.random\.', r'torch\.manual_seed',
+    r'random_state', r'RandomState', r'seed=',
+    r'sample\(', r'shuffle\(',
+]))
+
+SEED_RE = re.compile('|'.join([
+    r'random\.seed\(', r'np\.random\.seed\(',
+    r'torch\.manual_seed\(', r'random_state\s*=',
+    r'seed\s*=\s*\d+', r'SEED\s*=',
+]))
+
+
+class DetectionEngine:
+    """Run several line checks in one pass over a file.
+
+    Comments are removed from the whole file up front (string-aware, via
+    PythonContext, or else by a single substitution), then each rule's
+    precompiled alternation is run once over the stripped text and its match
+    offsets are mapped back to line numbers. Checks are resolved from
+    the per-rule line sets, so the cost no longer scales with
+    lines x patterns x checks, and nothing is done per line for lines that
+    match no rule.
+    """
+
+    def __init__(self, checks: List[str]):
+        self.checks = tuple(checks)
+        self.rules = tuple(sorted({r for c in self.checks for r in LINE_CHECKS[c]}))
+
+    def scan(self, content: str, code: Optional[str] = None,
+             bare: Optional[str] = None) -> Dict[str, List[int]]:
+        """Return {check: [line numbers]} for every configured check.
+
+        `code` is `content` with comments removed and `bare` additionally has
+        string literals blanked (see PythonContext). If omitted, everything
+        after a '#' is treated as a comment and strings are left in place.
+        """
+        stripped = COMMENT_RE.sub('', content) if code is None else code
+        bare = stripped if bare is None else bare
+        views = {}
+        hits = {}
+        for check in self.checks:
+            with PROFILER.timed(f'IssueDetector.check_{check}'):
+                for rule in LINE_CHECKS[check]:
+                    if rule in hits:
+                        continue
+                    text = bare if rule in BARE_RULES else stripped
+                    if id(text) not in views:
+                        views[id(text)] = [m.start() for m in NEWLINE_RE.finditer(text)]
+                    hits[rule] = self._rule_lines(rule, text, views[id(text)])
+        found = {check: [] for check in self.checks}
+        if not any(hits.values()):
+            return found
+
+        stripped_lines = stripped.split('\n')
         lines = content.split('\n')
 
-        for i, line in enumerate(lines, 1):
-            stripped = line.split('#')[0] if '#' in line else line
-            # Match absolute paths in strings
-            if re.search(r'["\'][/~](?!tmp/)', stripped):
-                # Skip URLs
-                if not re.search(r'https?://', stripped):
+        if 'file_io_in_src' in found:
+            found['file_io_in_src'] = sorted(hits['file_io'])
+
+        if 'hardcoded_paths' in found:
+            absolute, url = hits['absolute_path'], hits['url']
+            windows = hits['windows_path']
+            issues = []
+            for i in sorted(absolute | windows):
+                if i in absolute and i not in url:
                     issues.append(i)
-            # Match Windows absolute paths
-            if re.search(r'["\'][A-Za-z]:[/\\]', stripped):
-                issues.append(i)
+                if i in windows:
+                    issues.append(i)
+            found['hardcoded_paths'] = list(set(issues))
+
+        if 'paths_from_config' in found:
+            found['paths_from_config'] = [
+                i for i in sorted(hits['config_path'])
+                if not stripped_lines[i - 1].strip().startswith(('import', 'from', '#'))
+            ]
 
-        return list(set(issues))
+        if 'raw_data_modification' in found:
+            found['raw_data_modification'] = [
+                i for i in sorted(hits['raw_write'] & hits['raw_write_args'])
+                if RAW_TARGET_RE.search(lines[i - 1])
+            ]
+
+        return found
 
     @staticmethod
-    def check_raw_data_modification(content: str) -> List[int]:
-        """Detect writes to data/raw/."""
-        issues = []
-        lines = content.split('\n')
+    def _rule_lines(rule: str, text: str, newlines: List[int]) -> set:
+        """1-based numbers of the lines in text that match rule.
 
-        for i, line in enumerate(lines, 1):
-            if re.search(r'["\'].*data[/\\]raw[/\\]', line):
-                # Check if it's a write operation context
-                stripped = line.split('#')[0] if '#' in line else line
-                write_patterns = [
-                    r'\.to_csv', r'\.to_excel', r'\.to_parquet',
-                    r'\.write', r'\.save', r'dump',
-                    r'open\(.*(w|a)', r'shutil\.(copy|move)',
-                ]
-                for pattern in write_patterns:
-                    if re.search(pattern, stripped):
-                        issues.append(i)
-                        break
+        `newlines` holds the offsets of every newline in text.
+        """
+        bisect_left = bisect.bisect_left
+        return {bisect_left(newlines, m.start()) + 1
+                for m in LINE_RULE_RES[rule].finditer(text)}
 
-        return issues
+
+MODULE_ENGINE = DetectionEngine(
+    ['file_io_in_src', 'hardcoded_paths', 'paths_from_config'])
+SCRIPT_ENGINE = DetectionEngine(['raw_data_modification', 'hardcoded_paths'])
+
+
+# ==============================================================================
+# PYTHON ANALYSIS CONTEXT
+# ==============================================================================
+
+# A string literal or a comment. Lexing strings as well is what keeps a '#'
+# inside a string from being read as the start of a comment. String prefixes
+# (r, b, f, ...) do not change where a literal ends, so they are left outside
+# the match; every branch then starts with a quote or '#', which lets the regex
+# engine skip ahead quickly.
+STRING_OR_COMMENT_RE = re.compile(r"""
+    (?P<string>
+        \'\'\'[^\'\\]*(?:(?:\\[\s\S]|\'(?!\'\'))[^\'\\]*)*\'\'\'
+      | \"\"\"[^\"\\]*(?:(?:\\[\s\S]|\"(?!\"\"))[^\"\\]*)*\"\"\"
+      | \'[^\'\\\n]*(?:\\[\s\S][^\'\\\n]*)*\'
+      | \"[^\"\\\n]*(?:\\[\s\S][^\"\\\n]*)*\"
+    )
+    | \#[^\n]*
+""", re.VERBOSE)
+
+# The prefix of an f-string, ending where its literal starts
+FSTRING_PREFIX_RE = re.compile(r'(?<!\w)[rR]?[fF][rR]?$')
+
+# An escaped brace, or a replacement field with one level of nested fields
+# (f"{x:{width}}"); group 1 is the field's text
+FSTRING_FIELD_RE = re.compile(r'\{\{|\}\}|\{((?:[^{}]|\{[^{}]*\})*)\}')
+
+
+def _fstring_fields(string: str) -> str:
+    """The replacement fields of an f-string literal, in their bare view and
+    on their own lines; the literal text is dropped."""
+    parts = []
+    pos = 0
+    for match in FSTRING_FIELD_RE.finditer(string):
+        parts.append('\n' * string.count('\n', pos, match.start()))
+        if match.group(1) is not None:
+            parts.append(' ' + _views(match.group(1))[1])
+        pos = match.end()
+    parts.append('\n' * string.count('\n', pos))
+    return ''.join(parts)
+
+
+def _views(source: str) -> Tuple[str, str]:
+    code, bare = [], []
+    pos = 0
+    for match in STRING_OR_COMMENT_RE.finditer(source):
+        start, end = match.span()
+        code.append(source[pos:start])
+        bare.append(source[pos:start])
+        string = match.group('string')
+        if string is not None:
+            code.append(string)
+            # Replacement fields are code: f"{open(p)}" still opens p
+            if FSTRING_PREFIX_RE.search(source, max(0, start - 2), start):
+                bare.append('""' + _fstring_fields(string))
+            else:
+                bare.append('""' + '\n' * string.count('\n'))
+        pos = end
+    code.append(source[pos:])
+    bare.append(source[pos:])
+    return ''.join(code), ''.join(bare)
+
+
+@profiled
+def _lex(source: str) -> Tuple[str, str]:
+    """Return (code, bare) views of source; see PythonContext."""
+    return _views(source)
+
+
+class PythonContext:
+    """One Python file, read, lexed and parsed exactly once.
+
+    Every Python check consumes this instead of re-reading the file:
+      source  the text as read
+      tree    the parsed module (None on a syntax error)
+      code    source with comments removed by a string-aware lexer, so a '#'
+              inside a string is not mistaken for a comment
+      bare    code with string literals also blanked, for checks about calls
+              and names (open(, .to_csv, np.random.) that must not fire on text
+              inside strings; f-strings keep their replacement fields
+    All three texts keep the source's line structure.
+    """
+
+    def __init__(self, filepath: Path):
+        self.filepath = filepath
+        self.source = filepath.read_text(encoding='utf-8')
+        self.syntax_error = None
+        self.tree = None
+        self.code = None
+        self.bare = None
+        try:
+            with PROFILER.timed('ast.parse'):
+                self.tree = ast.parse(self.source, filename=str(filepath))
+        except SyntaxError as e:
+            self.syntax_error = f"Line {e.lineno}: {e.msg}"
+            return
+        self.code, self.bare = _lex(self.source)
+
+
+# ==============================================================================
+# IMPORT RESOLUTION
+# ==============================================================================
+
+# File types whose rubric has syntax_or_import_error
+IMPORT_CHECKED_TYPES = ('python_module', 'exploration_python')
+
+IMPORT_ERRORS = {'ImportError', 'ModuleNotFoundError', 'Exception', 'BaseException'}
+
+
+def import_roots(filepath: Path) -> Tuple[Path, ...]:
+    """Project directories absolute imports in filepath resolve against.
+
+    The nearest `src/` (code/src for both modules and scripts), plus the file's
+    own directory for scripts, which Python puts on sys.path when run.
+    """
+    filepath = filepath.resolve()
+    for parent in filepath.parents:
+        if parent.name == 'src':
+            return (parent,)
+        if (parent / 'src').is_dir():
+            return (filepath.parent, parent / 'src')
+    return (filepath.parent,)
+
+
+def _guards_import_error(node: ast.Try) -> bool:
+    """True if the try statement has a handler that would catch ImportError."""
+    for handler in node.handlers:
+        caught = handler.type
+        if caught is None:
+            return True
+        names = caught.elts if isinstance(caught, ast.Tuple) else [caught]
+        if any(isinstance(n, ast.Name) and n.id in IMPORT_ERRORS for n in names):
+            return True
+    return False
+
+
+def iter_imports(tree: ast.Module):
+    """Yield the Import/ImportFrom statements in tree.
+
+    Only statement bodies are visited, which is much cheaper than a full AST
+    walk. Imports inside `try: ... except ImportError:` are optional by
+    intent and are skipped.
+    """
+    stack = [tree.body]
+    while stack:
+        for node in stack.pop():
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                yield node
+            elif isinstance(node, (ast.Try, ast.TryStar)):
+                if not _guards_import_error(node):
+                    stack.append(node.body)
+                stack.extend([node.handlers, node.orelse, node.finalbody])
+            else:
+                for field in ('body', 'orelse', 'finalbody', 'handlers', 'cases'):
+                    value = getattr(node, field, None)
+                    if isinstance(value, list):
+                        stack.append(value)
+
+
+class ImportResolver:
+    """Resolve import targets in this interpreter, memoized across files.
+
+    Top-level names are looked up in the project roots first (without
+    importing anything), then through the normal import system. Submodules
+    are looked up in their parent's search locations, so no package
+    __init__ is ever executed. Every (roots, module) pair is resolved once
+    per process, however many files import it.
+    """
+
+    def __init__(self):
+        self._project = {}   # (roots, module) -> spec or None
+        self._global = {}    # module -> spec or None
+        self._paths = {}     # Path -> bool
+        self._env_digest = None
+        self._tree_digests = {}
+
+    def find_spec(self, module: str, roots: Tuple[Path, ...]):
+        """Spec for an absolute module name, or None if it cannot be found."""
+        key = (roots, module)
+        if key not in self._project:
+            self._project[key] = self._find(module, roots)
+        return self._project[key]
+
+    def _find(self, module: str, roots: Tuple[Path, ...]):
+        parent, _, name = module.rpartition('.')
+        if not parent:
+            spec = PathFinder.find_spec(module, [str(r) for r in roots])
+            return spec if spec is not None else self._find_global(module)
+
+        parent_spec = self.find_spec(parent, roots)
+        if parent_spec is None:
+            return None
+        locations = parent_spec.submodule_search_locations
+        if locations is None:
+            # A plain module that sets attributes as submodules (os.path)
+            loaded = sys.modules.get(module)
+            return getattr(loaded, '__spec__', None)
+        return PathFinder.find_spec(name, list(locations))
+
+    def _find_global(self, module: str):
+        if module not in self._global:
+            try:
+                self._global[module] = importlib.util.find_spec(module)
+            except (ImportError, ValueError):
+                self._global[module] = None
+        return self._global[module]
+
+    def invalidate(self) -> None:
+        """Forget every memoized result, e.g. after modules were added."""
+        self._project.clear()
+        self._global.clear()
+        self._paths.clear()
+        self._env_digest = None
+        self._tree_digests.clear()
+        importlib.invalidate_caches()
+
+    def exists(self, path: Path) -> bool:
+        """Memoized check that a relative-import target exists."""
+        if path not in self._paths:
+            self._paths[path] = path.with_suffix('.py').exists() or path.is_dir()
+        return self._paths[path]
+
+    def environment_digest(self, roots: Tuple[Path, ...]) -> str:
+        """Hash of what is importable: sys.path listings plus the .py files
+        under each project root. Changes when a package is installed or a
+        module is added, so cached import results are not reused."""
+        if self._env_digest is None:
+            listing = []
+            for entry in sys.path:
+                try:
+                    listing.append(entry + ':' + ','.join(sorted(os.listdir(entry or '.'))))
+                except OSError:
+                    listing.append(entry)
+            self._env_digest = hashlib.sha256(
+                '\n'.join([sys.version] + listing).encode('utf-8')).hexdigest()
+
+        parts = [self._env_digest]
+        for root in roots:
+            if root not in self._tree_digests:
+                # src/ holds packages, so list it recursively; a script's own
+                # directory only contributes its top-level modules/packages
+                found = root.rglob('*.py') if root.name == 'src' else root.iterdir()
+                files = sorted(str(p.relative_to(root)) for p in found)
+                self._tree_digests[root] = hashlib.sha256(
+                    '\n'.join(files).encode('utf-8')).hexdigest()
+            parts.append(self._tree_digests[root])
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+# One per process: shared by every file scored in this interpreter (or worker)
+IMPORT_RESOLVER = ImportResolver()
+
+
+# ==============================================================================
+# ISSUE DETECTION
+# ==============================================================================
+
+class IssueDetector:
+    """Detect common issues for quality scoring."""
 
     @staticmethod
-    def check_paths_from_config(content: str) -> List[int]:
-        """Check if paths are imported from config.py rather than hardcoded."""
-        issues = []
-        lines = content.split('\n')
+    @profiled
+    def check_python_imports(ctx: PythonContext,
+                             resolver: ImportResolver = IMPORT_RESOLVER
+                             ) -> List[Tuple[int, str]]:
+        """Find imports that do not resolve; returns (line, module) pairs."""
+        roots = import_roots(ctx.filepath)
+        unresolved = []
+        for node in iter_imports(ctx.tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if resolver.find_spec(alias.name, roots) is None:
+                        unresolved.append((node.lineno, alias.name))
+            elif node.level:
+                # Relative: resolve against the file's package directory
+                base = ctx.filepath.resolve().parent
+                for _ in range(node.level - 1):
+                    base = base.parent
+                if node.module and not resolver.exists(
+                        base.joinpath(*node.module.split('.'))):
+                    unresolved.append((node.lineno, '.' * node.level + node.module))
+            elif resolver.find_spec(node.module, roots) is None:
+                unresolved.append((node.lineno, node.module))
+        return sorted(unresolved)
 
-        # Check for path-like string literals that should come from config
-        for i, line in enumerate(lines, 1):
-            stripped = line.split('#')[0] if '#' in line else line
-            # Paths to data/, output/, paper/ directories
-            if re.search(r'["\'].*(data|output|paper)[/\\]', stripped):
-                # Skip if it's an import or comment
-                if stripped.strip().startswith(('import', 'from', '#')):
-                    continue
-                issues.append(i)
+    @staticmethod
+    def check_file_io_in_src(ctx: PythonContext) -> List[int]:
+        """Detect file I/O operations that belong in scripts/, not src/."""
+        return DetectionEngine(['file_io_in_src']).scan(
+            ctx.source, ctx.code, ctx.bare)['file_io_in_src']
 
-        return issues
+    @staticmethod
+    def check_hardcoded_paths(ctx: PythonContext) -> List[int]:
+        """Detect hardcoded absolute paths."""
+        return DetectionEngine(['hardcoded_paths']).scan(
+            ctx.source, ctx.code)['hardcoded_paths']
 
     @staticmethod
-    def check_missing_seed(content: str) -> bool:
-        """Check if stochastic code has seed set."""
-        random_indicators = [
-            r'random\.', r'np\.random\.', r'torch\.manual_seed',
-            r'random_state', r'RandomState', r'seed=',
-            r'sample\(', r'shuffle\(',
-        ]
-        has_random = any(re.search(p, content) for p in random_indicators)
-
-        seed_patterns = [
-            r'random\.seed\(', r'np\.random\.seed\(',
-            r'torch\.manual_seed\(', r'random_state\s*=',
-            r'seed\s*=\s*\d+', r'SEED\s*=',
-        ]
-        has_seed = any(re.search(p, content) for p in seed_patterns)
+    def check_raw_data_modification(ctx: PythonContext) -> List[int]:
+        """Detect writes to data/raw/."""
+        return DetectionEngine(['raw_data_modification']).scan(
+            ctx.source, ctx.code)['raw_data_modification']
+
+    @staticmethod
+    def check_paths_from_config(ctx: PythonContext) -> List[int]:
+        """Check if paths are imported from config.py rather than hardcoded."""
+        return DetectionEngine(['paths_from_config']).scan(
+            ctx.source, ctx.code)['paths_from_config']
 
+    @staticmethod
+    @profiled
+    def check_missing_seed(ctx: PythonContext) -> bool:
+        """Check if stochastic code has seed set."""
+        has_random = RANDOM_INDICATOR_RE.search(ctx.bare) is not None
+        has_seed = SEED_RE.search(ctx.bare) is not None
         return has_random and not has_seed
 
     @staticmethod
+    @profiled
     def check_script_numbering(filepath: Path) -> bool:
         """Check if script in core/ follows NN_ numbering convention."""
         if 'core' not in filepath.parts:
@@ -276,37 +828,54 @@ class IssueDetector:
         return bool(re.match(r'^\d{2}_', name))
 
     @staticmethod
+    @profiled
     def check_latex_syntax(content: str) -> List[Dict]:
         """Check for common LaTeX syntax issues without compiling."""
-        issues = []
         lines = content.split('\n')
+        return IssueDetector.check_latex_environments(
+            (None, i, line) for i, line in enumerate(lines, 1))
+
+    @staticmethod
+    def check_latex_environments(lines) -> List[Dict]:
+        """Match \\begin/\\end over (source, line number, text) triples.
+
+        The lines may come from several files (a flattened manuscript); each
+        issue records the 'source' and 'line' it belongs to.
+        """
+        issues = []
 
         env_stack = []
-        for i, line in enumerate(lines, 1):
+        for source, i, line in lines:
             stripped = line.split('%')[0] if '%' in line else line
 
             for match in re.finditer(r'\\begin\{(\w+)\}', stripped):
-                env_stack.append((match.group(1), i))
+                env_stack.append((match.group(1), source, i))
 
             for match in re.finditer(r'\\end\{(\w+)\}', stripped):
                 env_name = match.group(1)
                 if env_stack and env_stack[-1][0] == env_name:
                     env_stack.pop()
                 elif env_stack:
+                    open_name, open_source, open_line = env_stack[-1]
+                    opened = (f'line {open_line}' if open_source == source
+                              else f'{open_source}:{open_line}')
                     issues.append({
+                        'source': source,
                         'line': i,
                         'description': f'Mismatched environment: \\end{{{env_name}}} '
-                                       f'but expected \\end{{{env_stack[-1][0]}}} '
-                                       f'(opened at line {env_stack[-1][1]})',
+                                       f'but expected \\end{{{open_name}}} '
+                                       f'(opened at {opened})',
                     })
                 else:
                     issues.append({
+                        'source': source,
                         'line': i,
                         'description': f'\\end{{{env_name}}} without matching \\begin',
                     })
 
-        for env_name, line_num in env_stack:
+        for env_name, source, line_num in env_stack:
             issues.append({
+                'source': source,
                 'line': line_num,
                 'description': f'Unclosed environment: \\begin{{{env_name}}} never closed',
             })
@@ -314,11 +883,11 @@ class IssueDetector:
         return issues
 
     @staticmethod
+    @profiled
     def check_broken_citations(content: str, bib_file: Path) -> List[str]:
         """Check for LaTeX citation keys not in bibliography."""
-        cite_pattern = r'\\cite[a-z]*\{([^}]+)\}'
         cited_keys = set()
-        for match in re.finditer(cite_pattern, content):
+        for match in CITE_RE.finditer(content):
             keys = match.group(1).split(',')
             cited_keys.update(k.strip() for k in keys)
 
@@ -326,15 +895,13 @@ class IssueDetector:
             return []
 
         if not bib_file.exists():
-            return list(cited_keys)
-
-        bib_content = bib_file.read_text(encoding='utf-8')
-        bib_keys = set(re.findall(r'@\w+\{([^,]+),', bib_content))
+            return sorted(cited_keys)
 
-        broken = cited_keys - bib_keys
-        return list(broken)
+        index = bib_index(bib_file)
+        return sorted(key for key in cited_keys if key not in index)
 
     @staticmethod
+    @profiled
     def check_overfull_hbox_risk(content: str) -> List[int]:
         """Detect lines likely to cause overfull hbox (>10pt)."""
         issues = []
@@ -359,9 +926,13 @@ class IssueDetector:
 class QualityScorer:
     """Calculate quality scores based on standalone-quality.md rubrics."""
 
-    def __init__(self, filepath: Path, verbose: bool = False):
+    def __init__(self, filepath: Path, verbose: bool = False,
+                 latex_syntax: Optional[List[Dict]] = None):
         self.filepath = filepath
         self.verbose = verbose
+        # Syntax issues found over a whole manuscript (see Manuscript); when
+        # given, they replace the single-file check_latex_syntax
+        self.latex_syntax = latex_syntax
         self.score = 100
         self.issues = {
             'critical': [],
@@ -390,19 +961,30 @@ class QualityScorer:
 
     def _score_python_module(self):
         """Score Python module (code/src/mypackage/core/)."""
-        content = self.filepath.read_text(encoding='utf-8')
+        ctx = PythonContext(self.filepath)
 
         # Critical: syntax/import error
-        valid, error = IssueDetector.check_python_syntax(self.filepath)
-        if not valid:
+        if ctx.syntax_error:
             self.auto_fail = True
             self._add_issue('critical', 'syntax_or_import_error',
-                            'Syntax error', error, 100)
+                            'Syntax error', ctx.syntax_error, 100)
+            self.score = 0
+            return
+
+        unresolved = IssueDetector.check_python_imports(ctx)
+        if unresolved:
+            for line, module in unresolved:
+                self._add_issue('critical', 'syntax_or_import_error',
+                                f'Unresolved import at line {line}: {module}',
+                                'Install the package or fix the module path', 100)
+            self.auto_fail = True
             self.score = 0
             return
 
+        lines = MODULE_ENGINE.scan(ctx.source, ctx.code, ctx.bare)
+
         # Critical: file I/O in src/
-        io_lines = IssueDetector.check_file_io_in_src(content)
+        io_lines = lines['file_io_in_src']
         for line in io_lines:
             self._add_issue('critical', 'file_io_in_src',
                             f'File I/O at line {line} (belongs in scripts/)',
@@ -410,7 +992,7 @@ class QualityScorer:
             self.score -= 30
 
         # Critical: hardcoded absolute paths
-        path_lines = IssueDetector.check_hardcoded_paths(content)
+        path_lines = lines['hardcoded_paths']
         for line in path_lines:
             self._add_issue('critical', 'hardcoded_absolute_paths',
                             f'Hardcoded absolute path at line {line}',
@@ -418,7 +1000,7 @@ class QualityScorer:
             self.score -= 20
 
         # Major: paths not from config
-        config_issues = IssueDetector.check_paths_from_config(content)
+        config_issues = lines['paths_from_config']
         for line in config_issues:
             self._add_issue('major', 'paths_not_from_config',
                             f'Path string at line {line} not from config.py',
@@ -427,19 +1009,20 @@ class QualityScorer:
 
     def _score_python_script(self):
         """Score Python script (code/scripts/core/)."""
-        content = self.filepath.read_text(encoding='utf-8')
+        ctx = PythonContext(self.filepath)
 
         # Critical: syntax error
-        valid, error = IssueDetector.check_python_syntax(self.filepath)
-        if not valid:
+        if ctx.syntax_error:
             self.auto_fail = True
             self._add_issue('critical', 'syntax_error',
-                            'Syntax error', error, 100)
+                            'Syntax error', ctx.syntax_error, 100)
             self.score = 0
             return
 
+        lines = SCRIPT_ENGINE.scan(ctx.source, ctx.code, ctx.bare)
+
         # Critical: modifies raw data
-        raw_writes = IssueDetector.check_raw_data_modification(content)
+        raw_writes = lines['raw_data_modification']
         for line in raw_writes:
             self._add_issue('critical', 'modifies_raw_data',
                             f'Writes to data/raw/ at line {line}',
@@ -447,7 +1030,7 @@ class QualityScorer:
             self.score -= 30
 
         # Critical: hardcoded absolute paths
-        path_lines = IssueDetector.check_hardcoded_paths(content)
+        path_lines = lines['hardcoded_paths']
         for line in path_lines:
             self._add_issue('critical', 'hardcoded_absolute_paths',
                             f'Hardcoded absolute path at line {line}',
@@ -455,7 +1038,7 @@ class QualityScorer:
             self.score -= 20
 
         # Major: missing seed for stochastic work
-        if IssueDetector.check_missing_seed(content):
+        if IssueDetector.check_missing_seed(ctx):
             self._add_issue('major', 'missing_seed',
                             'Missing seed for reproducibility',
                             'Set random seed at top of script', 10)
@@ -470,19 +1053,30 @@ class QualityScorer:
 
     def _score_exploration_python(self):
         """Score exploration Python (60/100 threshold)."""
-        content = self.filepath.read_text(encoding='utf-8')
+        ctx = PythonContext(self.filepath)
 
         # Critical: syntax/import error
-        valid, error = IssueDetector.check_python_syntax(self.filepath)
-        if not valid:
+        if ctx.syntax_error:
             self.auto_fail = True
             self._add_issue('critical', 'syntax_or_import_error',
-                            'Syntax error', error, 100)
+                            'Syntax error', ctx.syntax_error, 100)
             self.score = 0
             return
 
+        unresolved = IssueDetector.check_python_imports(ctx)
+        if unresolved:
+            for line, module in unresolved:
+                self._add_issue('critical', 'syntax_or_import_error',
+                                f'Unresolved import at line {line}: {module}',
+                                'Install the package or fix the module path', 100)
+            self.auto_fail = True
+            self.score = 0
+            return
+
+        lines = SCRIPT_ENGINE.scan(ctx.source, ctx.code, ctx.bare)
+
         # Critical: modifies raw data
-        raw_writes = IssueDetector.check_raw_data_modification(content)
+        raw_writes = lines['raw_data_modification']
         for line in raw_writes:
             self._add_issue('critical', 'modifies_raw_data',
                             f'Writes to data/raw/ at line {line}',
@@ -490,14 +1084,14 @@ class QualityScorer:
             self.score -= 30
 
         # Major: missing seed
-        if IssueDetector.check_missing_seed(content):
+        if IssueDetector.check_missing_seed(ctx):
             self._add_issue('major', 'missing_seed',
                             'Missing seed for reproducibility',
                             'Set random seed for reproducible results', 10)
             self.score -= 10
 
         # Minor: hardcoded paths (lighter penalty in exploration)
-        path_lines = IssueDetector.check_hardcoded_paths(content)
+        path_lines = lines['hardcoded_paths']
         for line in path_lines:
             self._add_issue('minor', 'hardcoded_absolute_paths',
                             f'Hardcoded absolute path at line {line}',
@@ -509,7 +1103,9 @@ class QualityScorer:
         content = self.filepath.read_text(encoding='utf-8')
 
         # Critical: LaTeX syntax issues
-        syntax_issues = IssueDetector.check_latex_syntax(content)
+        syntax_issues = self.latex_syntax
+        if syntax_issues is None:
+            syntax_issues = IssueDetector.check_latex_syntax(content)
         if syntax_issues:
             for issue in syntax_issues:
                 self._add_issue('critical', 'compilation_failure',
@@ -520,9 +1116,7 @@ class QualityScorer:
             return
 
         # Critical: undefined citations
-        bib_file = self.filepath.parent / 'references.bib'
-        if not bib_file.exists():
-            bib_file = self.filepath.parent.parent / 'paper' / 'references.bib'
+        bib_file = find_bib_file(self.filepath)
         broken_citations = IssueDetector.check_broken_citations(content, bib_file)
         for key in broken_citations:
             self._add_issue('critical', 'undefined_citation',
@@ -591,70 +1185,1020 @@ class QualityScorer:
 
     def print_report(self, summary_only: bool = False) -> None:
         """Print formatted quality report."""
-        report = self._generate_report()
-        commit_threshold = report['threshold']
-
-        print(f"\n# Quality Score: {self.filepath.name}")
-        print(f"  Type: {self.file_type}\n")
-
-        status_label = {
-            'EXCELLENCE': '[EXCELLENCE]',
-            'PR_READY': '[PASS]',
-            'COMMIT_READY': '[PASS]',
-            'BLOCKED': '[BLOCKED]',
-            'FAIL': '[FAIL]'
-        }
+        print_report(self._generate_report(), summary_only=summary_only,
+                     verbose=self.verbose)
+
+
+# ==============================================================================
+# REPORTING
+# ==============================================================================
+
+def print_report(report: Dict, summary_only: bool = False,
+                 verbose: bool = False) -> None:
+    """Print a formatted quality report from a report dict."""
+    commit_threshold = report['threshold']
+
+    print(f"\n# Quality Score: {Path(report['filepath']).name}")
+    print(f"  Type: {report['file_type']}\n")
+
+    status_label = {
+        'EXCELLENCE': '[EXCELLENCE]',
+        'PR_READY': '[PASS]',
+        'COMMIT_READY': '[PASS]',
+        'BLOCKED': '[BLOCKED]',
+        'FAIL': '[FAIL]'
+    }
+
+    print(f"## Score: {report['score']}/100 {status_label.get(report['status'], '')}")
+
+    if report['status'] == 'BLOCKED':
+        print(f"\n  BLOCKED - Below threshold ({commit_threshold})")
+    elif report['status'] == 'COMMIT_READY':
+        print(f"\n  Ready for commit (>= {commit_threshold})")
+    elif report['status'] == 'PR_READY':
+        print(f"\n  Ready for PR (>= {THRESHOLDS['pr']})")
+    elif report['status'] == 'EXCELLENCE':
+        print(f"\n  Excellence (>= {THRESHOLDS['excellence']})")
+    elif report['status'] == 'FAIL':
+        print(f"\n  Auto-fail (syntax/import/compilation error)")
+
+    if summary_only:
+        counts = report['issues']['counts']
+        print(f"\n  Issues: {counts['total']} "
+              f"({counts['critical']} critical, "
+              f"{counts['major']} major, "
+              f"{counts['minor']} minor)")
+        return
+
+    # Detailed issues
+    if report['issues']['counts']['critical'] > 0:
+        print(f"\n## Critical Issues ({report['issues']['counts']['critical']})")
+        for i, issue in enumerate(report['issues']['critical'], 1):
+            print(f"  {i}. {issue['description']} (-{issue['points']})")
+            print(f"     {issue['details']}")
+
+    if report['issues']['counts']['major'] > 0:
+        print(f"\n## Major Issues ({report['issues']['counts']['major']})")
+        for i, issue in enumerate(report['issues']['major'], 1):
+            print(f"  {i}. {issue['description']} (-{issue['points']})")
+            print(f"     {issue['details']}")
+
+    if report['issues']['counts']['minor'] > 0 and verbose:
+        print(f"\n## Minor Issues ({report['issues']['counts']['minor']})")
+        for i, issue in enumerate(report['issues']['minor'], 1):
+            print(f"  {i}. {issue['description']} (-{issue['points']})")
+
+    if report['status'] == 'BLOCKED':
+        print(f"\n## Actions")
+        print(f"  1. Fix critical issues above")
+        print(f"  2. Re-run (target: >= {commit_threshold})")
+
+
+# Files listed under "Slowest files" by --profile
+PROFILE_SLOWEST = 10
+
+
+def profile_summary(reports: List[Dict]) -> Dict:
+    """Aggregate the 'timings' of profiled reports: per-step totals, ranked
+    by time, and the slowest files."""
+    steps = {}
+    for report in reports:
+        for name, timing in report['timings']['steps'].items():
+            entry = steps.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            entry['calls'] += timing['calls']
+            entry['seconds'] += timing['seconds']
+    ranked = sorted(steps.items(), key=lambda item: item[1]['seconds'], reverse=True)
+    slowest = sorted(reports, key=lambda r: r['timings']['total'], reverse=True)
+    return {
+        'files': len(reports),
+        'total': sum(r['timings']['total'] for r in reports),
+        'steps': dict(ranked),
+        'slowest': [{'filepath': r['filepath'], 'seconds': r['timings']['total']}
+                    for r in slowest[:PROFILE_SLOWEST]],
+    }
+
+
+def print_profile(summary: Dict, wall: float) -> None:
+    """Print the ranked per-step and per-file timing tables."""
+    total = summary['total'] or 1e-9
+    print(f"\n# Profile: {summary['files']} files, {summary['total']:.3f}s scoring "
+          f"({wall:.3f}s wall)")
+    print("\n## Steps (nested steps are counted in full)")
+    print(f"  {'step':<46}{'calls':>7}{'seconds':>10}{'share':>8}")
+    for name, timing in summary['steps'].items():
+        print(f"  {name:<46}{timing['calls']:>7}{timing['seconds']:>10.4f}"
+              f"{timing['seconds'] / total:>8.1%}")
+    print("\n## Slowest files")
+    for entry in summary['slowest']:
+        print(f"  {entry['seconds']:>10.4f}s  {entry['filepath']}")
+
 
-        print(f"## Score: {report['score']}/100 {status_label.get(report['status'], '')}")
-
-        if report['status'] == 'BLOCKED':
-            print(f"\n  BLOCKED - Below threshold ({commit_threshold})")
-        elif report['status'] == 'COMMIT_READY':
-            print(f"\n  Ready for commit (>= {commit_threshold})")
-        elif report['status'] == 'PR_READY':
-            print(f"\n  Ready for PR (>= {THRESHOLDS['pr']})")
-        elif report['status'] == 'EXCELLENCE':
-            print(f"\n  Excellence (>= {THRESHOLDS['excellence']})")
-        elif report['status'] == 'FAIL':
-            print(f"\n  Auto-fail (syntax/compilation error)")
-
-        if summary_only:
-            counts = report['issues']['counts']
-            print(f"\n  Issues: {counts['total']} "
-                  f"({counts['critical']} critical, "
-                  f"{counts['major']} major, "
-                  f"{counts['minor']} minor)")
+# ==============================================================================
+# RESULT CACHE
+# ==============================================================================
+
+CACHE_PATH = Path(os.environ.get(
+    'QUALITY_SCORE_CACHE',
+    Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'))
+    / 'quality_score' / 'results.sqlite3',
+))
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+BIB_INDEXES_KEPT = 8
+
+# Files modified this recently are re-hashed even if their stat matches, since
+# a second write within the same mtime tick would otherwise go unnoticed.
+_RACY_WINDOW_NS = 2 * 10**9
+
+
+def rubric_fingerprint() -> str:
+    """Hash of everything besides file content that determines a report."""
+    payload = json.dumps({
+        'version': SCORER_VERSION,
+        'rubrics': [PYTHON_MODULE_RUBRIC, PYTHON_SCRIPT_RUBRIC,
+                    LATEX_RUBRIC, EXPLORATION_RUBRIC],
+        'thresholds': THRESHOLDS,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Persistent report cache keyed by file content hash.
+
+    Two tables: `files` maps (path, mtime, size) to a content digest so that
+    unchanged files are not re-read, and `reports` maps a key built from the
+    digest, the path and the rubric fingerprint to a stored report. Reports
+    are evicted least-recently-used once their total size exceeds max_bytes.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fingerprint = rubric_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), timeout=30)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, digest TEXT);
+            CREATE TABLE IF NOT EXISTS reports (
+                key TEXT PRIMARY KEY, report TEXT, size INTEGER, last_used REAL);
+            CREATE INDEX IF NOT EXISTS reports_lru ON reports (last_used);
+            CREATE TABLE IF NOT EXISTS bib_indexes (
+                digest TEXT PRIMARY KEY, keys TEXT, last_used REAL);
+        """)
+
+    def file_digest(self, filepath: Path) -> str:
+        """Content digest of a file, skipping the read if its stat is unchanged."""
+        st = filepath.stat()
+        abspath = str(filepath.resolve())
+        row = self._db.execute(
+            'SELECT digest FROM files WHERE path = ? AND mtime_ns = ? AND size = ?',
+            (abspath, st.st_mtime_ns, st.st_size),
+        ).fetchone()
+        if row:
+            return row[0]
+
+        digest = hashlib.sha256(filepath.read_bytes()).hexdigest()
+        if time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS:
+            self._db.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                (abspath, st.st_mtime_ns, st.st_size, digest),
+            )
+        return digest
+
+    def key_for(self, filepath: Path,
+                latex_syntax: Optional[List[Dict]] = None) -> str:
+        """Cache key for a file's report."""
+        parts = [self.fingerprint, str(filepath), self.file_digest(filepath)]
+        if latex_syntax is not None:
+            parts.append(json.dumps(latex_syntax, sort_keys=True))
+        file_type = classify_file(filepath)
+        if file_type in IMPORT_CHECKED_TYPES:
+            # Import results depend on what is installed and on project modules
+            parts.append(IMPORT_RESOLVER.environment_digest(import_roots(filepath)))
+        if file_type == 'latex':
+            # check_broken_citations reads the bibliography too
+            bib_file = find_bib_file(filepath)
+            parts.append(self.file_digest(bib_file) if bib_file.exists() else '')
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def load_bib_index(self, bib_file: Path) -> BibIndex:
+        """bib_index() backed by a store keyed by the .bib content digest, so
+        an unchanged bibliography is parsed once across runs. The result is
+        also memoized in-process (and inherited by forked workers)."""
+        path = bib_file.resolve()
+        stamp, settled = _bib_stamp(path)
+        entry = _BIB_INDEXES.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        digest = self.file_digest(path)
+        row = self._db.execute(
+            'SELECT keys FROM bib_indexes WHERE digest = ?', (digest,)).fetchone()
+        if row is not None:
+            index = BibIndex.from_json(row[0])
+        else:
+            index = BibIndex.parse(path.read_text(encoding='utf-8'))
+        self._db.execute('INSERT OR REPLACE INTO bib_indexes VALUES (?, ?, ?)',
+                         (digest, row[0] if row else index.to_json(), time.time()))
+        if settled:
+            _BIB_INDEXES[path] = (stamp, index)
+        return index
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the stored report for key, or None."""
+        row = self._db.execute(
+            'SELECT report FROM reports WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute('UPDATE reports SET last_used = ? WHERE key = ?',
+                         (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, report: Dict) -> None:
+        """Store a report; eviction runs once, on close()."""
+        blob = json.dumps(report)
+        self._db.execute('INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?)',
+                         (key, blob, len(blob), time.time()))
+
+    def _evict(self) -> None:
+        # Keep the few most recently used bibliographies
+        self._db.execute(
+            'DELETE FROM bib_indexes WHERE digest NOT IN (SELECT digest FROM '
+            'bib_indexes ORDER BY last_used DESC LIMIT ?)', (BIB_INDEXES_KEPT,))
+
+        total = self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM reports').fetchone()[0]
+        if total <= self.max_bytes:
             return
+        stale = []
+        for key, size in self._db.execute(
+                'SELECT key, size FROM reports ORDER BY last_used'):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._db.executemany('DELETE FROM reports WHERE key = ?', stale)
+
+    def flush(self) -> None:
+        """Evict if over budget and commit, keeping the database open."""
+        self._evict()
+        self._db.commit()
+
+    def close(self) -> None:
+        """Flush, then close the database."""
+        self.flush()
+        self._db.close()
+
+
+def open_cache() -> Optional[ResultCache]:
+    """Open the default result cache, or return None if it is unusable."""
+    try:
+        return ResultCache()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: result cache disabled ({e})", file=sys.stderr)
+        return None
 
-        # Detailed issues
-        if report['issues']['counts']['critical'] > 0:
-            print(f"\n## Critical Issues ({report['issues']['counts']['critical']})")
-            for i, issue in enumerate(report['issues']['critical'], 1):
-                print(f"  {i}. {issue['description']} (-{issue['points']})")
-                print(f"     {issue['details']}")
 
-        if report['issues']['counts']['major'] > 0:
-            print(f"\n## Major Issues ({report['issues']['counts']['major']})")
-            for i, issue in enumerate(report['issues']['major'], 1):
-                print(f"  {i}. {issue['description']} (-{issue['points']})")
-                print(f"     {issue['details']}")
+# ==============================================================================
+# GIT SELECTION
+# ==============================================================================
+
+def _git(*args: str) -> List[str]:
+    """Run a git command, returning its output lines (raises on failure)."""
+    result = subprocess.run(['git', *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"git {' '.join(args)} failed")
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def changed_files(since: Optional[str] = None, staged: bool = False) -> List[Path]:
+    """Scorable files changed since a ref (working tree included) or staged.
+
+    Deleted files are skipped; with a ref, untracked files that are not
+    ignored count as changed too (git diff does not list them). A changed .bib
+    file pulls in every tracked .tex file that resolves to it (via
+    find_bib_file) and cites anything, since its undefined-citation result may
+    have changed. Paths are returned relative to the current directory, in
+    git's order, untracked ones last.
+    """
+    top = Path(_git('rev-parse', '--show-toplevel')[0])
+    diff = ['diff', '--name-only', '--diff-filter=d']
+    names = _git(*diff, '--cached' if staged else since, '--')
+    if not staged:
+        names += _git('ls-files', '--others', '--exclude-standard', '--full-name',
+                      '--', ':/')
+
+    def local(name: str) -> Path:
+        return Path(os.path.relpath(top / name))
+
+    selected = []
+    changed_bibs = set()
+    for name in names:
+        path = local(name)
+        if path.suffix == '.bib':
+            changed_bibs.add(path.resolve())
+        elif classify_file(path) != 'unknown' and path.exists():
+            selected.append(path)
+
+    if changed_bibs:
+        for name in _git('ls-files', '--full-name', '--', str(top / '*.tex')):
+            path = local(name)
+            if (path not in selected and path.exists()
+                    and find_bib_file(path).resolve() in changed_bibs
+                    and CITE_RE.search(path.read_text(encoding='utf-8'))):
+                selected.append(path)
+    return selected
+
+
+# ==============================================================================
+# BATCH SCORING
+# ==============================================================================
+
+def _score_one(filepath: Path,
+               latex_syntax: Optional[List[Dict]] = None) -> Tuple[Dict, str, str]:
+    """Score one file, returning (report, error, traceback).
+
+    Exceptions are caught here rather than propagated so that one broken file
+    does not abort a pooled batch.
+    """
+    try:
+        start = time.perf_counter()
+        PROFILER.take()
+        scorer = QualityScorer(filepath, latex_syntax=latex_syntax)
+        report = scorer.score_file()
+        if PROFILER.enabled:
+            report['timings'] = {
+                'total': time.perf_counter() - start,
+                'steps': {name: {'calls': calls, 'seconds': seconds}
+                          for name, (calls, seconds) in PROFILER.take().items()},
+            }
+        return report, None, None
+    except Exception as e:
+        return None, str(e), traceback.format_exc()
+
+
+def _run_batch(filepaths: List[Path], jobs: int, latex_syntax: List):
+    """Score files serially or on a process pool, yielding in input order."""
+    if jobs <= 1 or len(filepaths) <= 1:
+        for filepath, syntax in zip(filepaths, latex_syntax):
+            yield _score_one(filepath, syntax)
+        return
+
+    workers = min(jobs, len(filepaths))
+    chunksize = max(1, len(filepaths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(PROFILER.enabled,)) as pool:
+        yield from pool.map(_score_one, filepaths, latex_syntax, chunksize=chunksize)
+
+
+def _score_chunk(filepaths: List[Path]) -> List[Tuple[Dict, str, str]]:
+    return [_score_one(filepath) for filepath in filepaths]
+
+
+def _run_batch_as_completed(filepaths: List[Path], jobs: int):
+    """Score files, yielding (index, outcome) as each chunk finishes."""
+    if jobs <= 1 or len(filepaths) <= 1:
+        for i, filepath in enumerate(filepaths):
+            yield i, _score_one(filepath)
+        return
+
+    workers = min(jobs, len(filepaths))
+    chunksize = max(1, len(filepaths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(PROFILER.enabled,)) as pool:
+        futures = {pool.submit(_score_chunk, filepaths[start:start + chunksize]): start
+                   for start in range(0, len(filepaths), chunksize)}
+        for future in as_completed(futures):
+            for offset, outcome in enumerate(future.result()):
+                yield futures[future] + offset, outcome
+
+
+def _lookup_cached(filepaths: List[Path], cache: Optional[ResultCache],
+                   latex_syntax: List) -> Tuple[List, List]:
+    """Cache keys and cached reports (None on a miss) for each file."""
+    keys = [None] * len(filepaths)
+    cached = [None] * len(filepaths)
+    if cache is not None:
+        for i, filepath in enumerate(filepaths):
+            try:
+                keys[i] = cache.key_for(filepath, latex_syntax[i])
+            except OSError:
+                cache.misses += 1
+                continue
+            cached[i] = cache.get(keys[i])
+    return keys, cached
 
-        if report['issues']['counts']['minor'] > 0 and self.verbose:
-            print(f"\n## Minor Issues ({report['issues']['counts']['minor']})")
-            for i, issue in enumerate(report['issues']['minor'], 1):
-                print(f"  {i}. {issue['description']} (-{issue['points']})")
 
-        if report['status'] == 'BLOCKED':
-            print(f"\n## Actions")
-            print(f"  1. Fix critical issues above")
-            print(f"  2. Re-run (target: >= {commit_threshold})")
+def _load_bib_indexes(pending: List[Path], cache: Optional[ResultCache]) -> None:
+    """Load each bibliography a batch needs before workers fork."""
+    if cache is None:
+        return
+    bibs = {find_bib_file(fp) for fp in pending if classify_file(fp) == 'latex'}
+    for bib_file in bibs:
+        try:
+            cache.load_bib_index(bib_file)
+        except (OSError, UnicodeDecodeError):
+            pass  # scoring reports the problem, or rereads the file
+
+
+def score_files(filepaths: List[Path], jobs: int = 1,
+                cache: Optional[ResultCache] = None,
+                latex_syntax: Optional[List] = None):
+    """Yield (report, error, traceback) for each file, in input order.
+
+    Files with a cached report are not rescored. The rest are scored on a
+    process pool when jobs > 1; results are still yielded in the order of
+    `filepaths`, so output is identical to a serial, uncached run.
+    latex_syntax, if given, holds manuscript-level syntax issues (or None)
+    for each file; see QualityScorer.
+    """
+    filepaths = list(filepaths)
+    if latex_syntax is None:
+        latex_syntax = [None] * len(filepaths)
+    keys, cached = _lookup_cached(filepaths, cache, latex_syntax)
+
+    pending = [fp for fp, report in zip(filepaths, cached) if report is None]
+    pending_syntax = [syntax for syntax, report in zip(latex_syntax, cached)
+                      if report is None]
+    _load_bib_indexes(pending, cache)
+    fresh = _run_batch(pending, jobs, pending_syntax)
+
+    for key, report in zip(keys, cached):
+        if report is not None:
+            yield report, None, None
+            continue
+        outcome = next(fresh)
+        if cache is not None and key is not None and outcome[0] is not None:
+            cache.put(key, outcome[0])
+        yield outcome
+
+
+def score_files_as_completed(filepaths: List[Path], jobs: int = 1,
+                             cache: Optional[ResultCache] = None):
+    """Like score_files(), but yield (index, outcome) as soon as each file is
+    done: cached reports first, then fresh ones in completion order."""
+    filepaths = list(filepaths)
+    keys, cached = _lookup_cached(filepaths, cache, [None] * len(filepaths))
+    for i, report in enumerate(cached):
+        if report is not None:
+            yield i, (report, None, None)
+
+    pending = [i for i, report in enumerate(cached) if report is None]
+    _load_bib_indexes([filepaths[i] for i in pending], cache)
+    for j, outcome in _run_batch_as_completed([filepaths[i] for i in pending], jobs):
+        i = pending[j]
+        if cache is not None and keys[i] is not None and outcome[0] is not None:
+            cache.put(keys[i], outcome[0])
+        yield i, outcome
+
+
+# ==============================================================================
+# MANUSCRIPT
+# ==============================================================================
+
+INCLUDE_RE = re.compile(r'\\(subfile|input|include)\s*\{([^}]+)\}')
+# A '%' that starts a comment (not an escaped \%)
+TEX_COMMENT_RE = re.compile(r'(?<!\\)%.*')
+BEGIN_DOCUMENT_RE = re.compile(r'\\begin\s*\{document\}')
+END_DOCUMENT_RE = re.compile(r'\\end\s*\{document\}')
+
+
+class Manuscript:
+    """The \\subfile/\\input/\\include graph rooted at a main .tex file.
+
+    Files are identified by their path relative to the main file's
+    directory and read once, however often they are included. flatten()
+    yields the document as LaTeX sees it, a \\subfile contributing only its
+    document body, so environments can be matched across files. Included
+    paths are tried relative to the including file, then to the main file's
+    directory.
+    """
+
+    def __init__(self, main: Path):
+        self.main = main
+        self.root = main.parent
+        self.paths: Dict[str, Path] = {}     # label -> path, in document order
+        self._lines: Dict[str, List[str]] = {}
+        # label -> {line index: [(start col, end col, command, target label)]}
+        self._includes: Dict[str, Dict[int, List[Tuple]]] = {}
+        self._missing: List[Dict] = []
+        self._load(main)
+
+    def label(self, path: Path) -> str:
+        return os.path.normpath(os.path.relpath(path, self.root))
+
+    def _resolve(self, name: str, including: Path) -> Optional[Path]:
+        for base in (including.parent, self.root):
+            candidate = Path(os.path.normpath(base / name))
+            if candidate.suffix != '.tex' and not candidate.is_file():
+                candidate = candidate.with_name(candidate.name + '.tex')
+            if candidate.is_file():
+                return candidate
+        return None
+
+    def _load(self, path: Path) -> None:
+        """Read path, then (depth-first, in order) everything it includes."""
+        label = self.label(path)
+        self.paths[label] = path
+        lines = path.read_text(encoding='utf-8').split('\n')
+        self._lines[label] = lines
+        includes = self._includes[label] = {}
+        for i, line in enumerate(lines):
+            for match in INCLUDE_RE.finditer(TEX_COMMENT_RE.sub('', line)):
+                name = match.group(2).strip()
+                target = self._resolve(name, path)
+                target_label = None if target is None else self.label(target)
+                includes.setdefault(i, []).append(
+                    (match.start(), match.end(), match.group(1), target_label))
+                if target is None:
+                    self._missing.append({
+                        'source': label, 'line': i + 1,
+                        'description': f'Included file not found: {name}',
+                    })
+                elif target_label not in self.paths:
+                    self._load(target)
+
+    def flatten(self, problems: Optional[List[Dict]] = None):
+        """Yield (file label, line number, text) for the expanded document.
+
+        Circular includes are skipped and reported to `problems`.
+        """
+        yield from self._expand(self.label(self.main), False, (), problems)
+
+    def _expand(self, label: str, body_only: bool, stack: Tuple, problems):
+        lines = self._lines[label]
+        start, end = 0, len(lines)
+        if body_only:
+            # A \subfile is read from after its \begin{document} up to its
+            # \end{document}; without them the whole file is used
+            code = [TEX_COMMENT_RE.sub('', line) for line in lines]
+            begin = next((i for i, line in enumerate(code)
+                          if BEGIN_DOCUMENT_RE.search(line)), None)
+            if begin is not None:
+                start = begin + 1
+                end = next((i for i in range(start, len(code))
+                            if END_DOCUMENT_RE.search(code[i])), len(code))
+
+        stack = stack + (label,)
+        includes = self._includes[label]
+        for i in range(start, end):
+            line = lines[i]
+            if i not in includes:
+                yield label, i + 1, line
+                continue
+            pos = 0
+            for begin_col, end_col, command, target in includes[i]:
+                yield label, i + 1, line[pos:begin_col]
+                pos = end_col
+                if target is None:
+                    continue
+                if target in stack:
+                    if problems is not None:
+                        problems.append({
+                            'source': label, 'line': i + 1,
+                            'description': f'Circular include: {target}',
+                        })
+                    continue
+                yield from self._expand(target, command == 'subfile', stack, problems)
+            yield label, i + 1, line[pos:]
+
+    def syntax_issues(self) -> Dict[str, List[Dict]]:
+        """Environment and include problems over the whole document, by the
+        file they occur in (every file has an entry, possibly empty)."""
+        problems = list(self._missing)
+        found = IssueDetector.check_latex_environments(self.flatten(problems))
+        by_label = {label: [] for label in self.paths}
+        for issue in problems + found:
+            entry = {'line': issue['line'], 'description': issue['description']}
+            # A file included twice can report the same issue twice
+            if entry not in by_label[issue['source']]:
+                by_label[issue['source']].append(entry)
+        for issues in by_label.values():
+            issues.sort(key=lambda e: e['line'])
+        return by_label
+
+
+def aggregate_manuscript(main: Path, sections: List[Tuple[str, Dict]]) -> Dict:
+    """One report for the whole paper from its (label, report) sections.
+
+    Every file's issues, prefixed with the file's label, are deducted from a
+    single 100 as if the document were one file; any auto-fail fails the
+    paper. The per-file reports are kept under 'sections'.
+    """
+    scorer = QualityScorer(main)
+    for label, report in sections:
+        for severity in ('critical', 'major', 'minor'):
+            for issue in report['issues'][severity]:
+                scorer._add_issue(severity, issue['type'],
+                                  f"{label}: {issue['description']}",
+                                  issue['details'], issue['points'])
+                scorer.score -= issue['points']
+        scorer.auto_fail = scorer.auto_fail or report['auto_fail']
+    scorer.score = 0 if scorer.auto_fail else max(0, scorer.score)
+    scorer.file_type = 'manuscript'
+    report = scorer._generate_report()
+    report['sections'] = [report for _, report in sections]
+    return report
+
+
+def score_manuscript(main: Path, jobs: int = 1,
+                     cache: Optional[ResultCache] = None):
+    """Score every file of a manuscript once, in parallel.
+
+    Yields (label, report, error, traceback) per file, in document order.
+    Each file's LaTeX syntax check is replaced by the manuscript-wide one,
+    so an environment opened in main.tex and closed in a subfile is not an
+    error.
+    """
+    manuscript = Manuscript(main)
+    syntax = manuscript.syntax_issues()
+    labels = list(manuscript.paths)
+    outcomes = score_files([manuscript.paths[label] for label in labels],
+                           jobs=jobs, cache=cache,
+                           latex_syntax=[syntax[label] for label in labels])
+    for label, outcome in zip(labels, outcomes):
+        yield (label,) + tuple(outcome)
+
+
+def print_sections(report: Dict) -> None:
+    """Print the per-file score table of an aggregated manuscript report."""
+    root = Path(report['filepath']).parent
+    print(f"\n## Sections ({len(report['sections'])})")
+    for section in report['sections']:
+        label = os.path.relpath(section['filepath'], root)
+        print(f"  {section['score']:>3}/100  {section['status']:<12} {label}")
+
+
+# ==============================================================================
+# WATCH DAEMON
+# ==============================================================================
+
+SOCKET_PATH = Path(os.environ.get(
+    'QUALITY_SCORE_SOCKET',
+    Path(os.environ.get('XDG_RUNTIME_DIR', '/tmp'))
+    / f'quality_score-{os.getuid()}.sock',
+))
+WATCH_DIRS = ('code', 'paper')
+POLL_INTERVAL = 1.0
+
+# Files whose changes can alter a report
+WATCHED_SUFFIXES = ('.py', '.tex', '.bib')
+
+# inotify(7) event bits
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_INOTIFY_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                 | IN_CREATE | IN_DELETE)
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Recursive inotify watch over a set of directories (Linux only).
+
+    read() drains pending events and returns (changed, structural): the
+    watched files that changed, and whether any file or directory was
+    created, deleted or renamed (which can change what is importable).
+    """
+
+    def __init__(self, roots: List[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs = {}  # watch descriptor -> directory
+        for root in roots:
+            self._watch_tree(root)
+
+    def _watch_tree(self, root: Path) -> None:
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')
+                           and d != '__pycache__']
+            wd = self._add_watch(self._fd, os.fsencode(dirpath), _INOTIFY_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'cannot watch {dirpath}')
+            self._dirs[wd] = Path(dirpath)
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def read(self) -> Tuple[set, bool]:
+        changed, structural = set(), False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed, structural
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost: treat everything as changed
+                    return None, True
+                if wd not in self._dirs:
+                    continue
+                path = self._dirs[wd] / os.fsdecode(name)
+                if mask & (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO):
+                    structural = True
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and path.is_dir():
+                        self._watch_tree(path)
+                elif path.suffix in WATCHED_SUFFIXES:
+                    changed.add(path)
+
+
+class PollingWatcher:
+    """Fallback for InotifyWatcher: compares stat snapshots on each read()."""
+
+    def __init__(self, roots: List[Path]):
+        self._roots = roots
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for root in self._roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not d.startswith('.')
+                               and d != '__pycache__']
+                snapshot[Path(dirpath)] = None
+                for name in filenames:
+                    path = Path(dirpath) / name
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def fileno(self) -> Optional[int]:
+        return None
+
+    def read(self) -> Tuple[set, bool]:
+        old, new = self._snapshot, self._scan()
+        self._snapshot = new
+        structural = old.keys() != new.keys()
+        changed = {path for path in old.keys() ^ new.keys()
+                   if path.suffix in WATCHED_SUFFIXES}
+        changed.update(path for path, stamp in new.items()
+                       if stamp is not None and old.get(path, stamp) != stamp
+                       and path.suffix in WATCHED_SUFFIXES)
+        return changed, structural
+
+
+def make_watcher(roots: List[Path]):
+    """An InotifyWatcher where inotify is available, else a PollingWatcher."""
+    try:
+        return InotifyWatcher(roots)
+    except (OSError, AttributeError, TypeError) as e:
+        print(f"Warning: inotify unavailable ({e}); polling every "
+              f"{POLL_INTERVAL:g}s", file=sys.stderr)
+        return PollingWatcher(roots)
+
+
+def _stat_stamp(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class ScoringDaemon:
+    """Resident scorer behind a Unix socket.
+
+    Keeps reports for files under the watched directories in memory and
+    rescores them as the watcher reports changes: an edited file is
+    rescored, a .bib change rescores the LaTeX files, and a created or
+    removed module rescores everything whose imports are checked. Module
+    state (compiled patterns, import resolution, bibliography keys, the
+    result-cache connection) stays warm between requests.
+
+    Each request is a JSON object {"cwd": ..., "argv": [...]} holding the
+    client's working directory and CLI arguments; the reply is
+    {"stdout": ..., "stderr": ..., "exit_code": ...}, exactly what the
+    one-shot CLI would have produced.
+    """
+
+    def __init__(self, roots: List[Path], socket_path: Path = SOCKET_PATH,
+                 use_cache: bool = True):
+        self.roots = [root.resolve() for root in roots]
+        self.socket_path = socket_path
+        self.cache = open_cache() if use_cache else None
+        self.watcher = make_watcher(self.roots)
+        # (cwd, filepath as given) -> (stat stamp, report)
+        self.reports: Dict[Tuple[str, str], Tuple[Tuple, Dict]] = {}
+        self._syspath_stamp = self._syspath_stamps()
+
+    @staticmethod
+    def _syspath_stamps() -> Tuple:
+        """Directory mtimes along sys.path; they move when packages are
+        installed or removed."""
+        return tuple(_stat_stamp(Path(entry or '.')) for entry in sys.path)
+
+    def _watched(self, path: Path) -> bool:
+        return any(root == path or root in path.parents for root in self.roots)
+
+    def _drop(self, keep) -> List[Tuple[str, str]]:
+        """Forget reports for which keep(abspath, report) is false."""
+        dropped = []
+        for key, (_, report) in list(self.reports.items()):
+            if not keep(Path(key[0], key[1]).resolve(), report):
+                del self.reports[key]
+                dropped.append(key)
+        return dropped
+
+    def _refresh(self) -> None:
+        """Apply pending watcher events, then rescore what they affected."""
+        changed, structural = self.watcher.read()
+        syspath_stamp = self._syspath_stamps()
+        if syspath_stamp != self._syspath_stamp:
+            self._syspath_stamp = syspath_stamp
+            structural = True
+        if changed is None:
+            # The watcher lost events; start over
+            IMPORT_RESOLVER.invalidate()
+            _BIB_INDEXES.clear()
+            stale = self._drop(lambda path, report: False)
+        else:
+            if not changed and not structural:
+                return
+            if structural:
+                IMPORT_RESOLVER.invalidate()
+            bibs = {path for path in changed if path.suffix == '.bib'}
+            for bib in bibs:
+                _BIB_INDEXES.pop(bib, None)
+
+            def keep(path, report):
+                if path in changed:
+                    return False
+                if bibs and report['file_type'] == 'latex':
+                    return False
+                if structural and report['file_type'] in IMPORT_CHECKED_TYPES:
+                    return False
+                return True
+            stale = self._drop(keep)
+
+        by_cwd = {}
+        for cwd, given in stale:
+            by_cwd.setdefault(cwd, []).append(Path(given))
+        here = os.getcwd()
+        try:
+            for cwd, filepaths in by_cwd.items():
+                os.chdir(cwd)
+                filepaths = [fp for fp in filepaths if fp.exists()]
+                for _ in self.score_files(filepaths, jobs=1):
+                    pass
+            if self.cache is not None:
+                self.cache.flush()
+        except OSError:
+            pass  # the client's directory is gone; drop its reports
+        finally:
+            os.chdir(here)
+
+    def score_files(self, filepaths: List[Path], jobs: int = 1,
+                    no_cache: bool = False):
+        """score_files() with an in-memory layer in front of the result cache.
+
+        Relative paths are resolved against the current directory, which
+        the caller sets to the client's. With no_cache or --profile, neither
+        layer is read or written, as in the one-shot CLI: a profiled report
+        carries timings, which a later plain request must not be served.
+        """
+        reuse = not (no_cache or PROFILER.enabled)
+        cache = self.cache if reuse else None
+        cwd = os.getcwd()
+        keys = [(cwd, str(fp)) for fp in filepaths]
+        stamps = [_stat_stamp(fp) for fp in filepaths]
+        memo = [None] * len(filepaths)
+        if reuse:
+            for i, key in enumerate(keys):
+                entry = self.reports.get(key)
+                if entry is not None and entry[0] == stamps[i]:
+                    memo[i] = entry[1]
+                    if cache is not None:
+                        cache.hits += 1
+
+        pending = [fp for fp, report in zip(filepaths, memo) if report is None]
+        fresh = score_files(pending, jobs=jobs, cache=cache)
+        for fp, key, stamp, report in zip(filepaths, keys, stamps, memo):
+            if report is not None:
+                yield report, None, None
+                continue
+            outcome = next(fresh)
+            if (reuse and outcome[0] is not None and stamp is not None
+                    and self._watched(fp.resolve())):
+                self.reports[key] = (stamp, outcome[0])
+            yield outcome
+
+    def handle(self, request: Dict) -> Dict:
+        """Run one CLI invocation in the client's directory."""
+        self._refresh()
+        stdout, stderr = io.StringIO(), io.StringIO()
+        cwd = os.getcwd()
+        try:
+            os.chdir(request['cwd'])
+            with contextlib.redirect_stdout(stdout), \
+                    contextlib.redirect_stderr(stderr):
+                try:
+                    exit_code = run(parse_args(request['argv']), daemon=self)
+                except SystemExit as e:
+                    exit_code = e.code if isinstance(e.code, int) else 1
+        except Exception:
+            stderr.write(traceback.format_exc())
+            exit_code = 1
+        finally:
+            os.chdir(cwd)
+            PROFILER.enabled = False  # so the next _refresh() is not profiled
+        return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue(),
+                'exit_code': exit_code}
+
+    def _listen(self) -> socket.socket:
+        if self.socket_path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()  # left behind by a dead daemon
+            else:
+                probe.close()
+                raise RuntimeError(f'a daemon is already serving {self.socket_path}')
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            server.bind(str(self.socket_path))
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        return server
+
+    def serve_forever(self) -> None:
+        """Accept requests until interrupted."""
+        server = self._listen()
+        selector = selectors.DefaultSelector()
+        selector.register(server, selectors.EVENT_READ)
+        if self.watcher.fileno() is not None:
+            selector.register(self.watcher, selectors.EVENT_READ)
+        timeout = None if self.watcher.fileno() is not None else POLL_INTERVAL
+        print(f"# Watching {', '.join(map(str, self.roots))} "
+              f"on {self.socket_path}", file=sys.stderr)
+        try:
+            while True:
+                ready = selector.select(timeout)
+                if any(key.fileobj is server for key, _ in ready):
+                    conn, _ = server.accept()
+                    with conn:
+                        self._serve(conn)  # refreshes first
+                else:
+                    self._refresh()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            selector.close()
+            server.close()
+            self.socket_path.unlink(missing_ok=True)
+            if self.cache is not None:
+                self.cache.close()
+
+    def _serve(self, conn: socket.socket) -> None:
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        try:
+            request = json.loads(b''.join(chunks))
+        except ValueError as e:
+            reply = {'stdout': '', 'stderr': f'Error: bad request ({e})\n',
+                     'exit_code': 1}
+        else:
+            reply = self.handle(request)
+        try:
+            conn.sendall(json.dumps(reply).encode('utf-8'))
+        except OSError:
+            pass  # client went away
 
 
 # ==============================================================================
 # CLI
 # ==============================================================================
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description='Calculate quality scores based on standalone-quality.md rubrics',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -678,6 +2222,36 @@ Examples:
   # JSON output
   python docs/quality_reports/quality_score.py code/src/mypackage/core/*.py --json
 
+  # Streaming output: one report per line as files finish, then a summary
+  # record ({"summary": {..., "exit_code": N}})
+  python docs/quality_reports/quality_score.py code/scripts/**/*.py --ndjson
+
+  # Score serially (default: one worker per core)
+  python docs/quality_reports/quality_score.py code/scripts/**/*.py --jobs 1
+
+  # Rescore everything, ignoring cached reports
+  python docs/quality_reports/quality_score.py paper/main.tex --no-cache
+
+  # Score only what a branch changed (a .bib change pulls in citing .tex files)
+  python docs/quality_reports/quality_score.py --changed-since main --summary
+
+  # Pre-commit: score the staged files
+  python docs/quality_reports/quality_score.py --staged
+
+  # Where does the time go? Ranked per-check and per-file timings
+  python docs/quality_reports/quality_score.py code/src/mypackage/core/*.py --profile
+
+  # Whole paper: main.tex plus every \\subfile/\\input/\\include, one gate
+  python docs/quality_reports/quality_score.py --manuscript paper/main.tex
+
+  # Stay resident, then score through the thin client (same arguments/output)
+  python docs/quality_reports/quality_score.py --watch &
+  python docs/quality_reports/quality_client.py code/scripts/core/01_clean.py
+
+Cached reports live in $QUALITY_SCORE_CACHE
+(default: ~/.cache/quality_score/results.sqlite3). The --watch daemon listens
+on $QUALITY_SCORE_SOCKET (default: $XDG_RUNTIME_DIR/quality_score-<uid>.sock).
+
 Quality Thresholds:
   60/100 = Exploration (good enough to keep exploring)
   80/100 = Commit (production code)
@@ -687,20 +2261,245 @@ Quality Thresholds:
 Exit Codes:
   0 = Score >= threshold (commit allowed)
   1 = Score < threshold (commit blocked)
-  2 = Auto-fail (syntax error)
+  2 = Auto-fail (syntax, import or compilation error)
         """
     )
 
-    parser.add_argument('filepaths', type=Path, nargs='+', help='File(s) to score')
+    parser.add_argument('filepaths', type=Path, nargs='*', help='File(s) to score')
     parser.add_argument('--summary', action='store_true', help='Summary only')
     parser.add_argument('--verbose', action='store_true', help='Include minor issues')
-    parser.add_argument('--json', action='store_true', help='JSON output')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--json', action='store_true', help='JSON output')
+    output.add_argument('--ndjson', action='store_true',
+                        help='Stream one compact JSON report per line as each '
+                             'file finishes, then a summary record')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for multi-file runs '
+                             '(default: number of cores)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Rescore every file, bypassing the result cache')
+    changes = parser.add_mutually_exclusive_group()
+    changes.add_argument('--changed-since', metavar='REF',
+                         help='Also score .py/.tex files changed since REF '
+                              '(committed or not, untracked included)')
+    changes.add_argument('--staged', action='store_true',
+                         help='Also score .py/.tex files staged for commit')
+
+    parser.add_argument('--profile', action='store_true',
+                        help='Time every check and file and print a ranked table '
+                             '(a "timings" block per report with --json); '
+                             'implies --no-cache')
+    parser.add_argument('--manuscript', type=Path, metavar='MAIN',
+                        help='Score MAIN and every file it pulls in through '
+                             '\\subfile/\\input/\\include, once each, with one '
+                             'aggregated score plus a score per file')
+    parser.add_argument('--watch', nargs='*', type=Path, metavar='DIR',
+                        help='Run as a daemon that watches DIRs (default: '
+                             'code paper) and serves quality_client.py '
+                             'over a Unix socket')
+
+    args = parser.parse_args(argv)
+    if args.profile:
+        args.no_cache = True  # a cached report has nothing to time
+    if args.manuscript is not None and (args.filepaths or args.changed_since
+                                        or args.staged):
+        parser.error('--manuscript cannot be combined with other file selections')
+    if (args.watch is None and args.manuscript is None and not args.filepaths
+            and not (args.changed_since or args.staged)):
+        parser.error('give file(s) to score, --changed-since REF, --staged '
+                     'or --manuscript MAIN')
+    return args
+
+
+def _run_cache(args: argparse.Namespace,
+               daemon: Optional[ScoringDaemon]) -> Optional[ResultCache]:
+    """The result cache for one CLI run: a fresh one, or the daemon's."""
+    if args.no_cache:
+        return None
+    if daemon is None:
+        return open_cache()
+    if daemon.cache is not None:
+        daemon.cache.hits = daemon.cache.misses = 0
+    return daemon.cache
+
+
+def _finish_cache(args: argparse.Namespace, cache: Optional[ResultCache],
+                  daemon: Optional[ScoringDaemon]) -> None:
+    if cache is None:
+        return
+    if daemon is None:
+        cache.close()
+    else:
+        cache.flush()
+    if args.summary and not (args.json or args.ndjson):
+        print(f"\n# Cache: {cache.hits} hits, {cache.misses} misses")
+
+
+def _emit(record: Dict) -> None:
+    """Write one NDJSON record and flush it, so consumers see it at once."""
+    print(json.dumps(record, separators=(',', ':')), flush=True)
+
+
+def _summary_record(exit_code: int, statuses: Dict[str, int], errors: int,
+                    cache: Optional[ResultCache],
+                    profiled: Optional[List[Dict]] = None) -> Dict:
+    summary = {
+        'files': sum(statuses.values()) + errors,
+        'statuses': statuses,
+        'errors': errors,
+        'exit_code': exit_code,
+    }
+    if cache is not None:
+        summary['cache'] = {'hits': cache.hits, 'misses': cache.misses}
+    if profiled:
+        summary['timings'] = profile_summary(profiled)
+    return {'summary': summary}
+
+
+def _exit_code(report: Dict) -> int:
+    if report['auto_fail']:
+        return 2
+    return 1 if report['score'] < report['threshold'] else 0
 
-    args = parser.parse_args()
+
+def run_manuscript(args: argparse.Namespace,
+                   daemon: Optional[ScoringDaemon] = None,
+                   started: Optional[float] = None) -> int:
+    """Score args.manuscript and everything it includes; returns the exit
+    code of the aggregated paper report."""
+    main = args.manuscript
+    if not main.exists():
+        print(f"Error: File not found: {main}")
+        return 1
+
+    exit_code = 0
+    errors = 0
+    sections = []
+    cache = _run_cache(args, daemon)
+    try:
+        for label, report, error, tb in score_manuscript(main, args.jobs, cache):
+            if error is not None:
+                if args.ndjson:
+                    _emit({'filepath': str(main.parent / label), 'error': error})
+                else:
+                    print(f"Error scoring {label}: {error}")
+                sys.stderr.write(tb)
+                errors += 1
+                exit_code = 1
+                continue
+            if args.ndjson:
+                _emit(report)
+            sections.append((label, report))
+    except (OSError, UnicodeDecodeError) as e:
+        if args.ndjson:
+            _emit({'filepath': str(main), 'error': f'could not read manuscript: {e}'})
+        else:
+            print(f"Error: could not read manuscript: {e}")
+        errors += 1
+        exit_code = 1
+
+    report = aggregate_manuscript(main, sections) if sections else None
+    if report is not None and not (args.json or args.ndjson):
+        print_report(report, summary_only=args.summary, verbose=args.verbose)
+        print_sections(report)
+        if args.profile:
+            print_profile(profile_summary([r for _, r in sections]),
+                          time.perf_counter() - started)
+    _finish_cache(args, cache, daemon)
+    if report is not None and args.json:
+        print(json.dumps(report, indent=2))
+
+    exit_code = max(exit_code, 1 if report is None else _exit_code(report))
+    if args.ndjson:
+        # The paper record repeats the sections already streamed above
+        if report is not None:
+            _emit({key: value for key, value in report.items() if key != 'sections'})
+        statuses = {}
+        for _, section in sections:
+            statuses[section['status']] = statuses.get(section['status'], 0) + 1
+        _emit(_summary_record(exit_code, statuses, errors, cache,
+                              [r for _, r in sections if 'timings' in r]))
+    return exit_code
+
+
+def run_ndjson(args: argparse.Namespace, scorable: List[Path],
+               cache: Optional[ResultCache],
+               daemon: Optional[ScoringDaemon] = None) -> int:
+    """--ndjson: one record per file in completion order (a report, or
+    {"filepath", "error"}), then {"summary": {...}} with the exit code."""
+    exit_code = 0
+    errors = 0
+    statuses = {}
+    profiled = []
+    for filepath in args.filepaths:
+        if not filepath.exists():
+            _emit({'filepath': str(filepath), 'error': 'File not found'})
+            errors += 1
+            exit_code = 1
+        elif classify_file(filepath) == 'unknown':
+            _emit({'filepath': str(filepath),
+                   'error': f'Unsupported file type: {filepath.suffix}'})
+
+    if daemon is None:
+        outcomes = score_files_as_completed(scorable, jobs=args.jobs, cache=cache)
+    else:
+        # The daemon buffers the reply anyway; keep its in-memory layer
+        outcomes = enumerate(daemon.score_files(scorable, jobs=args.jobs,
+                                                no_cache=args.no_cache))
+    for i, (report, error, tb) in outcomes:
+        if error is not None:
+            _emit({'filepath': str(scorable[i]), 'error': error})
+            sys.stderr.write(tb)
+            errors += 1
+            exit_code = 1
+            continue
+        _emit(report)
+        statuses[report['status']] = statuses.get(report['status'], 0) + 1
+        exit_code = max(exit_code, _exit_code(report))
+        if 'timings' in report:
+            profiled.append({'filepath': report['filepath'],
+                             'timings': report['timings']})
+
+    _finish_cache(args, cache, daemon)
+    _emit(_summary_record(exit_code, statuses, errors, cache, profiled))
+    return exit_code
+
+
+def run(args: argparse.Namespace, daemon: Optional[ScoringDaemon] = None) -> int:
+    """Score the files selected by args, printing reports; returns the exit
+    code. With a daemon, its in-memory reports and open cache are used."""
+    PROFILER.enabled = args.profile
+    started = time.perf_counter()
+    if args.manuscript is not None:
+        return run_manuscript(args, daemon, started)
 
     results = []
     exit_code = 0
 
+    if args.changed_since or args.staged:
+        try:
+            changed = changed_files(args.changed_since, args.staged)
+        except (OSError, RuntimeError) as e:
+            print(f"Error: could not list changed files: {e}")
+            return 1
+        args.filepaths = list(dict.fromkeys(args.filepaths + changed))
+        if not args.filepaths:
+            print("No changed .py/.tex files to score")
+            return 0
+
+    scorable = []
+    for filepath in args.filepaths:
+        if filepath.exists() and classify_file(filepath) != 'unknown':
+            scorable.append(filepath)
+    cache = _run_cache(args, daemon)
+    if args.ndjson:
+        return run_ndjson(args, scorable, cache, daemon)
+    if daemon is None:
+        outcomes = score_files(scorable, jobs=args.jobs, cache=cache)
+    else:
+        outcomes = daemon.score_files(scorable, jobs=args.jobs,
+                                      no_cache=args.no_cache)
+
     for filepath in args.filepaths:
         if not filepath.exists():
             print(f"Error: File not found: {filepath}")
@@ -712,29 +2511,47 @@ Exit Codes:
             print(f"Error: Unsupported file type: {filepath.suffix} ({filepath})")
             continue
 
-        try:
-            scorer = QualityScorer(filepath, verbose=args.verbose)
-            report = scorer.score_file()
-            results.append(report)
-
-            if not args.json:
-                scorer.print_report(summary_only=args.summary)
-
-            if report['auto_fail']:
-                exit_code = max(exit_code, 2)
-            elif report['score'] < report['threshold']:
-                exit_code = max(exit_code, 1)
-
-        except Exception as e:
-            print(f"Error scoring {filepath}: {e}")
-            import traceback
-            traceback.print_exc()
+        report, error, tb = next(outcomes)
+        if error is not None:
+            print(f"Error scoring {filepath}: {error}")
+            sys.stderr.write(tb)
             exit_code = 1
+            continue
+
+        results.append(report)
+
+        if not args.json:
+            print_report(report, summary_only=args.summary, verbose=args.verbose)
+
+        exit_code = max(exit_code, _exit_code(report))
+
+    if args.profile and results and not args.json:
+        print_profile(profile_summary(results), time.perf_counter() - started)
+    _finish_cache(args, cache, daemon)
 
     if args.json:
         print(json.dumps(results, indent=2))
 
-    sys.exit(exit_code)
+    return exit_code
+
+
+def main():
+    args = parse_args()
+    if args.watch is None:
+        sys.exit(run(args))
+
+    roots = [d for d in (args.watch or map(Path, WATCH_DIRS)) if d.is_dir()]
+    if not roots:
+        print("Error: no directory to watch")
+        sys.exit(1)
+    # Exit through serve_forever's cleanup (socket removal) on SIGTERM too
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        daemon = ScoringDaemon(roots, use_cache=not args.no_cache)
+        daemon.serve_forever()
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()